@@ -1,11 +1,16 @@
 from django.db import models
 from django.conf import settings
 from django.core.validators import URLValidator
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from decimal import Decimal
 import os
 
+from core.cache import bump_version
+
+# Namespace de cache de los anuncios públicos (get_active_ads)
+ADS_NAMESPACE = 'advertising:ads'
+
 
 class Client(models.Model):
     """Clientes que pagan por publicidad"""
@@ -364,4 +369,23 @@ def delete_old_image_on_update(sender, instance, **kwargs):
     except Advertisement.DoesNotExist:
         pass
     except Exception as e:
-        print(f"✗ Error en signal pre_save: {e}")
\ No newline at end of file
+        print(f"✗ Error en signal pre_save: {e}")
+
+
+# =============================================================================
+# SIGNALS PARA INVALIDAR LA CACHE DE ANUNCIOS ACTIVOS
+# =============================================================================
+
+COUNTER_FIELDS = frozenset(['impressions', 'clicks'])
+
+
+@receiver([post_save, post_delete], sender=Advertisement)
+@receiver([post_save, post_delete], sender=Client)
+def invalidate_active_ads(sender, update_fields=None, **kwargs):
+    """
+    Cualquier cambio de anuncios o clientes invalida los anuncios activos,
+    salvo los contadores de impresiones y clicks (no se muestran).
+    """
+    if update_fields and COUNTER_FIELDS.issuperset(update_fields):
+        return
+    bump_version(ADS_NAMESPACE)
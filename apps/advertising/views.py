@@ -7,7 +7,8 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db.models import Q
-from .models import Client, Advertisement
+from core.cache import cache_response
+from .models import ADS_NAMESPACE, Client, Advertisement
 from .serializers import (
     ClientSerializer, 
     AdvertisementSerializer,
@@ -15,6 +16,8 @@ from .serializers import (
     ActiveAdvertisementSerializer
 )
 
+ACTIVE_ADS_CACHE_TIMEOUT = 60 * 5
+
 
 class ClientViewSet(viewsets.ModelViewSet):
     queryset = Client.objects.all()
@@ -142,6 +145,12 @@ class AdvertisementViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response(
+    ADS_NAMESPACE,
+    ACTIVE_ADS_CACHE_TIMEOUT,
+    per_user=False,
+    key_parts=lambda request: [timezone.now().date()],
+)
 def get_active_ads(request):
     """
     Endpoint público para obtener anuncios activos.
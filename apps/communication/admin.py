@@ -1,10 +1,23 @@
 from django.contrib import admin
 
-# Registra tus modelos aquí
-# from .models import Message, Notification
-#
-# @admin.register(Message)
-# class MessageAdmin(admin.ModelAdmin):
-#     list_display = ['subject', 'sender', 'recipient', 'created_at', 'read_at']
-#     list_filter = ['created_at', 'read_at']
-#     search_fields = ['subject', 'body']
+from .models import Message, Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['title', 'user', 'notification_type', 'created_at', 'read_at']
+    list_filter = ['notification_type', 'created_at']
+    search_fields = ['title', 'message', 'user__username', 'user__email']
+    raw_id_fields = ['user', 'case']
+    readonly_fields = ['created_at']
+    list_per_page = 50
+
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'sender', 'recipient', 'created_at', 'read_at']
+    list_filter = ['created_at', 'read_at']
+    search_fields = ['subject', 'body']
+    raw_id_fields = ['sender', 'recipient']
+    readonly_fields = ['created_at']
+    list_per_page = 50
@@ -0,0 +1,285 @@
+# apps/communication/events.py
+
+"""
+Fan-out de eventos en tiempo real (invitaciones y estado de casos).
+
+Los productores (p. ej. SurgicalCase.save) llaman a publish_case_events()
+o notify_users(): cada evento se guarda como Notification (bandeja
+persistente) y el backend configurado en settings.COMMUNICATION_EVENT_BACKEND
+lo entrega a los streams abiertos de los usuarios afectados.
+
+El backend por defecto es en proceso: sirve para un único worker ASGI y
+como stand-in local. Para varios workers basta con otro backend que
+implemente la misma interfaz (publish / subscribe).
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+# Tipos de evento emitidos
+CASE_INVITATION = 'case.invitation'
+CASE_INVITATION_ACCEPTED = 'case.invitation_accepted'
+CASE_INVITATION_REJECTED = 'case.invitation_rejected'
+CASE_STATUS_CHANGED = 'case.status_changed'
+
+DEFAULT_EVENT_BACKEND = 'apps.communication.events.InProcessEventBackend'
+
+
+class BaseEventBackend:
+    """Interfaz mínima de un backend de eventos"""
+
+    def publish(self, user_ids, event):
+        """Entregar `event` (dict serializable) a todos los streams de `user_ids`"""
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """
+        Devolver una suscripción para `user_id`.
+
+        La suscripción debe ser un iterador asíncrono de eventos y exponer
+        close() para liberar recursos cuando el cliente se desconecta.
+        """
+        raise NotImplementedError
+
+
+class Subscription:
+    """Suscripción de un stream a la cola en proceso de un usuario"""
+
+    def __init__(self, backend, user_id, heartbeat, max_queue_size):
+        self.backend = backend
+        self.user_id = user_id
+        self.heartbeat = heartbeat
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def put(self, event):
+        """Encolar un evento (se ejecuta en el event loop del stream)"""
+        if self.queue.full():
+            # Cliente lento: descartar el evento más antiguo
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """Siguiente evento, o None si venció el heartbeat sin eventos"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=self.heartbeat)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.backend._unregister(self)
+
+
+class InProcessEventBackend(BaseEventBackend):
+    """
+    Backend en memoria del proceso.
+
+    publish() puede llamarse desde cualquier hilo (vistas síncronas);
+    los eventos se pasan a cada event loop con call_soon_threadsafe.
+    """
+
+    heartbeat = 15
+    max_queue_size = 100
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id, self.heartbeat, self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def _unregister(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_ids, event):
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in set(user_ids)
+                for subscription in self._subscribers.get(user_id, ())
+            ]
+
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # El loop ya se cerró: el stream está muriendo
+                subscription.close()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_event_backend():
+    """Instancia única del backend configurado"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_path = getattr(
+                    settings, 'COMMUNICATION_EVENT_BACKEND', DEFAULT_EVENT_BACKEND
+                )
+                _backend = import_string(backend_path)()
+    return _backend
+
+
+def collect_case_events(old_instance, case):
+    """
+    Comparar el caso antes y después de guardarse y devolver los eventos
+    a emitir como lista de (tipo, [user_ids]).
+    """
+    events = []
+    old_assistant_id = old_instance.assistant_doctor_id if old_instance else None
+
+    # Nueva invitación al ayudante
+    if case.assistant_doctor_id and case.assistant_doctor_id != old_assistant_id:
+        events.append((CASE_INVITATION, [case.assistant_doctor_id]))
+
+    if old_instance is None:
+        return events
+
+    # Respuesta del ayudante a la invitación
+    if (
+        case.assistant_doctor_id == old_assistant_id
+        and case.assistant_accepted != old_instance.assistant_accepted
+    ):
+        if case.assistant_accepted is True:
+            events.append((CASE_INVITATION_ACCEPTED, [case.created_by_id]))
+        elif case.assistant_accepted is False:
+            events.append((CASE_INVITATION_REJECTED, [case.created_by_id]))
+
+    # Cambios de estado del caso
+    status_fields = ('status', 'is_operated', 'is_billed', 'is_paid')
+    if any(getattr(case, f) != getattr(old_instance, f) for f in status_fields):
+        recipients = [case.created_by_id]
+        if case.assistant_doctor_id and case.assistant_accepted is not False:
+            recipients.append(case.assistant_doctor_id)
+        events.append((CASE_STATUS_CHANGED, recipients))
+
+    return events
+
+
+def build_case_event(event_type, case):
+    """Payload compacto de un evento de caso"""
+    return {
+        'type': event_type,
+        'case_id': case.pk,
+        'patient_name': case.patient_name,
+        'surgery_date': str(case.surgery_date),
+        'status': case.status,
+        'is_operated': case.is_operated,
+        'is_billed': case.is_billed,
+        'is_paid': case.is_paid,
+        'assistant_accepted': case.assistant_accepted,
+        'at': timezone.now().isoformat(),
+    }
+
+
+CASE_EVENT_TITLES = {
+    CASE_INVITATION: 'Nueva invitación como médico ayudante',
+    CASE_INVITATION_ACCEPTED: 'Invitación aceptada',
+    CASE_INVITATION_REJECTED: 'Invitación rechazada',
+    CASE_STATUS_CHANGED: 'Estado del caso actualizado',
+}
+
+
+def notify_users(user_ids, notification_type, title, message='', case=None, data=None):
+    """
+    Persistir una notificación por destinatario con un único INSERT
+    (bulk_create) y empujarlas al stream de cada usuario.
+    """
+    from .models import Notification
+
+    user_ids = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    if not user_ids:
+        return []
+
+    data = data or {}
+    return send_notifications([
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            case=case,
+            data=data,
+        )
+        for user_id in user_ids
+    ])
+
+
+def send_notifications(notifications):
+    """
+    Insertar notificaciones ya construidas (posiblemente distintas entre sí)
+    con un único bulk_create y publicarlas en los streams.
+    """
+    from .models import Notification
+
+    if not notifications:
+        return []
+
+    notifications = Notification.objects.bulk_create(notifications)
+
+    backend = get_event_backend()
+    for notification in notifications:
+        backend.publish([notification.user_id], {
+            **notification.data,
+            'type': notification.notification_type,
+            'title': notification.title,
+            'notification_id': notification.pk,
+        })
+
+    return notifications
+
+
+def publish_case_events(case, events):
+    """Registrar y publicar los eventos devueltos por collect_case_events()"""
+    for event_type, user_ids in events:
+        notify_users(
+            user_ids,
+            event_type,
+            CASE_EVENT_TITLES[event_type],
+            message=f"{case.patient_name} - {case.surgery_date}",
+            case=case,
+            data=build_case_event(event_type, case),
+        )
+
+
+def publish_bulk_status_events(cases):
+    """
+    Equivalente a publish_case_events() para cambios de estado aplicados con
+    UPDATE masivo (sin pasar por SurgicalCase.save()).
+
+    `cases` son los casos ya actualizados; se notifica a los ayudantes que no
+    rechazaron la invitación, con un único INSERT para todo el lote.
+    """
+    from .models import Notification
+
+    send_notifications([
+        Notification(
+            user_id=case.assistant_doctor_id,
+            notification_type=CASE_STATUS_CHANGED,
+            title=CASE_EVENT_TITLES[CASE_STATUS_CHANGED],
+            message=f"{case.patient_name} - {case.surgery_date}",
+            case=case,
+            data=build_case_event(CASE_STATUS_CHANGED, case),
+        )
+        for case in cases
+        if case.assistant_doctor_id and case.assistant_accepted is not False
+    ])
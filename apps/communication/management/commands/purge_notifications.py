@@ -0,0 +1,76 @@
+"""
+Management command para aplicar la retención de notificaciones leídas.
+
+Borra en lotes (por id) las notificaciones leídas hace más de N días, de modo
+que cada DELETE es corto y no bloquea la tabla aunque haya millones de filas.
+Debe ejecutarse periódicamente (ej: cronjob diario).
+
+Uso:
+    python manage.py purge_notifications
+    python manage.py purge_notifications --days 30 --batch-size 5000
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.communication.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Elimina en lotes las notificaciones leídas más antiguas que el periodo de retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Eliminar notificaciones leídas hace más de X días (default: 30)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Filas eliminadas por lote (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar lo que se eliminaría sin hacer cambios',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        cutoff_date = timezone.now() - timedelta(days=days)
+
+        # Usa el índice parcial sobre read_at (solo filas leídas)
+        expired = Notification.objects.filter(
+            read_at__isnull=False,
+            read_at__lt=cutoff_date
+        )
+
+        if dry_run:
+            count = expired.count()
+            self.stdout.write(
+                self.style.WARNING(
+                    f'[DRY RUN] Se eliminarían {count} notificaciones leídas hace más de {days} días'
+                )
+            )
+            return
+
+        total_deleted = 0
+        while True:
+            batch_ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not batch_ids:
+                break
+
+            deleted, _ = Notification.objects.filter(id__in=batch_ids).delete()
+            total_deleted += deleted
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Se eliminaron {total_deleted} notificaciones leídas hace más de {days} días'
+            )
+        )
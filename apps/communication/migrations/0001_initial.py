@@ -0,0 +1,56 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('medico', '0011_alter_surgicalcase_calendar_event_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Message',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=200, verbose_name='Asunto')),
+                ('body', models.TextField(verbose_name='Mensaje')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Envío')),
+                ('read_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Lectura')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='received_messages', to=settings.AUTH_USER_MODEL, verbose_name='Destinatario')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sent_messages', to=settings.AUTH_USER_MODEL, verbose_name='Remitente')),
+            ],
+            options={
+                'verbose_name': 'Mensaje',
+                'verbose_name_plural': 'Mensajes',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['recipient', '-created_at', '-id'], name='comm_msg_inbox_idx'), models.Index(fields=['sender', '-created_at', '-id'], name='comm_msg_sent_idx'), models.Index(condition=models.Q(('read_at__isnull', True)), fields=['recipient', '-created_at'], name='comm_msg_unread_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('case.invitation', 'Invitación a caso'), ('case.invitation_accepted', 'Invitación aceptada'), ('case.invitation_rejected', 'Invitación rechazada'), ('case.status_changed', 'Cambio de estado del caso'), ('friend_request', 'Solicitud de colega'), ('message', 'Mensaje'), ('system', 'Sistema')], max_length=50, verbose_name='Tipo')),
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('message', models.TextField(blank=True, default='', verbose_name='Mensaje')),
+                ('data', models.JSONField(blank=True, default=dict, help_text='Payload adicional del evento', verbose_name='Datos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('read_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Lectura')),
+                ('case', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='medico.surgicalcase', verbose_name='Caso')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Notificación',
+                'verbose_name_plural': 'Notificaciones',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='comm_notif_inbox_idx'), models.Index(condition=models.Q(('read_at__isnull', True)), fields=['user', '-created_at'], name='comm_notif_unread_idx'), models.Index(condition=models.Q(('read_at__isnull', False)), fields=['read_at'], name='comm_notif_read_idx')],
+            },
+        ),
+    ]
@@ -1,18 +1,144 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
 
-# Ejemplo de modelos para comunicación
-# class Message(models.Model):
-#     sender = models.ForeignKey('medio_auth.CustomUser', on_delete=models.CASCADE, related_name='sent_messages')
-#     recipient = models.ForeignKey('medio_auth.CustomUser', on_delete=models.CASCADE, related_name='received_messages')
-#     subject = models.CharField(max_length=200)
-#     body = models.TextField()
-#     created_at = models.DateTimeField(auto_now_add=True)
-#     read_at = models.DateTimeField(null=True, blank=True)
-#
-# class Notification(models.Model):
-#     user = models.ForeignKey('medio_auth.CustomUser', on_delete=models.CASCADE, related_name='notifications')
-#     title = models.CharField(max_length=200)
-#     message = models.TextField()
-#     notification_type = models.CharField(max_length=50)
-#     created_at = models.DateTimeField(auto_now_add=True)
-#     read = models.BooleanField(default=False)
+
+class Notification(models.Model):
+    """
+    Notificaciones por usuario (bandeja de "qué hay de nuevo").
+
+    Es la fuente de verdad de las novedades: invitaciones a casos,
+    respuestas del ayudante, cambios de estado y solicitudes de colegas.
+    """
+
+    TYPE_CHOICES = [
+        ('case.invitation', 'Invitación a caso'),
+        ('case.invitation_accepted', 'Invitación aceptada'),
+        ('case.invitation_rejected', 'Invitación rechazada'),
+        ('case.status_changed', 'Cambio de estado del caso'),
+        ('friend_request', 'Solicitud de colega'),
+        ('message', 'Mensaje'),
+        ('system', 'Sistema'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Usuario"
+    )
+    notification_type = models.CharField(
+        max_length=50,
+        choices=TYPE_CHOICES,
+        verbose_name="Tipo"
+    )
+    title = models.CharField(
+        max_length=200,
+        verbose_name="Título"
+    )
+    message = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Mensaje"
+    )
+    case = models.ForeignKey(
+        'medico.SurgicalCase',
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        blank=True,
+        null=True,
+        verbose_name="Caso"
+    )
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Datos",
+        help_text="Payload adicional del evento"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de Creación"
+    )
+    read_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Fecha de Lectura"
+    )
+
+    class Meta:
+        verbose_name = 'Notificación'
+        verbose_name_plural = 'Notificaciones'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Bandeja paginada por cursor
+            models.Index(fields=['user', '-created_at', '-id'], name='comm_notif_inbox_idx'),
+            # Índices parciales: solo filas no leídas (contador y filtro ?unread=)
+            models.Index(
+                fields=['user', '-created_at'],
+                name='comm_notif_unread_idx',
+                condition=Q(read_at__isnull=True),
+            ),
+            # Job de retención sobre filas leídas
+            models.Index(
+                fields=['read_at'],
+                name='comm_notif_read_idx',
+                condition=Q(read_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title}"
+
+    @property
+    def is_read(self):
+        return self.read_at is not None
+
+
+class Message(models.Model):
+    """Mensajes directos entre colegas"""
+
+    sender = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sent_messages',
+        verbose_name="Remitente"
+    )
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='received_messages',
+        verbose_name="Destinatario"
+    )
+    subject = models.CharField(
+        max_length=200,
+        verbose_name="Asunto"
+    )
+    body = models.TextField(
+        verbose_name="Mensaje"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de Envío"
+    )
+    read_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Fecha de Lectura"
+    )
+
+    class Meta:
+        verbose_name = 'Mensaje'
+        verbose_name_plural = 'Mensajes'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='comm_msg_inbox_idx'),
+            models.Index(fields=['sender', '-created_at', '-id'], name='comm_msg_sent_idx'),
+            models.Index(
+                fields=['recipient', '-created_at'],
+                name='comm_msg_unread_idx',
+                condition=Q(read_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sender_id} -> {self.recipient_id}: {self.subject}"
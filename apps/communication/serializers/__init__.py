@@ -1,13 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
 from rest_framework import serializers
 
-# Ejemplo de serializers para comunicación
-# class MessageSerializer(serializers.ModelSerializer):
-#     class Meta:
-#         model = Message
-#         fields = ['id', 'sender', 'recipient', 'subject', 'body', 'created_at', 'read_at']
-#         read_only_fields = ['created_at']
-#
-# class NotificationSerializer(serializers.ModelSerializer):
-#     class Meta:
-#         model = Notification
-#         fields = ['id', 'user', 'title', 'message', 'notification_type', 'created_at', 'read']
+from apps.medio_auth.models import Friendship
+
+from ..models import Message, Notification
+
+User = get_user_model()
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer de la bandeja de notificaciones"""
+    is_read = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = [
+            'id',
+            'notification_type',
+            'title',
+            'message',
+            'case',
+            'data',
+            'created_at',
+            'read_at',
+            'is_read',
+        ]
+        read_only_fields = fields
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    """Serializer para mensajes directos"""
+    recipient = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    sender_name = serializers.CharField(source='sender.get_full_name', read_only=True)
+    recipient_name = serializers.CharField(source='recipient.get_full_name', read_only=True)
+
+    class Meta:
+        model = Message
+        fields = [
+            'id',
+            'sender',
+            'sender_name',
+            'recipient',
+            'recipient_name',
+            'subject',
+            'body',
+            'created_at',
+            'read_at',
+        ]
+        read_only_fields = ['id', 'sender', 'created_at', 'read_at']
+
+    def validate_recipient(self, value):
+        request = self.context.get('request')
+        if request is None:
+            return value
+        if value == request.user:
+            raise serializers.ValidationError("No puedes enviarte un mensaje a ti mismo")
+        # Solo entre colegas (Friendship guarda una fila por pareja)
+        are_friends = Friendship.objects.filter(
+            Q(user=request.user, friend=value) |
+            Q(user=value, friend=request.user)
+        ).exists()
+        if not are_friends:
+            raise serializers.ValidationError("Solo puedes enviar mensajes a tus colegas")
+        return value
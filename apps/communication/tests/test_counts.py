@@ -0,0 +1,94 @@
+# apps/communication/tests/test_counts.py
+
+"""
+Contadores del badge (/api/notifications/counts/): valores, ETag/304 y una
+sola consulta, sin serializar casos.
+"""
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.medico.tests.factories import SurgicalCaseFactory
+from apps.medio_auth.models import FriendRequest
+from apps.medio_auth.tests.factories import UserFactory
+
+from ..models import Notification
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse('notification_counts')
+
+
+@pytest.fixture
+def badge(doctor, django_capture_on_commit_callbacks):
+    """
+    3 invitaciones (2 pendientes), 1 solicitud pendiente y un caso propio;
+    cada invitación deja una Notification case.invitation al commit.
+    """
+    colleague = UserFactory()
+    with django_capture_on_commit_callbacks(execute=True):
+        SurgicalCaseFactory.create_batch(2, created_by=colleague, assistant_doctor=doctor)
+        accepted = SurgicalCaseFactory(created_by=colleague, assistant_doctor=doctor, assistant_accepted=True)
+        SurgicalCaseFactory(created_by=doctor)
+    FriendRequest.objects.create(from_user=colleague, to_user=doctor)
+    FriendRequest.objects.create(from_user=UserFactory(), to_user=doctor, status='rejected')
+
+    # La invitación ya aceptada se notificó hace 3 días
+    Notification.objects.filter(case=accepted).update(
+        created_at=timezone.now() - datetime.timedelta(days=3)
+    )
+
+
+def test_counts(doctor_client, badge):
+    response = doctor_client.get(URL)
+
+    assert response.status_code == 200
+    assert response.data['pending_invitations'] == 2
+    assert response.data['friend_requests'] == 1
+    # Novedades de casos: notificaciones no leídas de las últimas 24 horas
+    assert response.data['recent_case_changes'] == 2
+    assert response.data['unread_notifications'] == 3
+    assert response.data['last_case_update'] is not None
+
+
+def test_counts_since(doctor_client, badge):
+    since = (timezone.now() - datetime.timedelta(days=7)).isoformat()
+    assert doctor_client.get(URL, {'since': since}).data['recent_case_changes'] == 3
+
+    assert doctor_client.get(URL, {'since': 'ayer'}).status_code == 400
+
+
+def test_counts_read_notifications(doctor, doctor_client, badge):
+    Notification.objects.filter(user=doctor).update(read_at=timezone.now())
+
+    response = doctor_client.get(URL)
+    assert response.data['recent_case_changes'] == 0
+    assert response.data['unread_notifications'] == 0
+    # Las invitaciones siguen pendientes hasta que se respondan
+    assert response.data['pending_invitations'] == 2
+
+
+def test_counts_etag(doctor, doctor_client, badge):
+    response = doctor_client.get(URL)
+    etag = response['ETag']
+
+    response = doctor_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert not response.content
+    assert response['ETag'] == etag
+
+    FriendRequest.objects.create(from_user=UserFactory(), to_user=doctor)
+    response = doctor_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data['friend_requests'] == 2
+    assert response['ETag'] != etag
+
+
+def test_counts_single_query(doctor, doctor_client, django_assert_num_queries):
+    # Sin importar cuántos casos tenga el usuario: todo son subconsultas
+    SurgicalCaseFactory.create_batch(30, created_by=doctor, procedures=3)
+    with django_assert_num_queries(1):
+        response = doctor_client.get(URL)
+    assert response.data['last_case_update'] is not None
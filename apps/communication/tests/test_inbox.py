@@ -0,0 +1,117 @@
+# apps/communication/tests/test_inbox.py
+
+"""
+Bandeja de notificaciones y mensajes: fan-out en un solo INSERT, paginación
+por cursor, retención de leídas y mensajes solo entre colegas.
+"""
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.medico.tests.factories import SurgicalCaseFactory
+from apps.medio_auth.models import Friendship
+from apps.medio_auth.tests.factories import UserFactory
+
+from ..events import CASE_STATUS_CHANGED, notify_users, publish_bulk_status_events
+from ..models import Message, Notification
+
+pytestmark = pytest.mark.django_db
+
+
+def test_notify_users_single_insert(django_assert_num_queries):
+    users = UserFactory.create_batch(5)
+    user_ids = [user.pk for user in users]
+
+    with django_assert_num_queries(1):
+        notifications = notify_users(user_ids + user_ids[:2] + [None], 'system', 'Mantenimiento')
+
+    assert len(notifications) == 5
+    assert all(notification.pk for notification in notifications)
+    assert sorted(Notification.objects.values_list('user_id', flat=True)) == sorted(user_ids)
+
+
+def test_bulk_status_events_skip_rejected_assistants(django_assert_num_queries):
+    owner = UserFactory()
+    assistants = UserFactory.create_batch(3)
+    cases = [
+        SurgicalCaseFactory(created_by=owner, assistant_doctor=assistants[0]),
+        SurgicalCaseFactory(created_by=owner, assistant_doctor=assistants[1], assistant_accepted=True),
+        SurgicalCaseFactory(created_by=owner, assistant_doctor=assistants[2], assistant_accepted=False),
+        SurgicalCaseFactory(created_by=owner),
+    ]
+
+    with django_assert_num_queries(1):
+        publish_bulk_status_events(cases)
+
+    notified = Notification.objects.filter(notification_type=CASE_STATUS_CHANGED)
+    assert sorted(notified.values_list('user_id', flat=True)) == sorted([assistants[0].pk, assistants[1].pk])
+
+
+def test_inbox_cursor_paging(doctor, doctor_client):
+    notify_users([doctor.pk, UserFactory().pk], 'system', 'Aviso')
+    for number in range(24):
+        notify_users([doctor.pk], 'system', f'Aviso {number}')
+    Notification.objects.filter(user=doctor, title='Aviso').update(read_at=timezone.now())
+
+    url = reverse('notification-list')
+    seen = []
+    next_url = url + '?page_size=10'
+    while next_url:
+        response = doctor_client.get(next_url)
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        seen += [item['id'] for item in response.data['results']]
+        next_url = response.data['next']
+
+    assert len(seen) == 25
+    assert seen == sorted(seen, reverse=True)
+
+    response = doctor_client.get(url, {'unread': 'true', 'page_size': 100})
+    assert len(response.data['results']) == 24
+
+
+def test_mark_all_read(doctor, doctor_client):
+    other = UserFactory()
+    notify_users([doctor.pk, other.pk], 'system', 'Aviso')
+
+    response = doctor_client.post(reverse('notification-mark-all-read'))
+
+    assert response.data == {'updated': 1}
+    assert Notification.objects.get(user=other).read_at is None
+
+
+def test_purge_notifications():
+    user = UserFactory()
+    notify_users([user.pk], 'system', 'Sin leer')
+    notify_users([user.pk], 'system', 'Leída hoy')
+    for _ in range(3):
+        notify_users([user.pk], 'system', 'Leída hace tiempo')
+    now = timezone.now()
+    Notification.objects.filter(title='Leída hoy').update(read_at=now)
+    Notification.objects.filter(title='Leída hace tiempo').update(read_at=now - datetime.timedelta(days=40))
+
+    call_command('purge_notifications', '--dry-run')
+    assert Notification.objects.count() == 5
+
+    call_command('purge_notifications', '--days', '30', '--batch-size', '2')
+    assert sorted(Notification.objects.values_list('title', flat=True)) == ['Leída hoy', 'Sin leer']
+
+
+def test_message_only_to_colleagues(doctor, doctor_client):
+    colleague = UserFactory()
+    stranger = UserFactory()
+    Friendship.objects.create(user=colleague, friend=doctor)
+    url = reverse('message-list')
+
+    response = doctor_client.post(url, {'recipient': stranger.pk, 'subject': 'Hola', 'body': '...'})
+    assert response.status_code == 400
+    assert 'recipient' in response.data
+
+    response = doctor_client.post(url, {'recipient': colleague.pk, 'subject': 'Hola', 'body': '...'})
+    assert response.status_code == 201
+    message = Message.objects.get()
+    assert message.sender == doctor
+    assert Notification.objects.get(user=colleague).data == {'message_id': message.pk}
@@ -0,0 +1,40 @@
+# apps/communication/tests/test_stream.py
+
+"""
+Autenticación del stream SSE: ticket firmado en ?ticket=, nunca el access
+token en la URL.
+"""
+import pytest
+from django.core import signing
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import views
+from ..views import STREAM_TICKET_SALT, _authenticate_stream_user
+
+pytestmark = pytest.mark.django_db
+
+
+def stream_request(**params):
+    return RequestFactory().get(reverse('notification_stream'), params)
+
+
+def test_stream_ticket_authenticates(doctor, doctor_client):
+    response = doctor_client.post(reverse('notification_stream_ticket'))
+    assert response.status_code == 200
+
+    user = _authenticate_stream_user(stream_request(ticket=response.data['ticket']))
+    assert user == doctor
+
+
+def test_stream_rejects_access_token_in_url(doctor):
+    token = str(AccessToken.for_user(doctor))
+    assert _authenticate_stream_user(stream_request(token=token)) is None
+    assert _authenticate_stream_user(stream_request(ticket=token)) is None
+
+
+def test_stream_ticket_expires(doctor, monkeypatch):
+    ticket = signing.dumps({'user': doctor.pk}, salt=STREAM_TICKET_SALT)
+    monkeypatch.setattr(views, 'STREAM_TICKET_MAX_AGE', -1)
+    assert _authenticate_stream_user(stream_request(ticket=ticket)) is None
@@ -1,9 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .views import MessageViewSet, NotificationViewSet
+
 router = DefaultRouter()
-# router.register(r'messages', views.MessageViewSet, basename='message')
-# router.register(r'notifications', views.NotificationViewSet, basename='notification')
+router.register(r'messages', MessageViewSet, basename='message')
+router.register(r'notifications', NotificationViewSet, basename='notification')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,13 +1,355 @@
-from rest_framework import viewsets
-
-# Ejemplo de vistas para comunicación
-# class MessageViewSet(viewsets.ModelViewSet):
-#     queryset = Message.objects.all()
-#     serializer_class = MessageSerializer
-#     permission_classes = [IsAuthenticated]
-#
-#     def get_queryset(self):
-#         user = self.request.user
-#         return Message.objects.filter(
-#             Q(sender=user) | Q(recipient=user)
-#         ).order_by('-created_at')
+import hashlib
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F, Func, IntegerField, OuterRef, Q, Subquery
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from apps.medico.models import SurgicalCase
+from apps.medio_auth.models import FriendRequest
+
+from ..events import get_event_backend, notify_users
+from ..models import Message, Notification
+from ..serializers import MessageSerializer, NotificationSerializer
+
+User = get_user_model()
+
+# Ventana por defecto para "casos con cambios recientes" si el cliente no envía ?since=
+RECENT_CHANGES_WINDOW = timedelta(days=1)
+
+# Tickets del stream SSE: firmados con un salt propio y de vida corta
+STREAM_TICKET_SALT = 'communication.notification_stream'
+STREAM_TICKET_MAX_AGE = 60  # segundos
+
+
+def _count(queryset):
+    """Subconsulta escalar COUNT(*) sobre un queryset correlacionado"""
+    return Subquery(
+        queryset.order_by().annotate(
+            total=Func(F('id'), function='COUNT')
+        ).values('total'),
+        output_field=IntegerField()
+    )
+
+
+def get_notification_counts(user, since):
+    """
+    Calcula los contadores del badge de notificaciones en UNA sola consulta.
+
+    Todos los contadores son subconsultas escalares sobre la fila del usuario,
+    así que nunca se serializa un caso completo.
+
+    Las novedades de casos salen de la bandeja (Notification no leídas de
+    tipo case.*). Invitaciones y solicitudes pendientes son estado, no
+    novedades: se cuentan sobre el caso y la solicitud hasta que se
+    respondan, aunque la notificación ya se haya leído.
+    """
+    user_cases = SurgicalCase.objects.filter(
+        Q(created_by=OuterRef('pk')) | Q(assistant_doctor=OuterRef('pk'))
+    )
+    unread = Notification.objects.filter(
+        user=OuterRef('pk'),
+        read_at__isnull=True
+    )
+
+    return User.objects.filter(pk=user.pk).annotate(
+        pending_invitations=_count(
+            SurgicalCase.objects.filter(
+                assistant_doctor=OuterRef('pk'),
+                assistant_accepted__isnull=True
+            )
+        ),
+        friend_requests=_count(
+            FriendRequest.objects.filter(
+                to_user=OuterRef('pk'),
+                status='pending'
+            )
+        ),
+        recent_case_changes=_count(
+            unread.filter(
+                notification_type__startswith='case.',
+                created_at__gt=since
+            )
+        ),
+        unread_notifications=_count(unread),
+        last_case_update=Subquery(
+            user_cases.order_by().annotate(
+                latest=Func(F('updated_at'), function='MAX')
+            ).values('latest')
+        ),
+    ).values(
+        'pending_invitations',
+        'friend_requests',
+        'recent_case_changes',
+        'unread_notifications',
+        'last_case_update',
+    ).get()
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_counts(request):
+    """
+    Contadores ligeros para el badge de notificaciones.
+
+    Query params:
+    - since: fecha ISO a partir de la cual contar novedades de casos
+      (por defecto, las últimas 24 horas)
+
+    Soporta If-None-Match: si los contadores no cambiaron responde 304
+    sin cuerpo, para que el polling del frontend sea prácticamente gratis.
+    """
+    since = None
+    since_param = request.query_params.get('since')
+    if since_param:
+        since = parse_datetime(since_param)
+        if since is None:
+            return Response(
+                {'error': 'Parámetro since inválido, use formato ISO 8601'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    else:
+        since = timezone.now() - RECENT_CHANGES_WINDOW
+
+    counts = get_notification_counts(request.user, since)
+    last_case_update = counts['last_case_update']
+    data = {
+        'pending_invitations': counts['pending_invitations'] or 0,
+        'friend_requests': counts['friend_requests'] or 0,
+        'recent_case_changes': counts['recent_case_changes'] or 0,
+        'unread_notifications': counts['unread_notifications'] or 0,
+        'last_case_update': last_case_update.isoformat() if last_case_update else None,
+    }
+
+    etag = '"%s"' % hashlib.md5(
+        json.dumps(data, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _authenticate_stream_user(request):
+    """
+    Autenticar el stream.
+
+    EventSource no permite cabeceras personalizadas, así que además del
+    header Authorization (JWT) se acepta un ticket de stream en ?ticket=
+    (ver notification_stream_ticket). Nunca se acepta el access token en
+    la URL: quedaría escrito en los logs de acceso del proxy y del servidor.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is not None:
+        raw_token = authenticator.get_raw_token(header)
+        if raw_token is None:
+            return None
+        try:
+            validated_token = authenticator.get_validated_token(raw_token)
+            return authenticator.get_user(validated_token)
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return None
+    try:
+        payload = signing.loads(
+            ticket, salt=STREAM_TICKET_SALT, max_age=STREAM_TICKET_MAX_AGE
+        )
+    except signing.BadSignature:
+        return None
+    return User.objects.filter(pk=payload.get('user')).first()
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def notification_stream_ticket(request):
+    """
+    Ticket de corta duración para abrir /api/notifications/stream/?ticket=
+
+    El ticket está firmado con un salt propio, así que solo sirve para el
+    stream (no es un token de la API) y vence a los STREAM_TICKET_MAX_AGE
+    segundos; el cliente pide uno nuevo antes de cada (re)conexión.
+    """
+    ticket = signing.dumps({'user': request.user.pk}, salt=STREAM_TICKET_SALT)
+    return Response(
+        {'ticket': ticket, 'expires_in': STREAM_TICKET_MAX_AGE},
+        status=status.HTTP_200_OK
+    )
+
+
+def _format_sse(event):
+    """Serializar un evento al formato text/event-stream"""
+    return 'event: %s\ndata: %s\n\n' % (event['type'], json.dumps(event))
+
+
+@require_GET
+async def notification_stream(request):
+    """
+    Stream SSE con invitaciones, aceptaciones, rechazos y cambios de estado
+    de los casos del usuario.
+
+    Requiere servir la app vía ASGI (core.asgi, GUNICORN_ASGI=True en
+    gunicorn.conf.py): bajo WSGI, el despliegue por defecto, cada conexión
+    bloquearía un worker, así que se responde 501 y el cliente debe seguir
+    usando /api/notifications/counts/.
+
+    Autenticación: header Authorization o ?ticket= (notification_stream_ticket).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'El stream de notificaciones requiere un servidor ASGI'},
+            status=501
+        )
+
+    user = await sync_to_async(_authenticate_stream_user)(request)
+    if user is None or not user.is_active:
+        return JsonResponse(
+            {'error': 'Credenciales de autenticación inválidas'},
+            status=401
+        )
+
+    backend = get_event_backend()
+
+    async def event_source():
+        subscription = backend.subscribe(user.pk)
+        try:
+            yield 'retry: 5000\n\n'
+            async for event in subscription:
+                if event is None:
+                    # Heartbeat para mantener viva la conexión en proxies
+                    yield ': keepalive\n\n'
+                else:
+                    yield _format_sse(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(event_source(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class InboxCursorPagination(CursorPagination):
+    """
+    Paginación por cursor para bandejas: cada página es un rango sobre el
+    índice (usuario, -created_at, -id), sin OFFSET ni COUNT(*).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Bandeja de notificaciones del usuario.
+
+    Endpoints:
+    - GET /notifications/?unread=true - Listar (paginado por cursor)
+    - POST /notifications/{id}/read/ - Marcar una como leída
+    - POST /notifications/read-all/ - Marcar todas como leídas
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxCursorPagination
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get('unread', 'false').lower() == 'true':
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+
+    @action(detail=True, methods=['post'], url_path='read')
+    def mark_read(self, request, pk=None):
+        """Marcar una notificación como leída"""
+        updated = Notification.objects.filter(
+            pk=pk,
+            user=request.user,
+            read_at__isnull=True
+        ).update(read_at=timezone.now())
+
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='read-all')
+    def mark_all_read(self, request):
+        """Marcar todas las notificaciones pendientes como leídas (un solo UPDATE)"""
+        updated = Notification.objects.filter(
+            user=request.user,
+            read_at__isnull=True
+        ).update(read_at=timezone.now())
+
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+
+class MessageViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Mensajes directos entre colegas.
+
+    Endpoints:
+    - GET /messages/?box=inbox|sent - Listar (paginado por cursor)
+    - POST /messages/ - Enviar mensaje
+    - POST /messages/{id}/read/ - Marcar como leído
+    """
+    serializer_class = MessageSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = InboxCursorPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        box = self.request.query_params.get('box')
+
+        if box == 'inbox':
+            queryset = Message.objects.filter(recipient=user)
+        elif box == 'sent':
+            queryset = Message.objects.filter(sender=user)
+        else:
+            queryset = Message.objects.filter(Q(sender=user) | Q(recipient=user))
+
+        return queryset.select_related('sender', 'recipient')
+
+    def perform_create(self, serializer):
+        message = serializer.save(sender=self.request.user)
+        notify_users(
+            [message.recipient_id],
+            'message',
+            f'Nuevo mensaje de {self.request.user.get_full_name()}',
+            message=message.subject,
+            data={'message_id': message.pk},
+        )
+
+    @action(detail=True, methods=['post'], url_path='read')
+    def mark_read(self, request, pk=None):
+        """Marcar un mensaje recibido como leído"""
+        updated = Message.objects.filter(
+            pk=pk,
+            recipient=request.user,
+            read_at__isnull=True
+        ).update(read_at=timezone.now())
+
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
@@ -1,15 +1,25 @@
 from django.contrib import admin
 
-# Registra tus modelos aquí
-# from .models import Invoice, InvoiceItem
-#
-# class InvoiceItemInline(admin.TabularInline):
-#     model = InvoiceItem
-#     extra = 1
-#
-# @admin.register(Invoice)
-# class InvoiceAdmin(admin.ModelAdmin):
-#     list_display = ['invoice_number', 'patient', 'date', 'total', 'status']
-#     list_filter = ['status', 'date']
-#     search_fields = ['invoice_number', 'patient__name']
-#     inlines = [InvoiceItemInline]
+from .models import Invoice, InvoiceItem, InvoiceSequence
+
+
+class InvoiceItemInline(admin.TabularInline):
+    model = InvoiceItem
+    extra = 0
+    raw_id_fields = ['case', 'procedure']
+
+
+@admin.register(Invoice)
+class InvoiceAdmin(admin.ModelAdmin):
+    list_display = ['invoice_number', 'doctor', 'hospital', 'issue_date', 'supplement', 'total', 'status']
+    list_filter = ['status', 'issue_date', 'hospital']
+    search_fields = ['invoice_number', 'doctor__username', 'hospital__name']
+    raw_id_fields = ['doctor']
+    inlines = [InvoiceItemInline]
+    list_per_page = 50
+
+
+@admin.register(InvoiceSequence)
+class InvoiceSequenceAdmin(admin.ModelAdmin):
+    list_display = ['doctor', 'year', 'last_number', 'updated_at']
+    raw_id_fields = ['doctor']
@@ -0,0 +1,116 @@
+"""
+Management command para la facturación de fin de mes.
+
+Genera en lote las facturas de un periodo para uno o todos los médicos:
+una factura por médico y hospital con todos los casos operados y no
+facturados del periodo. Re-ejecutarlo no vuelve a facturar casos; los
+casos tardíos de un periodo ya facturado van en una factura complementaria.
+
+Uso:
+    python manage.py generate_invoices --period 2026-09
+    python manage.py generate_invoices --start 2026-09-01 --end 2026-09-15 --user dr.perez
+"""
+import calendar
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.invoice.services import generate_invoices
+from apps.medico.models import SurgicalCase
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Genera por lote las facturas de un periodo (por médico y hospital)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--period',
+            help='Mes a facturar en formato YYYY-MM',
+        )
+        parser.add_argument('--start', help='Inicio del periodo (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Fin del periodo (YYYY-MM-DD)')
+        parser.add_argument(
+            '--user',
+            help='Username o id del médico (por defecto: todos los médicos con casos por facturar)',
+        )
+        parser.add_argument(
+            '--hospital',
+            type=int,
+            action='append',
+            dest='hospitals',
+            help='Limitar a un hospital (id). Puede repetirse.',
+        )
+
+    def handle(self, *args, **options):
+        period_start, period_end = self._parse_period(options)
+
+        if options['user']:
+            lookup = {'pk': options['user']} if options['user'].isdigit() else {'username': options['user']}
+            try:
+                doctors = [User.objects.get(**lookup)]
+            except User.DoesNotExist:
+                raise CommandError(f"Usuario no encontrado: {options['user']}")
+        else:
+            doctor_ids = billable_cases_for_all(period_start, period_end, options['hospitals'])
+            doctors = User.objects.filter(id__in=doctor_ids).order_by('id')
+
+        total_invoices = 0
+        total_cases = 0
+        for doctor in doctors:
+            result = generate_invoices(
+                doctor,
+                period_start,
+                period_end,
+                hospital_ids=options['hospitals'],
+            )
+            total_invoices += len(result['invoices'])
+            total_cases += result['cases_billed']
+
+            if result['invoices']:
+                self.stdout.write(
+                    f"  - {doctor.username}: {len(result['invoices'])} factura(s), "
+                    f"{result['cases_billed']} caso(s)"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Periodo {period_start} a {period_end}: '
+                f'{total_invoices} factura(s) generadas, {total_cases} caso(s) facturados'
+            )
+        )
+
+    def _parse_period(self, options):
+        if options['period']:
+            try:
+                year, month = (int(part) for part in options['period'].split('-'))
+                last_day = calendar.monthrange(year, month)[1]
+            except (ValueError, calendar.IllegalMonthError):
+                raise CommandError('--period debe tener formato YYYY-MM')
+            return date(year, month, 1), date(year, month, last_day)
+
+        period_start = parse_date(options['start'] or '')
+        period_end = parse_date(options['end'] or '')
+        if not period_start or not period_end:
+            raise CommandError('Indique --period YYYY-MM o bien --start y --end')
+        if period_start > period_end:
+            raise CommandError('--start debe ser anterior a --end')
+        return period_start, period_end
+
+
+def billable_cases_for_all(period_start, period_end, hospital_ids=None):
+    """Ids de los médicos con al menos un caso por facturar en el periodo"""
+    cases = SurgicalCase.objects.filter(
+        surgery_date__gte=period_start,
+        surgery_date__lte=period_end,
+        is_operated=True,
+        is_billed=False,
+    ).exclude(status='cancelled')
+
+    if hospital_ids:
+        cases = cases.filter(hospital_id__in=hospital_ids)
+
+    return cases.values_list('created_by_id', flat=True).distinct()
@@ -0,0 +1,104 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('medico', '0011_alter_surgicalcase_calendar_event_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('invoice_number', models.CharField(max_length=50, verbose_name='Número de Factura')),
+                ('period_start', models.DateField(verbose_name='Inicio del Periodo')),
+                ('period_end', models.DateField(verbose_name='Fin del Periodo')),
+                ('issue_date', models.DateField(default=django.utils.timezone.localdate, verbose_name='Fecha de Emisión')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Fecha de Vencimiento')),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Subtotal')),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Impuesto')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Total')),
+                ('status', models.CharField(choices=[('draft', 'Borrador'), ('issued', 'Emitida'), ('paid', 'Pagada'), ('cancelled', 'Anulada')], default='issued', max_length=20, verbose_name='Estado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to=settings.AUTH_USER_MODEL, verbose_name='Médico')),
+                ('hospital', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='medico.hospital', verbose_name='Hospital')),
+            ],
+            options={
+                'verbose_name': 'Factura',
+                'verbose_name_plural': 'Facturas',
+                'ordering': ['-issue_date', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InvoiceItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=600, verbose_name='Descripción')),
+                ('surgery_code', models.CharField(blank=True, default='', max_length=50, verbose_name='Código de Cirugía')),
+                ('quantity', models.PositiveIntegerField(default=1, verbose_name='Cantidad')),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Precio Unitario')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Total')),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='invoice_items', to='medico.surgicalcase', verbose_name='Caso')),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='invoice.invoice', verbose_name='Factura')),
+                ('procedure', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_items', to='medico.caseprocedure', verbose_name='Procedimiento')),
+            ],
+            options={
+                'verbose_name': 'Línea de Factura',
+                'verbose_name_plural': 'Líneas de Factura',
+                'ordering': ['invoice', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(verbose_name='Año')),
+                ('last_number', models.PositiveIntegerField(default=0, verbose_name='Último Número')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoice_sequences', to=settings.AUTH_USER_MODEL, verbose_name='Médico')),
+            ],
+            options={
+                'verbose_name': 'Secuencia de Facturación',
+                'verbose_name_plural': 'Secuencias de Facturación',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['doctor', 'issue_date'], name='invoice_inv_doctor__9a03da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['hospital', 'period_start'], name='invoice_inv_hospita_821dbb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status'], name='invoice_inv_status_0d37a6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('doctor', 'invoice_number'), name='invoice_unique_number_per_doctor'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('doctor', 'hospital', 'period_start', 'period_end'), name='invoice_unique_active_period'),
+        ),
+        migrations.AddIndex(
+            model_name='invoiceitem',
+            index=models.Index(fields=['case'], name='invoice_inv_case_id_6084fd_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='invoicesequence',
+            unique_together={('doctor', 'year')},
+        ),
+    ]
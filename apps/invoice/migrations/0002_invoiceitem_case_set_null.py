@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoice', '0001_initial'),
+        ('medico', '0015_casedeletion_and_assistant_sync_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoiceitem',
+            name='case',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_items', to='medico.surgicalcase', verbose_name='Caso'),
+        ),
+    ]
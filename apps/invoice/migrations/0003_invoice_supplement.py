@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoice', '0002_invoiceitem_case_set_null'),
+        ('medico', '0015_casedeletion_and_assistant_sync_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='invoice',
+            name='invoice_unique_active_period',
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='supplement',
+            field=models.PositiveSmallIntegerField(default=0, help_text='0 = factura del periodo; 1, 2... = complementarias con los casos tardíos', verbose_name='Complementaria'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('doctor', 'hospital', 'period_start', 'period_end', 'supplement'), name='invoice_unique_active_period'),
+        ),
+    ]
@@ -1,25 +1,225 @@
-from django.db import models
-
-# Ejemplo de modelos para facturación
-# class Invoice(models.Model):
-#     invoice_number = models.CharField(max_length=50, unique=True)
-#     patient = models.ForeignKey('medico.Patient', on_delete=models.CASCADE)
-#     date = models.DateField(auto_now_add=True)
-#     due_date = models.DateField()
-#     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
-#     tax = models.DecimalField(max_digits=10, decimal_places=2)
-#     total = models.DecimalField(max_digits=10, decimal_places=2)
-#     status = models.CharField(max_length=20, choices=[
-#         ('draft', 'Draft'),
-#         ('sent', 'Sent'),
-#         ('paid', 'Paid'),
-#         ('overdue', 'Overdue'),
-#         ('cancelled', 'Cancelled')
-#     ])
-#
-# class InvoiceItem(models.Model):
-#     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='items')
-#     description = models.CharField(max_length=200)
-#     quantity = models.IntegerField()
-#     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
-#     total = models.DecimalField(max_digits=10, decimal_places=2)
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+class InvoiceSequence(models.Model):
+    """
+    Contador de numeración de facturas por médico y año.
+
+    Los números se reservan por bloques con un único UPDATE atómico
+    (last_number = last_number + N), así que una corrida que genera cientos
+    de facturas toca esta fila una sola vez en lugar de bloquear por factura.
+    """
+    doctor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='invoice_sequences',
+        verbose_name="Médico"
+    )
+    year = models.PositiveIntegerField(
+        verbose_name="Año"
+    )
+    last_number = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Último Número"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Actualización"
+    )
+
+    class Meta:
+        verbose_name = 'Secuencia de Facturación'
+        verbose_name_plural = 'Secuencias de Facturación'
+        unique_together = ['doctor', 'year']
+
+    def __str__(self):
+        return f"{self.doctor_id} - {self.year}: {self.last_number}"
+
+    @classmethod
+    def reserve(cls, doctor, year, count):
+        """Reservar `count` números consecutivos y devolverlos como range"""
+        with transaction.atomic():
+            cls.objects.get_or_create(doctor=doctor, year=year)
+            cls.objects.filter(doctor=doctor, year=year).update(
+                last_number=F('last_number') + count
+            )
+            last_number = cls.objects.filter(
+                doctor=doctor, year=year
+            ).values_list('last_number', flat=True).get()
+        return range(last_number - count + 1, last_number + 1)
+
+
+class Invoice(models.Model):
+    """Factura de un médico a un hospital por los casos de un periodo"""
+
+    STATUS_CHOICES = [
+        ('draft', 'Borrador'),
+        ('issued', 'Emitida'),
+        ('paid', 'Pagada'),
+        ('cancelled', 'Anulada'),
+    ]
+
+    invoice_number = models.CharField(
+        max_length=50,
+        verbose_name="Número de Factura"
+    )
+    doctor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='invoices',
+        verbose_name="Médico"
+    )
+    hospital = models.ForeignKey(
+        'medico.Hospital',
+        on_delete=models.PROTECT,
+        related_name='invoices',
+        verbose_name="Hospital"
+    )
+    period_start = models.DateField(
+        verbose_name="Inicio del Periodo"
+    )
+    period_end = models.DateField(
+        verbose_name="Fin del Periodo"
+    )
+    issue_date = models.DateField(
+        default=timezone.localdate,
+        verbose_name="Fecha de Emisión"
+    )
+    due_date = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name="Fecha de Vencimiento"
+    )
+    subtotal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name="Subtotal"
+    )
+    tax = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name="Impuesto"
+    )
+    total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name="Total"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='issued',
+        verbose_name="Estado"
+    )
+    supplement = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Complementaria",
+        help_text="0 = factura del periodo; 1, 2... = complementarias con los casos tardíos"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de Creación"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Última Actualización"
+    )
+
+    class Meta:
+        verbose_name = 'Factura'
+        verbose_name_plural = 'Facturas'
+        ordering = ['-issue_date', '-id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['doctor', 'invoice_number'],
+                name='invoice_unique_number_per_doctor',
+            ),
+            # Una sola factura vigente por médico/hospital/periodo y número
+            # de complementaria: dos corridas simultáneas no duplican facturas
+            models.UniqueConstraint(
+                fields=['doctor', 'hospital', 'period_start', 'period_end', 'supplement'],
+                condition=~Q(status='cancelled'),
+                name='invoice_unique_active_period',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['doctor', 'issue_date']),
+            models.Index(fields=['hospital', 'period_start']),
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"{self.invoice_number} - {self.hospital}"
+
+
+class InvoiceItem(models.Model):
+    """
+    Línea de factura: un procedimiento de un caso quirúrgico.
+
+    description y surgery_code son una copia del caso al facturar, así que
+    la línea se conserva aunque el médico elimine después el caso (cobrado).
+    """
+
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name="Factura"
+    )
+    case = models.ForeignKey(
+        'medico.SurgicalCase',
+        on_delete=models.SET_NULL,
+        related_name='invoice_items',
+        blank=True,
+        null=True,
+        verbose_name="Caso"
+    )
+    procedure = models.ForeignKey(
+        'medico.CaseProcedure',
+        on_delete=models.SET_NULL,
+        related_name='invoice_items',
+        blank=True,
+        null=True,
+        verbose_name="Procedimiento"
+    )
+    description = models.CharField(
+        max_length=600,
+        verbose_name="Descripción"
+    )
+    surgery_code = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name="Código de Cirugía"
+    )
+    quantity = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Cantidad"
+    )
+    unit_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Precio Unitario"
+    )
+    total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Total"
+    )
+
+    class Meta:
+        verbose_name = 'Línea de Factura'
+        verbose_name_plural = 'Líneas de Factura'
+        ordering = ['invoice', 'id']
+        indexes = [
+            models.Index(fields=['case']),
+        ]
+
+    def __str__(self):
+        return f"{self.invoice.invoice_number} - {self.description}"
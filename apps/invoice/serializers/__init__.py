@@ -1,16 +1,53 @@
 from rest_framework import serializers
 
-# Ejemplo de serializers para facturación
-# class InvoiceItemSerializer(serializers.ModelSerializer):
-#     class Meta:
-#         model = InvoiceItem
-#         fields = ['id', 'description', 'quantity', 'unit_price', 'total']
-#
-# class InvoiceSerializer(serializers.ModelSerializer):
-#     items = InvoiceItemSerializer(many=True, read_only=True)
-#
-#     class Meta:
-#         model = Invoice
-#         fields = ['id', 'invoice_number', 'patient', 'date', 'due_date', 
-#                   'subtotal', 'tax', 'total', 'status', 'items']
-#         read_only_fields = ['date']
+from ..models import Invoice, InvoiceItem
+
+
+class InvoiceItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InvoiceItem
+        fields = ['id', 'case', 'procedure', 'surgery_code', 'description',
+                  'quantity', 'unit_price', 'total']
+        read_only_fields = fields
+
+
+class InvoiceListSerializer(serializers.ModelSerializer):
+    """Serializer resumido para listados de facturas"""
+    hospital_name = serializers.CharField(source='hospital.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Invoice
+        fields = ['id', 'invoice_number', 'hospital', 'hospital_name',
+                  'period_start', 'period_end', 'supplement', 'issue_date', 'due_date',
+                  'subtotal', 'tax', 'total', 'status', 'status_display']
+        read_only_fields = fields
+
+
+class InvoiceSerializer(InvoiceListSerializer):
+    """Serializer detallado con las líneas de la factura"""
+    items = InvoiceItemSerializer(many=True, read_only=True)
+
+    class Meta(InvoiceListSerializer.Meta):
+        fields = InvoiceListSerializer.Meta.fields + ['items', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class GenerateInvoicesSerializer(serializers.Serializer):
+    """Parámetros del lote de facturación"""
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    hospital_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=True
+    )
+    issue_date = serializers.DateField(required=False)
+    due_date = serializers.DateField(required=False, allow_null=True)
+
+    def validate(self, data):
+        if data['period_start'] > data['period_end']:
+            raise serializers.ValidationError({
+                'period_end': 'El fin del periodo debe ser posterior al inicio'
+            })
+        return data
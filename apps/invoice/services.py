@@ -0,0 +1,180 @@
+# apps/invoice/services.py
+
+"""
+Generación de facturas por lotes.
+
+generate_invoices() factura en una sola transacción todos los casos operados
+y no facturados de un médico dentro de un periodo, agrupados por hospital:
+
+- Los procedimientos se leen con un único values() y las líneas se insertan
+  con bulk_create.
+- Los números de factura se reservan en bloque (InvoiceSequence.reserve).
+- Los casos se marcan como facturados con un solo UPDATE ... WHERE id IN.
+- Re-ejecutar el lote es seguro: los casos ya facturados no se vuelven a
+  tomar (y se bloquean con SELECT ... FOR UPDATE mientras se facturan).
+  Los casos operados o registrados después de facturar el periodo van en
+  una factura complementaria (supplement 1, 2...) con número propio.
+"""
+from collections import OrderedDict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.medico.caching import invalidate_user_cases
+from apps.medico.models import CaseProcedure, SurgicalCase
+
+from .models import Invoice, InvoiceItem, InvoiceSequence
+
+CENTS = Decimal('0.01')
+
+
+def get_tax_rate():
+    return Decimal(str(getattr(settings, 'INVOICE_TAX_RATE', '0')))
+
+
+def format_invoice_number(year, number):
+    return f"F{year}-{number:06d}"
+
+
+def billable_cases(doctor, period_start, period_end, hospital_ids=None):
+    """Casos operados, no facturados y no anulados del médico en el periodo"""
+    cases = SurgicalCase.objects.filter(
+        created_by=doctor,
+        surgery_date__gte=period_start,
+        surgery_date__lte=period_end,
+        is_operated=True,
+        is_billed=False,
+    ).exclude(
+        status='cancelled'
+    ).exclude(
+        invoice_items__invoice__status__in=['draft', 'issued', 'paid']
+    )
+
+    if hospital_ids:
+        cases = cases.filter(hospital_id__in=hospital_ids)
+
+    return cases
+
+
+def generate_invoices(doctor, period_start, period_end, hospital_ids=None,
+                      issue_date=None, due_date=None):
+    """
+    Generar las facturas del periodo para `doctor`.
+
+    Retorna un dict con las facturas creadas, los casos facturados y los
+    hospitales que recibieron una factura complementaria porque ya tenían
+    una vigente del periodo.
+    """
+    issue_date = issue_date or timezone.localdate()
+    tax_rate = get_tax_rate()
+
+    with transaction.atomic():
+        # Bloquear los casos: una corrida simultánea espera y, al continuar,
+        # ya no los ve como facturables
+        billable_ids = list(
+            billable_cases(
+                doctor, period_start, period_end, hospital_ids
+            ).select_for_update().values_list('id', flat=True)
+        )
+
+        procedures = CaseProcedure.objects.filter(
+            case_id__in=billable_ids
+        ).order_by(
+            'case__hospital_id', 'case__surgery_date', 'case_id', 'order'
+        ).values(
+            'id',
+            'case_id',
+            'case__hospital_id',
+            'case__patient_name',
+            'case__surgery_date',
+            'surgery_code',
+            'surgery_name',
+            'calculated_value',
+        )
+
+        # Agrupar líneas por hospital
+        groups = OrderedDict()
+        for proc in procedures:
+            groups.setdefault(proc['case__hospital_id'], []).append(proc)
+
+        if not groups:
+            return {
+                'invoices': [],
+                'cases_billed': 0,
+                'supplementary_hospitals': [],
+            }
+
+        # Última factura vigente del periodo por hospital (casos tardíos)
+        last_supplement = dict(
+            Invoice.objects.filter(
+                doctor=doctor,
+                hospital_id__in=groups.keys(),
+                period_start=period_start,
+                period_end=period_end,
+            ).exclude(
+                status='cancelled'
+            ).values('hospital_id').annotate(
+                last=Max('supplement')
+            ).values_list('hospital_id', 'last')
+        )
+
+        numbers = InvoiceSequence.reserve(doctor, issue_date.year, len(groups))
+
+        invoices = []
+        for number, (hospital_id, lines) in zip(numbers, groups.items()):
+            subtotal = sum((line['calculated_value'] for line in lines), Decimal('0.00'))
+            tax = (subtotal * tax_rate).quantize(CENTS, rounding=ROUND_HALF_UP)
+            invoices.append(Invoice(
+                invoice_number=format_invoice_number(issue_date.year, number),
+                doctor=doctor,
+                hospital_id=hospital_id,
+                period_start=period_start,
+                period_end=period_end,
+                issue_date=issue_date,
+                due_date=due_date,
+                subtotal=subtotal,
+                tax=tax,
+                total=subtotal + tax,
+                status='issued',
+                supplement=last_supplement[hospital_id] + 1 if hospital_id in last_supplement else 0,
+            ))
+
+        invoices = Invoice.objects.bulk_create(invoices)
+
+        items = []
+        case_ids = set()
+        for invoice, lines in zip(invoices, groups.values()):
+            for line in lines:
+                case_ids.add(line['case_id'])
+                items.append(InvoiceItem(
+                    invoice=invoice,
+                    case_id=line['case_id'],
+                    procedure_id=line['id'],
+                    description=(
+                        f"{line['surgery_name']} - {line['case__patient_name']} "
+                        f"({line['case__surgery_date']})"
+                    )[:600],
+                    surgery_code=line['surgery_code'],
+                    quantity=1,
+                    unit_price=line['calculated_value'],
+                    total=line['calculated_value'],
+                ))
+
+        InvoiceItem.objects.bulk_create(items, batch_size=1000)
+
+        SurgicalCase.objects.filter(id__in=case_ids).update(
+            is_billed=True,
+            status='billed',
+            updated_at=timezone.now(),
+        )
+        # update() no emite señales
+        transaction.on_commit(lambda: invalidate_user_cases(doctor.pk))
+
+    return {
+        'invoices': invoices,
+        'cases_billed': len(case_ids),
+        'supplementary_hospitals': sorted(last_supplement),
+    }
@@ -0,0 +1,30 @@
+# apps/invoice/tests/test_case_deletion.py
+
+"""
+Eliminar un caso ya facturado conserva sus líneas de factura.
+"""
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from apps.medico.models import SurgicalCase
+from apps.medico.tests.factories import SurgicalCaseFactory
+
+from ..models import InvoiceItem
+from ..services import generate_invoices
+
+pytestmark = pytest.mark.django_db
+
+
+def test_delete_paid_invoiced_case(doctor, doctor_client):
+    case = SurgicalCaseFactory(created_by=doctor, is_operated=True, procedures=2)
+    generate_invoices(doctor, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+    SurgicalCase.objects.filter(pk=case.pk).update(is_paid=True, status='paid')
+
+    response = doctor_client.delete(reverse('medico:surgical-case-detail', args=[case.pk]))
+
+    assert response.status_code == 204
+    items = InvoiceItem.objects.all()
+    assert len(items) == 2
+    assert all(item.case_id is None and item.description for item in items)
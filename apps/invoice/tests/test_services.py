@@ -0,0 +1,87 @@
+# apps/invoice/tests/test_services.py
+
+"""
+Facturación por lotes: numeración, re-ejecuciones, casos tardíos y cache.
+"""
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.medico.models import SurgicalCase
+from apps.medico.tests.factories import HospitalFactory, SurgicalCaseFactory
+
+from ..models import Invoice
+from ..services import generate_invoices
+
+pytestmark = pytest.mark.django_db
+
+MARCH = (datetime.date(2026, 3, 1), datetime.date(2026, 3, 31))
+APRIL = (datetime.date(2026, 4, 1), datetime.date(2026, 4, 30))
+
+
+def test_generate_invoices_refreshes_cached_stats(doctor, doctor_client, django_capture_on_commit_callbacks):
+    SurgicalCaseFactory(
+        created_by=doctor, surgery_date=datetime.date(2026, 3, 5),
+        is_operated=True, status='completed', procedures=2,
+    )
+    url = reverse('medico:surgical-case-get-stats')
+    assert doctor_client.get(url).data['cases_by_status']['billed']['count'] == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        result = generate_invoices(doctor, datetime.date(2026, 3, 1), datetime.date(2026, 3, 31))
+
+    assert result['cases_billed'] == 1
+    stats = doctor_client.get(url).data['cases_by_status']
+    assert stats['billed']['count'] == 1
+    assert stats['completed']['count'] == 0
+
+
+def test_invoice_numbers_are_sequential(doctor):
+    first, second = HospitalFactory.create_batch(2)
+    SurgicalCaseFactory(created_by=doctor, hospital=first, surgery_date=MARCH[0], is_operated=True, procedures=2)
+    SurgicalCaseFactory(created_by=doctor, hospital=second, surgery_date=MARCH[0], is_operated=True, procedures=1)
+    SurgicalCaseFactory(created_by=doctor, hospital=first, surgery_date=APRIL[0], is_operated=True, procedures=1)
+
+    march = generate_invoices(doctor, *MARCH, issue_date=datetime.date(2026, 4, 1))
+    april = generate_invoices(doctor, *APRIL, issue_date=datetime.date(2026, 5, 1))
+
+    numbers = [invoice.invoice_number for invoice in march['invoices'] + april['invoices']]
+    assert numbers == ['F2026-000001', 'F2026-000002', 'F2026-000003']
+    # Otro médico tiene su propia numeración
+    other = SurgicalCaseFactory(surgery_date=MARCH[0], is_operated=True, procedures=1).created_by
+    assert generate_invoices(other, *MARCH)['invoices'][0].invoice_number.endswith('-000001')
+
+
+def test_rerun_bills_only_late_cases(doctor):
+    hospital = HospitalFactory()
+    SurgicalCaseFactory(created_by=doctor, hospital=hospital, surgery_date=MARCH[0], is_operated=True, procedures=2)
+    SurgicalCaseFactory(created_by=doctor, hospital=hospital, surgery_date=MARCH[1], procedures=1)
+    args = ['generate_invoices', '--period', '2026-03', '--user', doctor.username]
+
+    call_command(*args, stdout=io.StringIO())
+    call_command(*args, stdout=io.StringIO())
+
+    main = Invoice.objects.get(doctor=doctor)
+    assert main.supplement == 0
+    assert main.items.count() == 2
+
+    # El segundo caso se marca como operado después del cierre del mes
+    late = SurgicalCase.objects.get(surgery_date=MARCH[1], created_by=doctor)
+    SurgicalCase.objects.filter(pk=late.pk).update(is_operated=True, status='completed')
+
+    result = generate_invoices(doctor, *MARCH)
+
+    assert result['cases_billed'] == 1
+    assert result['supplementary_hospitals'] == [hospital.pk]
+    supplement = result['invoices'][0]
+    assert supplement.supplement == 1
+    assert supplement.invoice_number != main.invoice_number
+    assert list(supplement.items.values_list('case_id', flat=True)) == [late.pk]
+    assert main.items.count() == 2
+    assert not SurgicalCase.objects.filter(created_by=doctor, is_billed=False).exists()
+
+    assert generate_invoices(doctor, *MARCH)['invoices'] == []
+    assert Invoice.objects.filter(doctor=doctor).count() == 2
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .views import InvoiceViewSet
+
 router = DefaultRouter()
-# router.register(r'invoices', views.InvoiceViewSet, basename='invoice')
-# router.register(r'items', views.InvoiceItemViewSet, basename='invoice-item')
+router.register(r'invoices', InvoiceViewSet, basename='invoice')
 
 urlpatterns = [
     path('', include(router.urls)),
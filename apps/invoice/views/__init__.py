@@ -1,11 +1,100 @@
-from rest_framework import viewsets
-
-# Ejemplo de vistas para facturación
-# class InvoiceViewSet(viewsets.ModelViewSet):
-#     queryset = Invoice.objects.all()
-#     serializer_class = InvoiceSerializer
-#     permission_classes = [IsAuthenticated]
-#     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-#     filterset_fields = ['status', 'patient', 'date']
-#     search_fields = ['invoice_number', 'patient__name']
-#     ordering_fields = ['date', 'total', 'due_date']
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.exports import EXPORT_CHUNK_SIZE, export_response
+
+from ..models import Invoice, InvoiceItem
+from ..serializers import (
+    GenerateInvoicesSerializer,
+    InvoiceListSerializer,
+    InvoiceSerializer,
+)
+from ..services import generate_invoices
+
+
+class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Facturas del médico autenticado.
+
+    Endpoints:
+    - GET /invoices/ - Listar facturas (filtros: status, hospital)
+    - GET /invoices/{id}/ - Detalle con líneas
+    - POST /invoices/generate/ - Facturar por lote los casos de un periodo
+    - GET /invoices/export/{csv|xlsx}/ - Exportar líneas de factura (streaming)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Invoice.objects.filter(
+            doctor=self.request.user
+        ).select_related('hospital')
+
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('items')
+
+        status_filter = self.request.query_params.get('status', None)
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        hospital_filter = self.request.query_params.get('hospital', None)
+        if hospital_filter:
+            queryset = queryset.filter(hospital_id=hospital_filter)
+
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return InvoiceListSerializer
+        return InvoiceSerializer
+
+    @action(detail=False, methods=['post'], url_path='generate')
+    def generate(self, request):
+        """
+        Generar facturas para todos los casos operados y no facturados del periodo.
+        Body: { "period_start": "2026-09-01", "period_end": "2026-09-30", "hospital_ids": [1, 2] }
+        """
+        serializer = GenerateInvoicesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = generate_invoices(request.user, **serializer.validated_data)
+
+        return Response({
+            'invoices': InvoiceListSerializer(result['invoices'], many=True).data,
+            'invoices_created': len(result['invoices']),
+            'cases_billed': result['cases_billed'],
+            'supplementary_hospitals': result['supplementary_hospitals'],
+        }, status=status.HTTP_201_CREATED if result['invoices'] else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='export/(?P<file_type>csv|xlsx)')
+    def export(self, request, file_type=None):
+        """Exportar las líneas de las facturas (acepta los mismos filtros que el listado)"""
+        status_labels = dict(Invoice.STATUS_CHOICES)
+
+        rows = InvoiceItem.objects.filter(
+            invoice__in=self.get_queryset().values('id')
+        ).order_by('-invoice__issue_date', 'invoice_id', 'id').values_list(
+            'invoice__invoice_number',
+            'invoice__issue_date',
+            'invoice__hospital__name',
+            'invoice__status',
+            'case_id',
+            'surgery_code',
+            'description',
+            'quantity',
+            'unit_price',
+            'total',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def format_rows():
+            for row in rows:
+                row = list(row)
+                row[3] = status_labels.get(row[3], row[3])
+                yield row
+
+        header = [
+            'Factura', 'Fecha de Emisión', 'Hospital', 'Estado', 'ID Caso',
+            'Código', 'Descripción', 'Cantidad', 'Precio Unitario', 'Total',
+        ]
+        return export_response(file_type, 'facturas', header, format_rows(), sheet_title='Facturas')
@@ -8,6 +8,7 @@ from .models import (
     CalculationHistory,
     SurgicalCase,
     CaseProcedure,
+    CaseDeletion,
 )
 
 
@@ -57,8 +58,8 @@ class FavoriteAdmin(admin.ModelAdmin):
 
 @admin.register(CalculationHistory)
 class CalculationHistoryAdmin(admin.ModelAdmin):
-    list_display = ['user', 'operation', 'hospital', 'calculated_value', 'calculated_at']
-    search_fields = ['user__username', 'operation__name', 'hospital__name']
+    list_display = ['user', 'surgery_code', 'operation', 'hospital', 'calculated_value', 'calculated_at']
+    search_fields = ['user__username', 'surgery_code', 'surgery_name', 'operation__name', 'hospital__name']
     list_filter = ['hospital', 'calculated_at']
     ordering = ['-calculated_at']
     raw_id_fields = ['user', 'operation', 'hospital']
@@ -150,3 +151,12 @@ class CaseProcedureAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     
     list_per_page = 50
+
+
+@admin.register(CaseDeletion)
+class CaseDeletionAdmin(admin.ModelAdmin):
+    list_display = ['case_id', 'user', 'deleted_at']
+    search_fields = ['case_id', 'user__username']
+    list_filter = ['deleted_at']
+    raw_id_fields = ['user']
+    ordering = ['-deleted_at']
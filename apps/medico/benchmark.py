@@ -0,0 +1,196 @@
+# apps/medico/benchmark.py
+
+"""
+Utilidades de medición de latencia para los comandos de benchmark.
+
+run_http() lanza `requests` peticiones GET contra un servidor real (gunicorn
+o runserver) con `concurrency` hilos, cada uno con su propia sesión
+keep-alive, y summarize() reduce los tiempos a percentiles. Se mide contra
+un servidor y no con el test client porque este desactiva el manejo de
+conexiones a la base de datos entre requests (close_old_connections), que
+es justamente lo que cambia con CONN_MAX_AGE.
+
+run_client() mide en proceso con el test client (incluye el conteo de
+consultas por request) los SCENARIOS de run_benchmarks, y
+compare_results() detecta regresiones entre dos corridas en JSON.
+"""
+import functools
+import threading
+import time
+
+import requests
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not sorted_values:
+        return None
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(durations, errors=0, elapsed=None):
+    """Resumen en milisegundos de una lista de duraciones en segundos"""
+    values = sorted(duration * 1000 for duration in durations)
+    summary = {
+        'requests': len(values) + errors,
+        'errors': errors,
+        'mean_ms': round(sum(values) / len(values), 2) if values else None,
+        'min_ms': round(values[0], 2) if values else None,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'max_ms': round(values[-1], 2) if values else None,
+    }
+    for name, fraction in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+        value = percentile(values, fraction)
+        summary[name] = round(value, 2) if value is not None else None
+    if elapsed:
+        summary['throughput_rps'] = round(len(values) / elapsed, 1)
+    return summary
+
+
+def run_http(url, headers=None, requests_count=200, concurrency=1, warmup=10, timeout=30,
+             method='get', data=None):
+    """
+    Medir `requests_count` peticiones a `url` (GET, o `method` con `data`
+    como JSON). Las primeras `warmup` peticiones de cada hilo no cuentan
+    (abren conexiones HTTP y calientan caches).
+    """
+    durations = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [requests_count]
+
+    def worker():
+        session = requests.Session()
+        session.headers.update(headers or {})
+        send = functools.partial(session.request, method.upper(), url, json=data, timeout=timeout)
+        for _ in range(warmup):
+            send().content
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = send()
+                response.content
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            duration = time.perf_counter() - start
+            with lock:
+                if ok:
+                    durations.append(duration)
+                else:
+                    errors[0] += 1
+        session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(max(concurrency, 1))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(durations, errors[0], time.perf_counter() - started)
+
+
+# Escenarios de run_benchmarks. `auth`: doctor, staff o None (anónimo);
+# `cached`: la vista usa cache_response (se mide también sin cache con --cold)
+SCENARIOS = [
+    {'name': 'cases-list', 'method': 'get', 'path': '/api/v1/medico/cases/', 'auth': 'doctor'},
+    {'name': 'cases-stats', 'method': 'get', 'path': '/api/v1/medico/cases/stats/', 'auth': 'doctor', 'cached': True},
+    {'name': 'hospitals', 'method': 'get', 'path': '/api/v1/medico/hospitals/', 'auth': 'doctor', 'cached': True},
+    {
+        'name': 'favorites-toggle',
+        'method': 'post',
+        'path': '/api/v1/medico/favorites/toggle/',
+        'data': {'surgery_code': '50010', 'surgery_name': 'Benchmark', 'specialty': 'Digestivo'},
+        'auth': 'doctor',
+    },
+    {'name': 'active-ads', 'method': 'get', 'path': '/api/v1/advertising/public/ads/?placement=sidebar', 'auth': None, 'cached': True},
+    {'name': 'admin-stats', 'method': 'get', 'path': '/api/admin/stats/', 'auth': 'staff'},
+    {'name': 'admin-activity', 'method': 'get', 'path': '/api/admin/activity/', 'auth': 'staff'},
+    {'name': 'admin-users', 'method': 'get', 'path': '/api/admin/users/', 'auth': 'staff'},
+    {'name': 'admin-hospitals', 'method': 'get', 'path': '/api/admin/hospitals/', 'auth': 'staff'},
+]
+
+
+def run_client(client, scenario, requests_count=50, warmup=5, clear_cache=False):
+    """
+    Medir `scenario` en proceso con el test client de DRF: latencia y
+    consultas SQL por request. Con clear_cache cada request encuentra la
+    cache vacía.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    method = getattr(client, scenario['method'])
+    kwargs = {'data': scenario['data'], 'format': 'json'} if scenario.get('data') else {}
+
+    for _ in range(warmup):
+        method(scenario['path'], **kwargs)
+
+    durations = []
+    queries = []
+    statuses = {}
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests_count):
+        if clear_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = method(scenario['path'], **kwargs)
+            duration = time.perf_counter() - start
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code >= 400:
+            errors += 1
+            continue
+        durations.append(duration)
+        queries.append(len(context))
+    elapsed = time.perf_counter() - started
+
+    result = summarize(durations, errors, elapsed)
+    result.update({
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'mean_queries': round(sum(queries) / len(queries), 1) if queries else None,
+        'max_queries': max(queries) if queries else None,
+        'bytes': len(response.content),
+    })
+    return result
+
+
+def compare_results(baseline, current, max_regression=0.25):
+    """
+    Regresiones de `current` respecto de `baseline` (resultados de
+    run_benchmarks): p50 más de `max_regression` más lento o más consultas.
+    """
+    previous = {scenario['name']: scenario for scenario in baseline.get('scenarios', [])}
+    regressions = []
+    for scenario in current['scenarios']:
+        before = previous.get(scenario['name'])
+        if not before:
+            continue
+        if before.get('p50_ms') and scenario.get('p50_ms'):
+            ratio = scenario['p50_ms'] / before['p50_ms'] - 1
+            if ratio > max_regression:
+                regressions.append({
+                    'scenario': scenario['name'],
+                    'metric': 'p50_ms',
+                    'before': before['p50_ms'],
+                    'after': scenario['p50_ms'],
+                    'change': round(ratio, 3),
+                })
+        if before.get('max_queries') is not None and scenario.get('max_queries') is not None:
+            if scenario['max_queries'] > before['max_queries']:
+                regressions.append({
+                    'scenario': scenario['name'],
+                    'metric': 'max_queries',
+                    'before': before['max_queries'],
+                    'after': scenario['max_queries'],
+                })
+    return regressions
@@ -0,0 +1,48 @@
+# apps/medico/caching.py
+
+"""
+Namespaces de cache de la app (ver core.cache).
+
+- Hospitales: nombre, ubicación y multiplicador, y los valores ya calculados
+  de los procedimientos. Cambia al guardar un hospital y al terminar una
+  revalorización.
+- Por usuario: sus casos (con procedimientos), sus favoritos de cirugías y
+  sus hospitales favoritos.
+
+Los receptores de apps/medico/models los incrementan; las rutas que no
+emiten señales (bulk_create, update) llaman a las funciones invalidate_*.
+"""
+from core.cache import bump_version
+
+HOSPITALS_NAMESPACE = 'medico:hospitals'
+
+
+def user_cases_namespace(user_id):
+    return f'medico:cases:{user_id}'
+
+
+def favorites_namespace(user_id):
+    return f'medico:favorites:{user_id}'
+
+
+def favorite_hospitals_namespace(user_id):
+    return f'medico:favorite-hospitals:{user_id}'
+
+
+def invalidate_hospitals():
+    bump_version(HOSPITALS_NAMESPACE)
+
+
+def invalidate_user_cases(user_id):
+    if user_id:
+        bump_version(user_cases_namespace(user_id))
+
+
+def invalidate_favorites(user_id):
+    if user_id:
+        bump_version(favorites_namespace(user_id))
+
+
+def invalidate_favorite_hospitals(user_id):
+    if user_id:
+        bump_version(favorite_hospitals_namespace(user_id))
@@ -0,0 +1,274 @@
+# apps/medico/case_batch.py
+
+"""
+Escritura en lote de casos para clientes offline (/cases/batch/).
+
+Un cliente que trabajó sin conexión envía todas sus operaciones (create,
+update, delete) en una sola llamada. Cada update/delete trae la versión
+(updated_at) que el cliente conocía; si el caso cambió desde entonces la
+operación se rechaza como conflicto y se devuelve la versión vigente.
+
+Todo se aplica en una transacción con consultas por lote, sin pasar por
+SurgicalCase.save():
+- una consulta (SELECT ... FOR UPDATE) para los casos referenciados, una
+  para sus procedimientos y una por hospitales y usuarios mencionados,
+- bulk_create de casos y procedimientos nuevos, bulk_update de los casos
+  editados y un DELETE por lote (caso por caso solo si alguno está
+  protegido por otra tabla; ver _delete_cases).
+
+Las operaciones inválidas no impiden aplicar las demás; la respuesta trae
+el resultado de cada una: created, updated, unchanged, deleted, conflict,
+not_found, forbidden, cannot_delete, duplicate o invalid.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import ProtectedError, Q, RestrictedError
+from django.utils import timezone
+
+from apps.communication.events import collect_case_events, publish_case_events
+
+from .caching import invalidate_user_cases
+from .models import CaseDeletion, CaseProcedure, Hospital, SurgicalCase
+from .pricing import get_pricing_engine, price_procedures
+from .serializers import BatchCaseSerializer
+
+User = get_user_model()
+
+
+def _preload(operations):
+    """Hospitales y usuarios mencionados en los datos del lote (2 consultas)"""
+    hospital_ids = set()
+    user_ids = set()
+    for operation in operations:
+        data = operation.get('data') or {}
+        for key, ids in (('hospital', hospital_ids), ('assistant_doctor', user_ids)):
+            try:
+                if data.get(key) is not None:
+                    ids.add(int(data[key]))
+            except (TypeError, ValueError):
+                pass
+
+    return {
+        'hospitals': Hospital.objects.in_bulk(hospital_ids) if hospital_ids else {},
+        'users': User.objects.in_bulk(user_ids) if user_ids else {},
+    }
+
+
+def _case_changes(case, attrs):
+    """Aplicar attrs a `case` y devolver los campos que cambiaron"""
+    changed = []
+    for attr, value in attrs.items():
+        field = SurgicalCase._meta.get_field(attr)
+        if getattr(case, field.attname) != (value.pk if hasattr(value, 'pk') else value):
+            setattr(case, attr, value)
+            changed.append(field.name)
+    return changed
+
+
+def _delete_cases(deletes, results):
+    """
+    Eliminar los casos de `deletes` con un DELETE por lote. Si un registro
+    con FK PROTECT/RESTRICT impide eliminar alguno, se reintenta caso por
+    caso (cada uno en su savepoint) y solo esos se reportan como
+    cannot_delete, sin deshacer el resto del lote. Retorna los eliminados.
+    """
+    try:
+        with transaction.atomic():
+            SurgicalCase.objects.filter(id__in=[case.pk for _, case in deletes]).delete()
+        return deletes
+    except (ProtectedError, RestrictedError):
+        pass
+
+    deleted = []
+    for index, case in deletes:
+        try:
+            with transaction.atomic():
+                SurgicalCase.objects.filter(pk=case.pk).delete()
+        except (ProtectedError, RestrictedError) as exc:
+            blocking = exc.protected_objects if isinstance(exc, ProtectedError) else exc.restricted_objects
+            names = sorted({str(obj._meta.verbose_name_plural) for obj in blocking})
+            results[index].update(
+                result='cannot_delete',
+                error=f"El caso está referenciado por: {', '.join(names)}",
+            )
+        else:
+            deleted.append((index, case))
+    return deleted
+
+
+def apply_batch(user, operations, context=None):
+    """
+    Aplicar `operations` (validated_data de CaseBatchSerializer) para `user`.
+    Retorna la lista de resultados en el orden recibido.
+    """
+    context = dict(context or {}, **_preload(operations))
+    results = [None] * len(operations)
+    now = timezone.now()
+
+    with transaction.atomic():
+        case_ids = {op['id'] for op in operations if op['op'] != 'create'}
+        cases = {}
+        if case_ids:
+            cases = SurgicalCase.objects.filter(
+                id__in=case_ids
+            ).filter(
+                Q(created_by=user) | Q(assistant_doctor=user)
+            ).select_related(
+                'assistant_doctor'
+            ).prefetch_related(
+                'procedures'
+            ).select_for_update(of=('self',)).in_bulk()
+
+        creates = []     # (índice, caso, procedimientos)
+        updates = []     # (índice, caso, campos, procedimientos, hospital_cambiado, estado anterior)
+        deletes = []     # (índice, caso)
+        seen = set()
+
+        for index, operation in enumerate(operations):
+            result = {'index': index, 'op': operation['op'], 'ref': operation.get('ref', '')}
+            results[index] = result
+
+            if operation['op'] == 'create':
+                serializer = BatchCaseSerializer(data=operation['data'], context=context)
+                if not serializer.is_valid():
+                    result.update(result='invalid', errors=serializer.errors)
+                    continue
+                attrs = dict(serializer.validated_data)
+                procedures = attrs.pop('procedures', [])
+                case = SurgicalCase(created_by=user, **attrs)
+                if case.assistant_doctor_id:
+                    case.assistant_notified_at = now
+                creates.append((index, case, procedures))
+                continue
+
+            case_id = operation['id']
+            result['id'] = case_id
+            case = cases.get(case_id)
+            if case_id in seen:
+                result['result'] = 'duplicate'
+                continue
+            seen.add(case_id)
+
+            if case is None:
+                result['result'] = 'not_found'
+            elif case.created_by_id != user.id:
+                result['result'] = 'forbidden'
+            elif case.updated_at != operation['version']:
+                result.update(result='conflict', version=case.updated_at)
+            elif operation['op'] == 'delete':
+                if case.can_be_deleted():
+                    deletes.append((index, case))
+                else:
+                    result['result'] = 'cannot_delete'
+            else:
+                serializer = BatchCaseSerializer(
+                    case, data=operation['data'], partial=True, context=context
+                )
+                if not serializer.is_valid():
+                    result.update(result='invalid', errors=serializer.errors)
+                    continue
+                attrs = dict(serializer.validated_data)
+                procedures = attrs.pop('procedures', None)
+                previous = SurgicalCase(
+                    pk=case.pk,
+                    assistant_doctor_id=case.assistant_doctor_id,
+                    assistant_accepted=case.assistant_accepted,
+                    status=case.status,
+                    is_operated=case.is_operated,
+                    is_billed=case.is_billed,
+                    is_paid=case.is_paid,
+                )
+                previous_hospital_id = case.hospital_id
+                fields = _case_changes(case, attrs)
+                if not fields and procedures is None:
+                    result.update(result='unchanged', version=case.updated_at)
+                    continue
+                if 'assistant_doctor' in fields:
+                    case.assistant_accepted = None
+                    case.assistant_notified_at = now if case.assistant_doctor_id else None
+                    fields += ['assistant_accepted', 'assistant_notified_at']
+                updates.append((
+                    index, case, fields, procedures,
+                    case.hospital_id != previous_hospital_id, previous,
+                ))
+
+        engine = get_pricing_engine()
+        new_procedures = []
+        events = []
+
+        # Creaciones
+        if creates:
+            created = SurgicalCase.objects.bulk_create([case for _, case, _ in creates])
+            for (index, _, procedures), case in zip(creates, created):
+                for order, procedure in enumerate(procedures):
+                    procedure.setdefault('order', order)
+                price_procedures(case.hospital_id, procedures, engine=engine)
+                new_procedures.extend(CaseProcedure(case=case, **data) for data in procedures)
+                results[index].update(result='created', id=case.pk, version=case.updated_at)
+                events.append((case, collect_case_events(None, case)))
+
+        # Ediciones
+        if updates:
+            replaced = []
+            repriced = []
+            for index, case, fields, procedures, hospital_changed, previous in updates:
+                case.updated_at = now
+                if procedures is not None:
+                    replaced.append(case.pk)
+                    for order, procedure in enumerate(procedures):
+                        procedure['order'] = order
+                    price_procedures(case.hospital_id, procedures, engine=engine)
+                    new_procedures.extend(CaseProcedure(case=case, **data) for data in procedures)
+                elif hospital_changed:
+                    existing = list(case.procedures.all())
+                    price_procedures(case.hospital_id, existing, engine=engine)
+                    for procedure in existing:
+                        procedure.updated_at = now
+                    repriced.extend(existing)
+                results[index].update(result='updated', version=now)
+                events.append((case, collect_case_events(previous, case)))
+
+            update_fields = {'updated_at'}
+            for _, _, fields, _, _, _ in updates:
+                update_fields.update(fields)
+            SurgicalCase.objects.bulk_update([case for _, case, *_ in updates], sorted(update_fields))
+
+            if replaced:
+                CaseProcedure.objects.filter(case_id__in=replaced).delete()
+            if repriced:
+                CaseProcedure.objects.bulk_update(
+                    repriced, ['rvu', 'hospital_factor', 'calculated_value', 'updated_at']
+                )
+
+            # Tombstones para los ayudantes que dejan de ver el caso
+            CaseDeletion.objects.bulk_create([
+                CaseDeletion(case_id=case.pk, user_id=previous.assistant_doctor_id, deleted_at=now)
+                for _, case, _, _, _, previous in updates
+                if previous.assistant_doctor_id not in (None, case.assistant_doctor_id)
+            ])
+
+        if new_procedures:
+            CaseProcedure.objects.bulk_create(new_procedures, batch_size=1000)
+
+        # Eliminaciones
+        if deletes:
+            deletes = _delete_cases(deletes, results)
+            CaseDeletion.objects.bulk_create([
+                CaseDeletion(case_id=case.pk, user_id=user_id, deleted_at=now)
+                for _, case in deletes
+                for user_id in dict.fromkeys([case.created_by_id, case.assistant_doctor_id])
+                if user_id
+            ])
+            for index, _ in deletes:
+                results[index]['result'] = 'deleted'
+
+        # bulk_create/bulk_update no emiten señales ni pasan por save()
+        if creates or updates or deletes:
+            transaction.on_commit(lambda: invalidate_user_cases(user.pk))
+        for case, case_events in events:
+            if case_events:
+                transaction.on_commit(
+                    lambda case=case, case_events=case_events: publish_case_events(case, case_events)
+                )
+
+    return results
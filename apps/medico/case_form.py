@@ -0,0 +1,90 @@
+# apps/medico/case_form.py
+
+"""
+Datos del formulario de casos por usuario (favoritos, códigos frecuentes y
+hospitales recientes) en una sola respuesta cacheada.
+
+Con cache vacía se arma con tres consultas: los favoritos y dos consultas
+agrupadas (códigos más usados en CaseProcedure y hospitales de sus casos).
+La llave depende de los namespaces de casos y favoritos del usuario (ver
+apps/medico/caching), que se incrementan con señales al escribir Favorite,
+CaseProcedure o SurgicalCase y, en las rutas que no emiten señales
+(bulk_create), explícitamente; y de la versión del motor de precios, que
+cambia cuando se modifica cualquier hospital (nombre o multiplicador).
+"""
+from django.db.models import Count, Max
+
+from core.cache import get_or_set, versioned_key
+
+from .caching import favorites_namespace, user_cases_namespace
+from .models import CaseProcedure, Favorite, SurgicalCase
+from .pricing import PRICING_NAMESPACE
+
+CASE_FORM_CACHE_TIMEOUT = 60 * 60 * 24
+TOP_CODES_LIMIT = 20
+RECENT_HOSPITALS_LIMIT = 10
+
+
+def case_form_cache_key(user_id):
+    namespaces = [user_cases_namespace(user_id), favorites_namespace(user_id), PRICING_NAMESPACE]
+    return versioned_key(namespaces, 'case-form')
+
+
+def build_case_form(user):
+    """Armar el paquete sin cache"""
+    favorites = list(
+        Favorite.objects.filter(user=user).values('surgery_code', 'surgery_name', 'specialty')
+    )
+    favorite_codes = {favorite['surgery_code'] for favorite in favorites}
+
+    top_codes = CaseProcedure.objects.filter(
+        case__created_by=user
+    ).values('surgery_code').annotate(
+        surgery_name=Max('surgery_name'),
+        specialty=Max('specialty'),
+        rvu=Max('rvu'),
+        uses=Count('id'),
+        last_used=Max('case__surgery_date'),
+    ).order_by('-uses', '-last_used')[:TOP_CODES_LIMIT]
+
+    recent_hospitals = SurgicalCase.objects.filter(
+        created_by=user
+    ).values('hospital_id').annotate(
+        name=Max('hospital__name'),
+        rate_multiplier=Max('hospital__rate_multiplier'),
+        cases=Count('id'),
+        last_used=Max('surgery_date'),
+    ).order_by('-last_used')[:RECENT_HOSPITALS_LIMIT]
+
+    return {
+        'favorites': favorites,
+        'top_codes': [
+            {
+                'surgery_code': row['surgery_code'],
+                'surgery_name': row['surgery_name'],
+                'specialty': row['specialty'],
+                'rvu': row['rvu'],
+                'uses': row['uses'],
+                'last_used': row['last_used'],
+                'is_favorite': row['surgery_code'] in favorite_codes,
+            }
+            for row in top_codes
+        ],
+        'recent_hospitals': [
+            {
+                'id': row['hospital_id'],
+                'name': row['name'],
+                'rate_multiplier': row['rate_multiplier'],
+                'cases': row['cases'],
+                'last_used': row['last_used'],
+            }
+            for row in recent_hospitals
+        ],
+    }
+
+
+def get_case_form(user):
+    """build_case_form() con cache por usuario"""
+    return get_or_set(
+        case_form_cache_key(user.pk), lambda: build_case_form(user), CASE_FORM_CACHE_TIMEOUT
+    )
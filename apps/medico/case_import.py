@@ -0,0 +1,334 @@
+# apps/medico/case_import.py
+
+"""
+Importación masiva de casos quirúrgicos desde CSV / XLSX.
+
+Pensada para médicos que migran su historial desde hojas de cálculo:
+
+1. El archivo se lee fila a fila (core.imports.iter_rows).
+2. Hospitales y códigos de cirugía se resuelven contra mapas en memoria
+   (una consulta de hospitales + el catálogo de public/surgeries).
+3. Todas las filas se validan antes de escribir; los duplicados se
+   detectan con una sola consulta sobre los casos existentes.
+4. Las filas válidas se valorizan con el motor de precios
+   (apps.medico.pricing) y se insertan con bulk_create (casos y
+   procedimientos) en transacciones por bloques de IMPORT_CHUNK_SIZE casos.
+
+El resultado incluye los errores por fila; las filas con error no se
+importan, el resto sí.
+"""
+import re
+from datetime import datetime, time
+
+from django.db import transaction
+from django.utils.dateparse import parse_time
+
+from core.imports import (
+    clean_text,
+    normalize_header,
+    parse_date_value,
+    resolve_columns,
+)
+
+from .caching import invalidate_user_cases
+from .catalog import get_catalog
+from .models import CaseProcedure, Hospital, SurgicalCase
+from .pricing import get_pricing_engine
+
+IMPORT_CHUNK_SIZE = 500
+MAX_PATIENT_AGE = 150
+
+# Nombres aceptados para cada columna (encabezados normalizados)
+CASE_IMPORT_COLUMNS = {
+    'patient_name': ['patient_name', 'paciente', 'nombre_paciente', 'nombre_del_paciente', 'nombre'],
+    'patient_id': ['patient_id', 'id_paciente', 'expediente', 'no_expediente', 'dpi'],
+    'patient_age': ['patient_age', 'edad'],
+    'patient_gender': ['patient_gender', 'genero', 'sexo'],
+    'hospital': ['hospital', 'hospital_id', 'nombre_hospital'],
+    'surgery_date': ['surgery_date', 'fecha_cirugia', 'fecha_de_cirugia', 'fecha'],
+    'surgery_time': ['surgery_time', 'hora', 'hora_inicio'],
+    'codes': ['codes', 'surgery_codes', 'codigos', 'codigo', 'surgery_code', 'codigo_cirugia', 'procedimientos'],
+    'status': ['status', 'estado'],
+    'diagnosis': ['diagnosis', 'diagnostico'],
+    'notes': ['notes', 'notas', 'observaciones'],
+}
+
+REQUIRED_COLUMNS = ['patient_name', 'hospital', 'surgery_date', 'codes']
+
+# Estado -> banderas de proceso (operado / facturado / cobrado)
+STATUS_FLAGS = {
+    'scheduled': (False, False, False),
+    'completed': (True, False, False),
+    'billed': (True, True, False),
+    'paid': (True, True, True),
+    'cancelled': (False, False, False),
+}
+
+GENDER_ALIASES = {
+    'm': 'M', 'masculino': 'M', 'hombre': 'M',
+    'f': 'F', 'femenino': 'F', 'mujer': 'F',
+    'o': 'O', 'otro': 'O',
+}
+
+CODE_SEPARATORS = re.compile(r'[;,|/\s]+')
+
+
+class CaseImportFormatError(ValueError):
+    """El archivo no tiene las columnas mínimas"""
+
+
+def _status_aliases():
+    aliases = {}
+    for value, label in SurgicalCase.STATUS_CHOICES:
+        aliases[value] = value
+        aliases[normalize_header(label)] = value
+    aliases.update({'operado': 'completed', 'realizado': 'completed', 'cobrado': 'paid'})
+    return aliases
+
+
+def _hospital_lookup():
+    """{id: hospital} y {nombre normalizado: hospital} con una sola consulta"""
+    by_id = {}
+    by_name = {}
+    for hospital in Hospital.objects.only('id', 'name'):
+        by_id[str(hospital.id)] = hospital
+        by_name[normalize_header(hospital.name)] = hospital
+    return by_id, by_name
+
+
+def _parse_time(value):
+    """Aceptar time/datetime de XLSX o texto HH:MM[:SS]"""
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    text = clean_text(value)
+    if not text:
+        return None
+    try:
+        return parse_time(text)
+    except ValueError:
+        return None
+
+
+def _dedupe_key(patient_id, patient_name, surgery_date, hospital_id):
+    return (
+        (patient_id or '').lower() or normalize_header(patient_name),
+        surgery_date,
+        hospital_id,
+    )
+
+
+def validate_rows(rows):
+    """
+    Validar todas las filas sin escribir nada.
+
+    Retorna (valid, errors): valid es una lista de dicts listos para crear
+    el caso y sus procedimientos; errors es [{'row': n, 'errors': {...}}].
+    """
+    catalog = get_catalog()
+    hospitals_by_id, hospitals_by_name = _hospital_lookup()
+    status_aliases = _status_aliases()
+
+    valid = []
+    errors = []
+    columns = None
+
+    # La fila 1 es el encabezado
+    for row_number, row in enumerate(rows, start=2):
+        if columns is None:
+            columns = resolve_columns(row.keys(), CASE_IMPORT_COLUMNS)
+            missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+            if missing:
+                raise CaseImportFormatError(
+                    f"Faltan columnas obligatorias: {', '.join(missing)}"
+                )
+
+        def value(name):
+            return row.get(columns[name]) if name in columns else None
+
+        row_errors = {}
+
+        patient_name = clean_text(value('patient_name'))
+        if not patient_name:
+            row_errors['patient_name'] = 'El nombre del paciente es requerido'
+
+        hospital_value = clean_text(value('hospital'))
+        hospital = (
+            hospitals_by_id.get(hospital_value)
+            or hospitals_by_name.get(normalize_header(hospital_value))
+        )
+        if hospital is None:
+            row_errors['hospital'] = f"Hospital no encontrado: {hospital_value or '(vacío)'}"
+
+        surgery_date = parse_date_value(value('surgery_date'))
+        if surgery_date is None:
+            row_errors['surgery_date'] = 'Fecha inválida (use YYYY-MM-DD o dd/mm/yyyy)'
+
+        surgery_time = None
+        if clean_text(value('surgery_time')):
+            surgery_time = _parse_time(value('surgery_time'))
+            if surgery_time is None:
+                row_errors['surgery_time'] = 'Hora inválida (use HH:MM)'
+
+        patient_age = None
+        age_text = clean_text(value('patient_age'))
+        if age_text:
+            try:
+                patient_age = int(float(age_text))
+            except (ValueError, OverflowError):
+                # 'abc', 'nan' o 'inf'
+                pass
+            if patient_age is None or not 0 <= patient_age <= MAX_PATIENT_AGE:
+                patient_age = None
+                row_errors['patient_age'] = 'Edad inválida'
+
+        patient_gender = None
+        if clean_text(value('patient_gender')):
+            patient_gender = GENDER_ALIASES.get(normalize_header(value('patient_gender')))
+            if patient_gender is None:
+                row_errors['patient_gender'] = 'Género inválido (M, F u O)'
+
+        case_status = 'completed'
+        if clean_text(value('status')):
+            case_status = status_aliases.get(normalize_header(value('status')))
+            if case_status is None:
+                row_errors['status'] = f"Estado inválido: {clean_text(value('status'))}"
+
+        codes = [code for code in CODE_SEPARATORS.split(clean_text(value('codes'))) if code]
+        procedures = []
+        if not codes:
+            row_errors['codes'] = ['Debe haber al menos un código de cirugía']
+        for code in codes:
+            entry = catalog.get(code)
+            if entry is None:
+                row_errors.setdefault('codes', []).append(f'Código no encontrado: {code}')
+            elif entry['rvu'] is None:
+                row_errors.setdefault('codes', []).append(f'El código {code} no tiene RVU fijo')
+            else:
+                procedures.append(entry)
+
+        if row_errors:
+            errors.append({'row': row_number, 'errors': row_errors})
+            continue
+
+        is_operated, is_billed, is_paid = STATUS_FLAGS[case_status]
+        valid.append({
+            'row': row_number,
+            'case': {
+                'patient_name': patient_name[:255],
+                'patient_id': clean_text(value('patient_id'))[:100] or None,
+                'patient_age': patient_age,
+                'patient_gender': patient_gender,
+                'hospital': hospital,
+                'surgery_date': surgery_date,
+                'surgery_time': surgery_time,
+                'status': case_status,
+                'is_operated': is_operated,
+                'is_billed': is_billed,
+                'is_paid': is_paid,
+                'diagnosis': clean_text(value('diagnosis')) or None,
+                'notes': clean_text(value('notes')) or None,
+            },
+            'procedures': procedures,
+        })
+
+    return valid, errors
+
+
+def exclude_duplicates(doctor, valid, errors):
+    """
+    Descartar filas que ya existen como caso del médico (mismo paciente,
+    fecha y hospital) o que se repiten dentro del archivo. Una sola consulta
+    acotada al rango de fechas del archivo.
+    """
+    if not valid:
+        return valid
+
+    dates = [item['case']['surgery_date'] for item in valid]
+    existing = {
+        _dedupe_key(*values)
+        for values in SurgicalCase.objects.filter(
+            created_by=doctor,
+            surgery_date__gte=min(dates),
+            surgery_date__lte=max(dates),
+        ).values_list('patient_id', 'patient_name', 'surgery_date', 'hospital_id')
+    }
+
+    unique = []
+    for item in valid:
+        case = item['case']
+        key = _dedupe_key(case['patient_id'], case['patient_name'], case['surgery_date'], case['hospital'].id)
+        if key in existing:
+            errors.append({
+                'row': item['row'],
+                'errors': {'duplicate': 'El caso ya existe (mismo paciente, fecha y hospital)'},
+            })
+            continue
+        existing.add(key)
+        unique.append(item)
+
+    return unique
+
+
+def _build_procedures(case, entries, engine):
+    procedures = []
+    for order, entry in enumerate(entries):
+        rvu, factor, value = engine.price(case.hospital_id, entry['code'], rvu=entry['rvu'])
+        procedures.append(CaseProcedure(
+            case=case,
+            surgery_code=entry['code'],
+            surgery_name=entry['name'][:500],
+            specialty=entry['specialty'][:100],
+            grupo=entry['grupo'][:100] or None,
+            rvu=rvu,
+            hospital_factor=factor,
+            calculated_value=value,
+            order=order,
+        ))
+    return procedures
+
+
+def import_cases(doctor, rows, dry_run=False):
+    """
+    Importar los casos de `rows` (dicts de core.imports.iter_rows) para `doctor`.
+
+    Retorna {'rows', 'created', 'procedures_created', 'errors'}.
+    """
+    valid, errors = validate_rows(rows)
+    valid = exclude_duplicates(doctor, valid, errors)
+    errors.sort(key=lambda error: error['row'])
+
+    result = {
+        'rows': len(valid) + len(errors),
+        'created': 0,
+        'procedures_created': 0,
+        'errors': errors,
+    }
+
+    if dry_run:
+        result['created'] = len(valid)
+        result['procedures_created'] = sum(len(item['procedures']) for item in valid)
+        return result
+
+    engine = get_pricing_engine()
+    for start in range(0, len(valid), IMPORT_CHUNK_SIZE):
+        chunk = valid[start:start + IMPORT_CHUNK_SIZE]
+        with transaction.atomic():
+            cases = SurgicalCase.objects.bulk_create([
+                SurgicalCase(created_by=doctor, **item['case'])
+                for item in chunk
+            ])
+            procedures = []
+            for case, item in zip(cases, chunk):
+                procedures.extend(_build_procedures(case, item['procedures'], engine))
+            CaseProcedure.objects.bulk_create(procedures, batch_size=1000)
+
+        result['created'] += len(cases)
+        result['procedures_created'] += len(procedures)
+
+    # bulk_create no emite señales
+    if result['created']:
+        invalidate_user_cases(doctor.pk)
+
+    return result
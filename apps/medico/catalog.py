@@ -0,0 +1,67 @@
+# apps/medico/catalog.py
+
+"""
+Catálogo de procedimientos del lado del servidor.
+
+Es el mismo catálogo que consume el frontend (CSVs en public/surgeries/ con
+columnas codigo, cirugia, rvu, especialidad, grupo), cargado una sola vez por
+proceso en un dict indexado por código para búsquedas O(1).
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+
+def _parse_rvu(value):
+    try:
+        rvu = Decimal((value or '').strip())
+    except InvalidOperation:
+        return None
+    return rvu if rvu.is_finite() else None
+
+
+def _catalog_dir():
+    return Path(getattr(
+        settings, 'SURGERY_CATALOG_DIR', Path(settings.BASE_DIR) / 'public' / 'surgeries'
+    ))
+
+
+@lru_cache(maxsize=1)
+def get_catalog():
+    """
+    {codigo: entrada} con todos los CSVs del catálogo. Cada entrada es un
+    dict con code, name, rvu, specialty y grupo; rvu es None para los
+    códigos 'BR' (por reporte) / 'RNE' sin valor fijo.
+
+    Un mismo código puede aparecer en el CSV general de la especialidad y en
+    el de su grupo; se conserva la primera aparición (orden alfabético de
+    rutas) para que el resultado sea determinista.
+    """
+    catalog = {}
+    for path in sorted(_catalog_dir().rglob('*.csv')):
+        with open(path, encoding='utf-8-sig', newline='') as csv_file:
+            for row in csv.DictReader(csv_file):
+                code = (row.get('codigo') or '').strip()
+                if not code or code in catalog:
+                    continue
+                catalog[code] = {
+                    'code': code,
+                    'name': (row.get('cirugia') or '').strip(),
+                    'rvu': _parse_rvu(row.get('rvu')),
+                    'specialty': (row.get('especialidad') or '').strip(),
+                    'grupo': (row.get('grupo') or '').strip(),
+                }
+    return catalog
+
+
+def get_entry(code):
+    """Entrada del catálogo para `code` o None si no existe"""
+    return get_catalog().get(str(code).strip())
+
+
+def clear_catalog_cache():
+    """Forzar la recarga del catálogo (p. ej. tras actualizar los CSVs)"""
+    get_catalog.cache_clear()
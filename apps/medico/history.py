@@ -0,0 +1,179 @@
+# apps/medico/history.py
+
+"""
+Registro diferido (write-behind) del historial de la calculadora.
+
+La calculadora es la acción más frecuente de la app, así que registrar cada
+cálculo no debe costar un INSERT en la petición. record_calculation() solo
+agrega el registro a un buffer en memoria del proceso; el buffer se vuelca
+con un único bulk_create cuando:
+
+- alcanza CALCULATION_HISTORY_FLUSH_SIZE registros,
+- pasan CALCULATION_HISTORY_FLUSH_INTERVAL segundos (hilo en segundo plano),
+- o el proceso termina (atexit).
+
+Si el volcado falla, el lote no se descarta:
+- base de datos no disponible (OperationalError/InterfaceError): los
+  registros vuelven al buffer (hasta CALCULATION_HISTORY_MAX_BUFFER) y se
+  reintenta en el siguiente intervalo;
+- error de datos (p. ej. el hospital se eliminó después de validarlo): se
+  reintenta fila por fila y solo se descartan las filas que fallan.
+
+Con CALCULATION_HISTORY_BUFFERED = False cada registro se inserta al
+momento (útil en tests y comandos).
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, close_old_connections, transaction
+
+from .models import CalculationHistory
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 5
+DEFAULT_MAX_BUFFER = 10000
+
+# Errores que indican que la base no está disponible (reintentar el lote)
+UNAVAILABLE_ERRORS = (OperationalError, InterfaceError)
+
+
+class CalculationRecorder:
+    """Buffer de CalculationHistory con volcado por tamaño, tiempo y salida"""
+
+    def __init__(self, flush_size=DEFAULT_FLUSH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_buffer=DEFAULT_MAX_BUFFER):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._retry_at = 0
+
+    def record(self, entry):
+        """Encolar un CalculationHistory (sin guardar)"""
+        with self._lock:
+            self._buffer.append(entry)
+            pending = len(self._buffer)
+            self._ensure_thread()
+
+        # Tras un fallo de conexión el reintento queda al hilo de fondo
+        if pending >= self.flush_size and time.monotonic() >= self._retry_at:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """Insertar todo lo pendiente con un único bulk_create"""
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+
+            try:
+                CalculationHistory.objects.bulk_create(entries, batch_size=500)
+            except UNAVAILABLE_ERRORS:
+                logger.warning(
+                    'Base de datos no disponible; %s cálculos quedan en el buffer', len(entries),
+                    exc_info=True,
+                )
+                self._requeue(entries)
+                return 0
+            except DatabaseError:
+                return self._insert_one_by_one(entries)
+            self._retry_at = 0
+            return len(entries)
+
+    def _insert_one_by_one(self, entries):
+        """Insertar fila por fila descartando solo las que la base rechaza"""
+        saved = 0
+        dropped = 0
+        for position, entry in enumerate(entries):
+            try:
+                with transaction.atomic():
+                    CalculationHistory.objects.bulk_create([entry])
+            except UNAVAILABLE_ERRORS:
+                self._requeue(entries[position:])
+                break
+            except DatabaseError:
+                dropped += 1
+                logger.exception(
+                    'Cálculo descartado del historial (usuario %s, hospital %s, código %s)',
+                    entry.user_id, entry.hospital_id, entry.surgery_code,
+                )
+            else:
+                saved += 1
+        if dropped:
+            logger.error('%s de %s cálculos descartados del historial', dropped, len(entries))
+        return saved
+
+    def _requeue(self, entries):
+        """Devolver `entries` al inicio del buffer, sin superar max_buffer"""
+        self._retry_at = time.monotonic() + self.flush_interval
+        with self._lock:
+            self._buffer = entries + self._buffer
+            overflow = len(self._buffer) - self.max_buffer
+            if overflow > 0:
+                # Se descartan los más antiguos para acotar la memoria
+                del self._buffer[:overflow]
+        if overflow > 0:
+            logger.error('Buffer del historial lleno: %s cálculos descartados', overflow)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='calculation-history-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self.pending():
+                close_old_connections()
+                self.flush()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = CalculationRecorder(
+                    flush_size=getattr(settings, 'CALCULATION_HISTORY_FLUSH_SIZE', DEFAULT_FLUSH_SIZE),
+                    flush_interval=getattr(settings, 'CALCULATION_HISTORY_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL),
+                    max_buffer=getattr(settings, 'CALCULATION_HISTORY_MAX_BUFFER', DEFAULT_MAX_BUFFER),
+                )
+                atexit.register(_recorder.flush)
+    return _recorder
+
+
+def record_calculation(**fields):
+    """Registrar un cálculo (diferido salvo CALCULATION_HISTORY_BUFFERED = False)"""
+    entry = CalculationHistory(**fields)
+    if not getattr(settings, 'CALCULATION_HISTORY_BUFFERED', True):
+        entry.save()
+        return entry
+
+    get_recorder().record(entry)
+    return entry
+
+
+def flush_calculations():
+    """Volcar lo pendiente de este proceso (p. ej. antes de leer el historial)"""
+    if _recorder is None:
+        return 0
+    return _recorder.flush()
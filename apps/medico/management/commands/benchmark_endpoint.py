@@ -0,0 +1,96 @@
+"""
+Management command para medir la latencia (p50/p95/p99) de un endpoint.
+
+Se ejecuta contra un servidor ya levantado, autenticado con un JWT del
+usuario indicado. Para comparar conexiones a la base de datos, levantar
+gunicorn con cada configuración y medir lo mismo:
+
+    DB_CONN_MAX_AGE=0 gunicorn            # una conexión nueva por request
+    python manage.py benchmark_endpoint --user medico@example.com --label sin-persistencia
+
+    DB_CONN_MAX_AGE=60 gunicorn           # conexiones persistentes
+    python manage.py benchmark_endpoint --user medico@example.com --label persistente
+
+Uso:
+    python manage.py benchmark_endpoint --path /api/v1/medico/cases/ --requests 500 --concurrency 4 --json
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.medico.benchmark import run_http
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de un endpoint contra un servidor en ejecución'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='Servidor a medir (por defecto http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--path',
+            default='/api/v1/medico/cases/',
+            help='Endpoint a medir (por defecto /api/v1/medico/cases/)',
+        )
+        parser.add_argument(
+            '--user',
+            help='Usuario autenticado (email, username o id); por defecto el primero con casos',
+        )
+        parser.add_argument('--requests', type=int, default=200, help='Peticiones medidas')
+        parser.add_argument('--concurrency', type=int, default=1, help='Hilos concurrentes')
+        parser.add_argument('--warmup', type=int, default=10, help='Peticiones previas por hilo')
+        parser.add_argument('--label', default='', help='Etiqueta del resultado (p. ej. la configuración)')
+        parser.add_argument('--json', action='store_true', help='Salida en JSON')
+
+    def get_user(self, identifier):
+        users = User.objects.all()
+        if identifier is None:
+            user = users.filter(created_cases__isnull=False).distinct().order_by('id').first() or users.order_by('id').first()
+        elif identifier.isdigit():
+            user = users.filter(id=int(identifier)).first()
+        else:
+            user = users.filter(email=identifier).first() or users.filter(username=identifier).first()
+        if user is None:
+            raise CommandError('Usuario no encontrado')
+        return user
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        database = connection.settings_dict
+        url = options['base_url'].rstrip('/') + options['path']
+
+        result = {
+            'label': options['label'],
+            'url': url,
+            'user': user.pk,
+            'concurrency': options['concurrency'],
+            # Configuración local; debe coincidir con la del servidor medido
+            'conn_max_age': database.get('CONN_MAX_AGE'),
+            'conn_health_checks': database.get('CONN_HEALTH_CHECKS'),
+        }
+        result.update(run_http(
+            url,
+            headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'},
+            requests_count=options['requests'],
+            concurrency=options['concurrency'],
+            warmup=options['warmup'],
+        ))
+
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"\n{result['label'] or url}"))
+        self.stdout.write(f"  Peticiones: {result['requests']} ({result['errors']} errores)")
+        self.stdout.write(
+            f"  p50: {result['p50_ms']} ms  p95: {result['p95_ms']} ms  p99: {result['p99_ms']} ms"
+        )
+        self.stdout.write(f"  Throughput: {result.get('throughput_rps')} req/s")
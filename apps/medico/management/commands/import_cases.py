@@ -0,0 +1,67 @@
+"""
+Management command para importar el historial de casos de un médico.
+
+Lee un archivo CSV o XLSX (una fila por caso, códigos de cirugía separados
+por ";") y crea los casos y sus procedimientos por lotes. Las filas con
+error se listan y no se importan.
+
+Uso:
+    python manage.py import_cases historial.xlsx --user dr.perez
+    python manage.py import_cases historial.csv --user 12 --dry-run
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.medico.case_import import CaseImportFormatError, import_cases
+from core.imports import ImportFormatError, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Importa casos quirúrgicos desde un archivo CSV/XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ruta del archivo (.csv o .xlsx)')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username o id del médico dueño de los casos',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Valida el archivo sin crear casos',
+        )
+
+    def handle(self, *args, **options):
+        lookup = {'pk': options['user']} if options['user'].isdigit() else {'username': options['user']}
+        try:
+            doctor = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"Usuario no encontrado: {options['user']}")
+
+        path = options['path']
+        try:
+            with open(path, 'rb') as cases_file:
+                result = import_cases(doctor, iter_rows(cases_file, path), dry_run=options['dry_run'])
+        except OSError as exc:
+            raise CommandError(f'No se pudo abrir el archivo: {exc}')
+        except (ImportFormatError, CaseImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            details = '; '.join(
+                ', '.join(messages) if isinstance(messages, list) else messages
+                for messages in error['errors'].values()
+            )
+            self.stdout.write(f"  - Fila {error['row']}: {details}")
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {prefix}{result['created']} de {result['rows']} caso(s) importados "
+                f"({result['procedures_created']} procedimiento(s)), "
+                f"{len(result['errors'])} fila(s) con error"
+            )
+        )
@@ -0,0 +1,55 @@
+"""
+Management command para aplicar la retención de CaseDeletion.
+
+Los registros de casos eliminados solo sirven a la sincronización
+incremental (/cases/changes/); pasado CASE_DELETION_RETENTION_DAYS se
+borran en lotes y los tokens más antiguos reciben 410 (resincronizar todo).
+Debe ejecutarse periódicamente (ej: cronjob diario).
+
+Uso:
+    python manage.py purge_case_deletions
+    python manage.py purge_case_deletions --batch-size 5000 --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.medico.models import CaseDeletion
+from apps.medico.sync import deletion_retention, purge_case_deletions
+
+
+class Command(BaseCommand):
+    help = 'Elimina en lotes los registros de casos eliminados más antiguos que la retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Filas eliminadas por lote (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar lo que se eliminaría sin hacer cambios',
+        )
+
+    def handle(self, *args, **options):
+        retention = deletion_retention()
+
+        if options['dry_run']:
+            count = CaseDeletion.objects.filter(
+                deleted_at__lt=timezone.now() - retention
+            ).count()
+            self.stdout.write(
+                self.style.WARNING(
+                    f'[DRY RUN] Se eliminarían {count} registros de más de {retention.days} días'
+                )
+            )
+            return
+
+        total_deleted = purge_case_deletions(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ Se eliminaron {total_deleted} registros de casos eliminados de más de {retention.days} días'
+            )
+        )
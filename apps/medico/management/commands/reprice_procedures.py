@@ -0,0 +1,72 @@
+"""
+Management command para revalorizar procedimientos no facturados.
+
+Aplica el multiplicador vigente de cada hospital a los procedimientos de
+casos aún no facturados (un UPDATE por hospital). Se ejecuta solo al
+cambiar Hospital.rate_multiplier; este comando sirve para forzarlo o para
+revisar el impacto antes con --dry-run.
+
+Uso:
+    python manage.py reprice_procedures --hospital 3 --dry-run
+    python manage.py reprice_procedures --since 2026-01-01
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.medico.models import Hospital
+from apps.medico.repricing import reprice_hospital
+
+
+class Command(BaseCommand):
+    help = 'Revaloriza los procedimientos no facturados con el multiplicador vigente del hospital'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hospital',
+            type=int,
+            action='append',
+            dest='hospitals',
+            help='Hospital (id). Puede repetirse; por defecto todos.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Solo casos con fecha de cirugía desde YYYY-MM-DD',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Muestra el impacto sin actualizar',
+        )
+
+    def handle(self, *args, **options):
+        date_from = None
+        if options['since']:
+            date_from = parse_date(options['since'])
+            if date_from is None:
+                raise CommandError('--since debe tener formato YYYY-MM-DD')
+
+        hospitals = Hospital.objects.order_by('id')
+        if options['hospitals']:
+            hospitals = hospitals.filter(id__in=options['hospitals'])
+
+        total_procedures = 0
+        total_delta = 0
+        for hospital in hospitals:
+            result = reprice_hospital(hospital, date_from=date_from, dry_run=options['dry_run'])
+            if not result['procedures']:
+                continue
+
+            total_procedures += result['procedures']
+            total_delta += result['delta']
+            self.stdout.write(
+                f"  - {hospital.name} (x{result['factor']}): {result['procedures']} procedimiento(s) "
+                f"en {result['cases']} caso(s), {result['total_before']} -> {result['total_after']} "
+                f"({result['delta']:+})"
+            )
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {prefix}{total_procedures} procedimiento(s) revalorizados, delta total {total_delta:+}'
+            )
+        )
@@ -0,0 +1,188 @@
+"""
+Management command para medir los endpoints principales con datos de volumen.
+
+Corre los escenarios de apps/medico/benchmark.SCENARIOS (casos, stats,
+hospitales, toggle de favoritos, anuncios activos y dashboard de admin) y
+escribe el resultado en JSON: commit, base de datos, volúmenes y, por
+escenario, p50/p95/p99, throughput y consultas por request. Con --compare
+falla si algún escenario es más lento que la corrida de referencia o hace
+más consultas.
+
+Por defecto mide en proceso con el test client (sin red, cuenta consultas);
+con --base-url mide contra un servidor levantado (sin conteo de consultas).
+
+Uso:
+    python manage.py seed_benchmark --scale 0.01
+    python manage.py run_benchmarks --output bench/$(git rev-parse --short HEAD).json
+    python manage.py run_benchmarks --compare bench/main.json --max-regression 0.2
+    python manage.py run_benchmarks --base-url http://127.0.0.1:8000 --concurrency 4
+"""
+import datetime
+import json
+import subprocess
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.medico.benchmark import SCENARIOS, compare_results, run_client, run_http
+from apps.medico.models import CaseProcedure, Hospital, SurgicalCase
+
+User = get_user_model()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Mide los endpoints principales y escribe los resultados en JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Peticiones medidas por escenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Peticiones previas por escenario')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            help='Escenario a correr (puede repetirse; por defecto todos)',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Medir también los escenarios cacheados con la cache vacía',
+        )
+        parser.add_argument('--user', help='Médico (username); por defecto el que tiene más casos')
+        parser.add_argument('--staff-user', help='Usuario staff (username); por defecto el primero')
+        parser.add_argument('--base-url', help='Medir contra un servidor (p. ej. http://127.0.0.1:8000)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Hilos (solo con --base-url)')
+        parser.add_argument('--output', help='Archivo JSON de salida (por defecto stdout)')
+        parser.add_argument('--compare', help='JSON de una corrida anterior para detectar regresiones')
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=0.25,
+            help='Aumento de p50 tolerado con --compare (0.25 = 25%%)',
+        )
+
+    def get_user(self, username, staff=False):
+        users = User.objects.all()
+        if username:
+            user = users.filter(username=username).first()
+        elif staff:
+            user = users.filter(is_staff=True).order_by('id').first()
+        else:
+            busiest = SurgicalCase.objects.values('created_by').annotate(
+                cases=Count('id')
+            ).order_by('-cases').first()
+            user = users.filter(id=busiest['created_by']).first() if busiest else None
+        if user is None:
+            raise CommandError(
+                f"No se encontró {'usuario staff' if staff else 'médico'}; cargue datos con seed_benchmark"
+            )
+        return user
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            names = {scenario['name'] for scenario in SCENARIOS}
+            unknown = set(options['scenarios']) - names
+            if unknown:
+                raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in SCENARIOS if scenario['name'] in options['scenarios']]
+
+        users = {
+            'doctor': self.get_user(options['user']),
+            'staff': self.get_user(options['staff_user'], staff=True),
+            None: None,
+        }
+        tokens = {key: str(AccessToken.for_user(user)) for key, user in users.items() if user}
+
+        report = {
+            'commit': git_commit(),
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'mode': 'http' if options['base_url'] else 'client',
+            'requests': options['requests'],
+            'concurrency': options['concurrency'] if options['base_url'] else 1,
+            'doctor': users['doctor'].username,
+            'volumes': {
+                'users': User.objects.count(),
+                'hospitals': Hospital.objects.count(),
+                'cases': SurgicalCase.objects.count(),
+                'procedures': CaseProcedure.objects.count(),
+                'doctor_cases': SurgicalCase.objects.filter(created_by=users['doctor']).count(),
+            },
+            'scenarios': [],
+        }
+
+        for scenario in scenarios:
+            variants = [(scenario['name'], False)]
+            if options['cold'] and scenario.get('cached'):
+                variants.append((scenario['name'] + ':cold', True))
+
+            for name, cold in variants:
+                if options['base_url']:
+                    if cold:
+                        continue
+                    headers = {}
+                    if scenario['auth']:
+                        headers['Authorization'] = f"Bearer {tokens[scenario['auth']]}"
+                    result = run_http(
+                        options['base_url'].rstrip('/') + scenario['path'],
+                        headers=headers,
+                        requests_count=options['requests'],
+                        concurrency=options['concurrency'],
+                        warmup=options['warmup'],
+                        method=scenario['method'],
+                        data=scenario.get('data'),
+                    )
+                else:
+                    client = APIClient(SERVER_NAME='localhost')
+                    if scenario['auth']:
+                        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[scenario['auth']]}")
+                    result = run_client(
+                        client,
+                        scenario,
+                        requests_count=options['requests'],
+                        warmup=options['warmup'],
+                        clear_cache=cold,
+                    )
+                report['scenarios'].append(dict({'name': name, 'path': scenario['path']}, **result))
+                self.stderr.write(
+                    f"{name:<24} p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  "
+                    f"consultas {result.get('mean_queries')}  errores {result['errors']}"
+                )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_results(baseline, report, options['max_regression'])
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(json.dumps(regression)))
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regresiones respecto de {baseline.get('commit') or options['compare']}"
+                )
+            self.stderr.write(self.style.SUCCESS(
+                f"Sin regresiones respecto de {baseline.get('commit') or options['compare']}"
+            ))
@@ -0,0 +1,78 @@
+"""
+Management command para cargar datos de volumen para benchmarks.
+
+Volúmenes de referencia: 10k usuarios, 1k hospitales, 1M casos y 5M
+procedimientos (ver apps/medico/seeding.py). Usar una base dedicada: los
+datos no se borran al terminar.
+
+Uso:
+    python manage.py seed_benchmark                  # volúmenes completos
+    python manage.py seed_benchmark --scale 0.01     # 100 usuarios, 10k casos...
+    python manage.py seed_benchmark --cases 200000 --seed 7
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.medico.seeding import BENCH_PASSWORD, benchmark_data_exists, scaled_volumes, seed
+
+
+class Command(BaseCommand):
+    help = 'Carga usuarios, hospitales, casos y procedimientos de volumen para benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiplicador de los volúmenes de referencia (por defecto 1)',
+        )
+        parser.add_argument('--users', type=int, help='Usuarios (reemplaza la escala)')
+        parser.add_argument('--hospitals', type=int, help='Hospitales (reemplaza la escala)')
+        parser.add_argument('--cases', type=int, help='Casos (reemplaza la escala)')
+        parser.add_argument(
+            '--procedures-per-case',
+            type=int,
+            dest='procedures_per_case',
+            help='Procedimientos por caso (por defecto 5)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Semilla aleatoria')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por lote')
+
+    def handle(self, *args, **options):
+        if benchmark_data_exists():
+            raise CommandError(
+                'La base ya tiene datos de benchmark; use una base nueva para que '
+                'los resultados sean comparables.'
+            )
+
+        volumes = scaled_volumes(
+            options['scale'],
+            users=options['users'],
+            hospitals=options['hospitals'],
+            cases=options['cases'],
+            procedures_per_case=options['procedures_per_case'],
+        )
+        self.stdout.write(
+            f"Cargando {volumes['users']} usuarios, {volumes['hospitals']} hospitales, "
+            f"{volumes['cases']} casos × {volumes['procedures_per_case']} procedimientos"
+        )
+
+        progress = {}
+
+        def log(table, done, total):
+            # Una línea cada ~10% por tabla
+            step = max(total // 10, 1)
+            if done == total or done // step != progress.get(table, -1):
+                progress[table] = done // step
+                self.stdout.write(f'  {table}: {done}/{total}')
+
+        started = time.monotonic()
+        result = seed(volumes, seed=options['seed'], batch_size=options['batch_size'], log=log)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{result['users']} usuarios, {result['hospitals']} hospitales, {result['cases']} casos, "
+            f"{result['procedures']} procedimientos y {result['ads']} anuncios en {elapsed:.0f} s"
+        ))
+        self.stdout.write(f"Staff: {result['staff_user']} / contraseña de todos: {BENCH_PASSWORD}")
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medico', '0011_alter_surgicalcase_calendar_event_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surgicalcase',
+            index=models.Index(fields=['created_by', 'patient_id', 'surgery_date'], name='medico_surg_created_0d17ab_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medico', '0012_surgicalcase_patient_lookup_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calculationhistory',
+            name='surgery_code',
+            field=models.CharField(blank=True, default='', max_length=50, verbose_name='Código de Cirugía'),
+        ),
+        migrations.AddField(
+            model_name='calculationhistory',
+            name='surgery_name',
+            field=models.CharField(blank=True, default='', max_length=500, verbose_name='Nombre de la Cirugía'),
+        ),
+        migrations.AlterField(
+            model_name='calculationhistory',
+            name='calculated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Cálculo'),
+        ),
+        migrations.AlterField(
+            model_name='calculationhistory',
+            name='operation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='calculations', to='medico.operation', verbose_name='Operación'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medico', '0013_calculationhistory_catalog_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surgicalcase',
+            index=models.Index(fields=['created_by', 'updated_at'], name='medico_surg_created_71e32e_idx'),
+        ),
+    ]
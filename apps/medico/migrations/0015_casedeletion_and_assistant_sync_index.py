@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medico', '0014_surgicalcase_sync_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case_id', models.BigIntegerField(verbose_name='ID del Caso')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha de Eliminación')),
+            ],
+            options={
+                'verbose_name': 'Caso Eliminado',
+                'verbose_name_plural': 'Casos Eliminados',
+                'ordering': ['-deleted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='surgicalcase',
+            index=models.Index(fields=['assistant_doctor', 'updated_at'], name='medico_surg_assista_c5ab24_idx'),
+        ),
+        migrations.AddField(
+            model_name='casedeletion',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='case_deletions', to=settings.AUTH_USER_MODEL, verbose_name='Usuario'),
+        ),
+        migrations.AddIndex(
+            model_name='casedeletion',
+            index=models.Index(fields=['user', 'deleted_at'], name='medico_case_user_id_1860a5_idx'),
+        ),
+    ]
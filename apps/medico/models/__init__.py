@@ -1,9 +1,13 @@
 from tabnanny import verbose
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.conf import settings
+from django.utils import timezone
 
 # Import surgical case models
-from .surgical_case import SurgicalCase, CaseProcedure
+from .surgical_case import SurgicalCase, CaseProcedure, CaseDeletion
 
 
 class Specialty(models.Model):
@@ -246,8 +250,23 @@ class CalculationHistory(models.Model):
         Operation,
         on_delete=models.CASCADE,
         related_name='calculations',
+        blank=True,
+        null=True,
         verbose_name="Operación"
     )
+    # Procedimiento del catálogo (CSV) usado en la calculadora
+    surgery_code = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name="Código de Cirugía"
+    )
+    surgery_name = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        verbose_name="Nombre de la Cirugía"
+    )
     hospital = models.ForeignKey(
         Hospital,
         on_delete=models.CASCADE,
@@ -259,8 +278,10 @@ class CalculationHistory(models.Model):
         decimal_places=2,
         verbose_name="Valor Calculado"
     )
+    # default (no auto_now_add): los registros se insertan en diferido y
+    # deben conservar la hora real del cálculo
     calculated_at = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
         verbose_name="Fecha de Cálculo"
     )
     notes = models.TextField(
@@ -280,4 +301,94 @@ class CalculationHistory(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.user.username} - {self.operation.name} ({self.calculated_at.strftime('%Y-%m-%d %H:%M')})"
+        procedure = self.operation.name if self.operation_id else self.surgery_name or self.surgery_code
+        return f"{self.user.username} - {procedure} ({self.calculated_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+# Recargar la matriz de precios cuando cambian hospitales, operaciones o tarifas
+@receiver([post_save, post_delete], sender=Hospital)
+@receiver([post_save, post_delete], sender=Operation)
+@receiver([post_save, post_delete], sender=HospitalOperationRate)
+def invalidate_pricing_on_rate_change(sender, **kwargs):
+    from apps.medico.pricing import invalidate_pricing
+    
+    invalidate_pricing()
+
+
+@receiver(pre_save, sender=Hospital)
+def remember_rate_multiplier(sender, instance, **kwargs):
+    """Guardar el multiplicador anterior para detectar cambios en post_save"""
+    instance._previous_rate_multiplier = None
+    if instance.pk:
+        instance._previous_rate_multiplier = Hospital.objects.filter(
+            pk=instance.pk
+        ).values_list('rate_multiplier', flat=True).first()
+
+
+@receiver(post_save, sender=Hospital)
+def reprice_on_rate_multiplier_change(sender, instance, created, **kwargs):
+    """Revalorizar los procedimientos no facturados tras el commit"""
+    previous = getattr(instance, '_previous_rate_multiplier', None)
+    if created or previous is None or previous == Decimal(str(instance.rate_multiplier)):
+        return
+    
+    from apps.medico.repricing import reprice_hospital
+    
+    transaction.on_commit(lambda: reprice_hospital(instance))
+
+
+@receiver([post_save, post_delete], sender=Hospital)
+def invalidate_hospital_caches(sender, **kwargs):
+    from apps.medico.caching import invalidate_hospitals
+    
+    invalidate_hospitals()
+
+
+@receiver([post_save, post_delete], sender=FavoriteHospital)
+def invalidate_favorite_hospital_caches(sender, instance, **kwargs):
+    from apps.medico.caching import invalidate_favorite_hospitals
+    
+    invalidate_favorite_hospitals(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+def invalidate_favorite_caches(sender, instance, **kwargs):
+    from apps.medico.caching import invalidate_favorites
+    
+    invalidate_favorites(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=SurgicalCase)
+def invalidate_case_caches(sender, instance, **kwargs):
+    """Tras el commit, cuando los procedimientos (bulk_create) ya existen"""
+    from apps.medico.caching import invalidate_user_cases
+    
+    user_id = instance.created_by_id
+    transaction.on_commit(lambda: invalidate_user_cases(user_id))
+
+
+@receiver([post_save, post_delete], sender=CaseProcedure)
+def invalidate_case_caches_on_procedure_change(sender, instance, origin=None, **kwargs):
+    # Solo borrados individuales: en cascada invalida la señal del caso y los
+    # borrados por queryset (bulk) invalidan quien los ejecuta
+    if origin is not None and origin is not instance:
+        return
+    
+    from apps.medico.caching import invalidate_user_cases
+    
+    if CaseProcedure.case.is_cached(instance):
+        user_id = instance.case.created_by_id
+    else:
+        user_id = SurgicalCase.objects.filter(
+            pk=instance.case_id
+        ).values_list('created_by_id', flat=True).first()
+    transaction.on_commit(lambda: invalidate_user_cases(user_id))
+
+
+@receiver([post_save, post_delete], sender=CaseProcedure)
+def touch_case_on_procedure_change(sender, instance, origin=None, **kwargs):
+    """Actualizar updated_at del caso para que la sincronización incremental lo incluya"""
+    if origin is not None and origin is not instance:
+        return
+    
+    SurgicalCase.objects.filter(pk=instance.case_id).update(updated_at=timezone.now())
@@ -1,10 +1,11 @@
 # apps/medico/models/surgical_case.py
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
+from decimal import Decimal
 
 
 class SurgicalCase(models.Model):
@@ -174,6 +175,11 @@ class SurgicalCase(models.Model):
             models.Index(fields=['is_paid']),
             models.Index(fields=['assistant_doctor']),
             models.Index(fields=['calendar_event_id']),
+            # Conciliación de remesas: búsqueda por paciente y fecha
+            models.Index(fields=['created_by', 'patient_id', 'surgery_date']),
+            # Sincronización incremental: cambios desde una marca de agua
+            models.Index(fields=['created_by', 'updated_at']),
+            models.Index(fields=['assistant_doctor', 'updated_at']),
         ]
     
     def __str__(self):
@@ -203,6 +209,8 @@ class SurgicalCase(models.Model):
     
     def save(self, *args, **kwargs):
         """Override save para ejecutar validaciones y notificar"""
+        old_instance = None
+        
         # Detectar si se cambió el assistant_doctor
         if self.pk:
             try:
@@ -221,7 +229,22 @@ class SurgicalCase(models.Model):
                 self.assistant_notified_at = timezone.now()
         
         self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            # El ayudante anterior deja de ver el caso: tombstone para su sincronización
+            if old_instance and old_instance.assistant_doctor_id not in (None, self.assistant_doctor_id):
+                CaseDeletion.record(self.pk, [old_instance.assistant_doctor_id])
+        
+        self._publish_events(old_instance)
+    
+    def _publish_events(self, old_instance):
+        """Emitir eventos de invitación/estado al stream de notificaciones tras el commit"""
+        from apps.communication.events import collect_case_events, publish_case_events
+        
+        events = collect_case_events(old_instance, self)
+        if events:
+            transaction.on_commit(lambda: publish_case_events(self, events))
     
     def can_be_deleted(self):
         """
@@ -259,7 +282,9 @@ class SurgicalCase(models.Model):
                 "No se puede eliminar este caso. El caso debe estar cobrado, "
                 "no tener ayudante asignado, o el ayudante debe haber rechazado la invitación."
             )
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            CaseDeletion.record(self.pk, [self.created_by_id, self.assistant_doctor_id])
+            return super().delete(*args, **kwargs)
     
     def can_be_viewed_by(self, user):
         """Verificar si un usuario puede ver este caso"""
@@ -285,9 +310,16 @@ class SurgicalCase(models.Model):
             return self.assistant_doctor.get_full_name() or self.assistant_doctor.username
         return self.assistant_doctor_name or "Sin ayudante"
     
+    def _prefetched_procedures(self):
+        """Procedimientos de prefetch_related('procedures') o None si no se cargaron"""
+        return getattr(self, '_prefetched_objects_cache', {}).get('procedures')
+    
     @property
     def total_rvu(self):
         """Calcular RVU total de todos los procedimientos"""
+        procedures = self._prefetched_procedures()
+        if procedures is not None:
+            return sum((procedure.rvu for procedure in procedures), Decimal('0'))
         return self.procedures.aggregate(
             total=Sum('rvu')
         )['total'] or 0
@@ -295,6 +327,9 @@ class SurgicalCase(models.Model):
     @property
     def total_value(self):
         """Calcular valor total de todos los procedimientos"""
+        procedures = self._prefetched_procedures()
+        if procedures is not None:
+            return sum((procedure.calculated_value for procedure in procedures), Decimal('0'))
         return self.procedures.aggregate(
             total=Sum('calculated_value')
         )['total'] or 0
@@ -302,12 +337,19 @@ class SurgicalCase(models.Model):
     @property
     def procedure_count(self):
         """Contar número de procedimientos"""
+        procedures = self._prefetched_procedures()
+        if procedures is not None:
+            return len(procedures)
         return self.procedures.count()
     
     @property
     def primary_specialty(self):
         """Obtener la especialidad principal (la del primer procedimiento o más frecuente)"""
-        first_procedure = self.procedures.first()
+        procedures = self._prefetched_procedures()
+        if procedures is not None:
+            first_procedure = procedures[0] if procedures else None
+        else:
+            first_procedure = self.procedures.first()
         return first_procedure.specialty if first_procedure else None
 
 
@@ -400,4 +442,44 @@ class CaseProcedure(models.Model):
         """Calcular el valor automáticamente si no está establecido"""
         if not self.calculated_value:
             self.calculated_value = self.rvu * self.hospital_factor
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class CaseDeletion(models.Model):
+    """
+    Registro de casos que dejaron de ser visibles para un usuario (caso
+    eliminado o ayudante reasignado), para la sincronización incremental.
+    """
+    case_id = models.BigIntegerField(
+        verbose_name="ID del Caso"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='case_deletions',
+        verbose_name="Usuario"
+    )
+    deleted_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Fecha de Eliminación"
+    )
+    
+    class Meta:
+        verbose_name = 'Caso Eliminado'
+        verbose_name_plural = 'Casos Eliminados'
+        ordering = ['-deleted_at']
+        indexes = [
+            models.Index(fields=['user', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"Caso {self.case_id} - {self.deleted_at}"
+    
+    @classmethod
+    def record(cls, case_id, user_ids):
+        """Registrar la eliminación del caso para cada usuario (ignora None)"""
+        now = timezone.now()
+        cls.objects.bulk_create([
+            cls(case_id=case_id, user_id=user_id, deleted_at=now)
+            for user_id in dict.fromkeys(user_ids) if user_id
+        ])
@@ -0,0 +1,249 @@
+# apps/medico/pricing.py
+
+"""
+Motor de precios de procedimientos.
+
+El valor de un procedimiento en un hospital es RVU × factor, donde:
+
+- RVU: el del catálogo de public/surgeries para el código (o el enviado por
+  el cliente para los códigos 'BR'/'RNE' sin valor fijo); si el código no
+  está en el catálogo se usa Operation.base_points.
+- factor: HospitalOperationRate.currency_per_point si el hospital tiene una
+  tarifa propia para la operación con ese código; si no,
+  Hospital.rate_multiplier.
+
+Los factores se cargan en una matriz densa hospital × operación (NumPy,
+enteros en centésimas) que se reconstruye solo cuando cambian hospitales,
+operaciones o tarifas (señales + versión en cache para los demás procesos).
+Un hospital creado sin señales (bulk_create, update) no está en la matriz:
+sus factores se leen de la base y se invalida el motor para incluirlo.
+Todos los cálculos son enteros escalados, así que el resultado es idéntico
+al de Decimal con redondeo ROUND_HALF_UP a 2 decimales.
+"""
+import threading
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from core.cache import bump_version, get_version
+
+from .catalog import get_catalog
+
+PRICING_NAMESPACE = 'medico:pricing'
+SCALE = 100
+CENTS = Decimal('0.01')
+
+
+def to_cents(value):
+    """Decimal/str/float -> entero en centésimas (ROUND_HALF_UP)"""
+    return int((Decimal(str(value)) * SCALE).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(value):
+    return (Decimal(int(value)) / SCALE).quantize(CENTS)
+
+
+def multiply_cents(rvu_cents, factor_cents):
+    """
+    (rvu × factor) en centésimas con redondeo half-up; acepta escalares o
+    arreglos NumPy (int64). Los valores son siempre no negativos.
+    """
+    return (np.asarray(rvu_cents, dtype=np.int64) * factor_cents + SCALE // 2) // SCALE
+
+
+class PricingEngine:
+    """Matriz de factores hospital × operación cargada en memoria"""
+
+    def __init__(self, version=None):
+        from .models import Hospital, HospitalOperationRate, Operation
+
+        self.version = version
+        # Hospitales fuera de la matriz: {id: (factor por defecto, {código: factor})}
+        self.missing_hospitals = {}
+
+        hospitals = list(Hospital.objects.order_by('id').values_list('id', 'rate_multiplier'))
+        self.hospital_index = {hospital_id: row for row, (hospital_id, _) in enumerate(hospitals)}
+        self.default_factors = np.array(
+            [to_cents(multiplier) for _, multiplier in hospitals], dtype=np.int64
+        )
+
+        # Una columna por código de operación con tarifa específica
+        operations = {}
+        self.base_points = {}
+        for operation_id, code, base_points in Operation.objects.exclude(
+            code__isnull=True
+        ).exclude(code='').values_list('id', 'code', 'base_points'):
+            code = code.strip()
+            operations[operation_id] = code
+            self.base_points.setdefault(code, base_points)
+
+        rates = list(HospitalOperationRate.objects.filter(
+            operation_id__in=operations.keys()
+        ).values_list('hospital_id', 'operation_id', 'currency_per_point'))
+
+        codes = sorted({operations[operation_id] for _, operation_id, _ in rates})
+        self.code_index = {code: column for column, code in enumerate(codes)}
+
+        self.matrix = np.repeat(self.default_factors[:, None], len(codes), axis=1)
+        for hospital_id, operation_id, currency_per_point in rates:
+            row = self.hospital_index.get(hospital_id)
+            if row is not None:
+                self.matrix[row, self.code_index[operations[operation_id]]] = to_cents(currency_per_point)
+
+    def has_override(self, code):
+        return str(code).strip() in self.code_index
+
+    def override_codes(self):
+        return set(self.code_index)
+
+    def rvu(self, code):
+        """RVU de referencia del código (catálogo u Operation.base_points)"""
+        code = str(code).strip()
+        entry = get_catalog().get(code)
+        if entry and entry['rvu'] is not None:
+            return entry['rvu']
+        return self.base_points.get(code)
+
+    def _missing_hospital_factors(self, hospital_id):
+        """
+        Factores (centésimas) de un hospital que no estaba al construir la
+        matriz. Se leen de la base una vez por motor y se invalida el motor
+        para que la próxima reconstrucción lo incluya.
+        """
+        from .models import Hospital, HospitalOperationRate
+
+        factors = self.missing_hospitals.get(hospital_id)
+        if factors is not None:
+            return factors
+
+        multiplier = Hospital.objects.filter(
+            pk=hospital_id
+        ).values_list('rate_multiplier', flat=True).first()
+        if multiplier is None:
+            raise KeyError(f'Hospital no encontrado: {hospital_id}')
+
+        rates = {}
+        for code, currency_per_point in HospitalOperationRate.objects.filter(
+            hospital_id=hospital_id
+        ).exclude(
+            operation__code__isnull=True
+        ).exclude(
+            operation__code=''
+        ).values_list('operation__code', 'currency_per_point'):
+            rates[code.strip()] = to_cents(currency_per_point)
+
+        factors = self.missing_hospitals[hospital_id] = (to_cents(multiplier), rates)
+        invalidate_pricing()
+        return factors
+
+    def factor_cents(self, hospital_id, code):
+        row = self.hospital_index.get(hospital_id)
+        if row is None:
+            default, rates = self._missing_hospital_factors(hospital_id)
+            return rates.get(str(code).strip(), default)
+        column = self.code_index.get(str(code).strip())
+        if column is None:
+            return int(self.default_factors[row])
+        return int(self.matrix[row, column])
+
+    def factor(self, hospital_id, code):
+        return from_cents(self.factor_cents(hospital_id, code))
+
+    def resolve_rvu(self, code, rvu=None):
+        """
+        RVU con el que se valoriza `code`: el de referencia si lo tiene; el
+        enviado por el cliente (`rvu`) solo para códigos sin RVU fijo.
+        """
+        reference = self.rvu(code)
+        return reference if reference is not None else rvu
+
+    def price(self, hospital_id, code, rvu=None):
+        """
+        (rvu, factor, valor) en Decimal para un procedimiento.
+        `rvu` solo se usa si el código no tiene RVU de referencia.
+        """
+        rvu = self.resolve_rvu(code, rvu)
+        if rvu is None:
+            raise ValueError(f'El código {code} no tiene RVU conocido')
+        rvu = Decimal(str(rvu)).quantize(CENTS, rounding=ROUND_HALF_UP)
+        factor_cents = self.factor_cents(hospital_id, code)
+        value = multiply_cents(to_cents(rvu), factor_cents)
+        return rvu, from_cents(factor_cents), from_cents(value)
+
+    def factor_matrix(self, hospital_ids, codes):
+        """Factores (centésimas) para hospital_ids × codes, vectorizado"""
+        if any(hospital_id not in self.hospital_index for hospital_id in hospital_ids):
+            # Hospital fuera de la matriz: camino escalar hasta reconstruir el motor
+            return np.array(
+                [[self.factor_cents(hospital_id, code) for code in codes] for hospital_id in hospital_ids],
+                dtype=np.int64,
+            ).reshape(len(hospital_ids), len(codes))
+
+        rows = np.array([self.hospital_index[hospital_id] for hospital_id in hospital_ids], dtype=np.intp)
+        columns = np.array([self.code_index.get(str(code).strip(), -1) for code in codes], dtype=np.intp)
+
+        factors = np.repeat(self.default_factors[rows][:, None], len(codes), axis=1)
+        has_rate = columns >= 0
+        if has_rate.any() and len(rows):
+            factors[:, has_rate] = self.matrix[np.ix_(rows, columns[has_rate])]
+        return factors
+
+    def quote(self, hospital_ids, codes, rvus=None):
+        """
+        Valores de `codes` en cada uno de `hospital_ids` (matriz M × N en
+        centésimas) con un solo producto vectorizado.
+        """
+        if rvus is None:
+            rvus = [self.rvu(code) for code in codes]
+        rvu_cents = np.array([to_cents(rvu) if rvu is not None else 0 for rvu in rvus], dtype=np.int64)
+        return multiply_cents(rvu_cents[None, :], self.factor_matrix(hospital_ids, codes))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def pricing_version():
+    """Versión vigente de las tarifas (cambia con cada invalidate_pricing)"""
+    return get_version(PRICING_NAMESPACE)
+
+
+def get_pricing_engine():
+    """Motor vigente; se reconstruye si otro proceso invalidó las tarifas"""
+    global _engine
+    version = pricing_version()
+    engine = _engine
+    if engine is None or engine.version != version:
+        with _engine_lock:
+            if _engine is None or _engine.version != version:
+                _engine = PricingEngine(version=version)
+            engine = _engine
+    return engine
+
+
+def invalidate_pricing(*args, **kwargs):
+    """Receptor de señales: forzar la recarga de la matriz en todos los procesos"""
+    global _engine
+    bump_version(PRICING_NAMESPACE)
+    _engine = None
+
+
+def price_procedures(hospital_id, procedures, engine=None):
+    """
+    Asignar hospital_factor y calculated_value a una lista de procedimientos
+    (dicts de validated_data o instancias de CaseProcedure) del mismo
+    hospital. El rvu se toma del catálogo; el enviado por el cliente solo
+    se usa para códigos sin RVU fijo.
+    """
+    engine = engine or get_pricing_engine()
+    for procedure in procedures:
+        is_dict = isinstance(procedure, dict)
+        code = procedure['surgery_code'] if is_dict else procedure.surgery_code
+        rvu = procedure.get('rvu') if is_dict else procedure.rvu
+        rvu, factor, value = engine.price(hospital_id, code, rvu=rvu)
+        if is_dict:
+            procedure.update(rvu=rvu, hospital_factor=factor, calculated_value=value)
+        else:
+            procedure.rvu = rvu
+            procedure.hospital_factor = factor
+            procedure.calculated_value = value
+    return procedures
@@ -0,0 +1,122 @@
+# apps/medico/repricing.py
+
+"""
+Revalorización de procedimientos cuando cambia el multiplicador de un hospital.
+
+CaseProcedure guarda el factor con el que se valorizó, así que un cambio en
+Hospital.rate_multiplier no afecta a los procedimientos existentes.
+reprice_hospital() actualiza los procedimientos aún no facturados con un
+único UPDATE ... SET calculated_value = ROUND(rvu * factor, 2), sin cargar
+filas en Python, y registra en el log el total antes y después.
+
+No se tocan:
+- Casos facturados, cobrados o anulados (el valor ya se comunicó).
+- Códigos con tarifa específica del hospital (HospitalOperationRate), que
+  no dependen del multiplicador.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .caching import invalidate_hospitals
+from .models import CaseProcedure, HospitalOperationRate, SurgicalCase
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal('0.01')
+
+
+def affected_procedures(hospital, date_from=None):
+    """Procedimientos no facturados del hospital cuyo factor quedó desactualizado"""
+    cases = SurgicalCase.objects.filter(
+        hospital=hospital,
+        is_billed=False,
+    ).exclude(status='cancelled')
+    if date_from:
+        cases = cases.filter(surgery_date__gte=date_from)
+
+    override_codes = HospitalOperationRate.objects.filter(
+        hospital=hospital,
+        operation__code__isnull=False,
+    ).values('operation__code')
+
+    return CaseProcedure.objects.filter(
+        case_id__in=cases.values('id'),
+    ).exclude(
+        hospital_factor=Decimal(str(hospital.rate_multiplier)),
+    ).exclude(
+        surgery_code__in=override_codes,
+    )
+
+
+def _new_value(factor):
+    """Expresión SQL: ROUND(rvu * factor, 2)"""
+    return Round(
+        F('rvu') * Value(factor),
+        2,
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def reprice_hospital(hospital, date_from=None, dry_run=False):
+    """
+    Revalorizar con el multiplicador vigente los procedimientos no
+    facturados de `hospital`. Retorna un resumen con el delta; con
+    dry_run=True solo calcula el resumen.
+    """
+    new_factor = Decimal(str(hospital.rate_multiplier))
+
+    with transaction.atomic():
+        procedures = affected_procedures(hospital, date_from=date_from)
+
+        # Total actual y total revalorizado en una sola consulta
+        totals = procedures.aggregate(
+            procedures=Count('id'),
+            cases=Count('case_id', distinct=True),
+            before=Sum('calculated_value'),
+            after=Sum(_new_value(new_factor)),
+        )
+        total_before = Decimal(str(totals['before'] or 0)).quantize(CENTS)
+        total_after = Decimal(str(totals['after'] or 0)).quantize(CENTS)
+
+        result = {
+            'hospital_id': hospital.pk,
+            'factor': new_factor,
+            'procedures': totals['procedures'],
+            'cases': totals['cases'],
+            'total_before': total_before,
+            'total_after': total_after,
+            'delta': total_after - total_before,
+        }
+
+        if dry_run or not totals['procedures']:
+            return result
+
+        now = timezone.now()
+
+        # Los totales en cache (analytics, contadores, ETags) se basan en
+        # updated_at del caso: marcarlos antes de actualizar los
+        # procedimientos, mientras el filtro todavía los encuentra
+        SurgicalCase.objects.filter(
+            id__in=procedures.values('case_id')
+        ).update(updated_at=now)
+
+        result['procedures'] = procedures.update(
+            hospital_factor=new_factor,
+            calculated_value=_new_value(new_factor),
+            updated_at=now,
+        )
+        # UPDATE sin señales: invalidar las respuestas cacheadas con valores calculados
+        transaction.on_commit(invalidate_hospitals)
+
+    logger.info(
+        "Revalorización hospital=%s factor=%s procedimientos=%s casos=%s "
+        "antes=%s después=%s delta=%s",
+        hospital.pk, new_factor, result['procedures'], result['cases'],
+        total_before, total_after, result['delta'],
+    )
+    return result
@@ -0,0 +1,259 @@
+# apps/medico/seeding.py
+
+"""
+Datos de volumen para benchmarks (seed_benchmark / run_benchmarks).
+
+Los factories de la suite (apps/*/tests/factories.py) usan Faker y save()
+por fila, razonable para cientos de filas pero no para millones; aquí cada
+tabla se genera con un random.Random con semilla fija (mismos datos en cada
+corrida, comparables entre commits) y se inserta con bulk_create por lotes,
+un lote por transacción. bulk_create no emite señales, así que no se
+disparan invalidaciones ni notificaciones durante la carga.
+
+Todos los registros llevan el prefijo BENCH_PREFIX para distinguirlos.
+"""
+import datetime
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from apps.advertising.models import Advertisement, Client
+from .models import CaseProcedure, FavoriteHospital, Hospital, SurgicalCase
+
+User = get_user_model()
+
+BENCH_PREFIX = 'bench-'
+BENCH_PASSWORD = 'bench-password'
+
+# Volúmenes de referencia (scale=1)
+VOLUMES = {
+    'users': 10_000,
+    'hospitals': 1_000,
+    'cases': 1_000_000,
+    'procedures_per_case': 5,
+    'favorite_hospitals_per_user': 3,
+    'ad_clients': 50,
+    'ads_per_client': 3,
+}
+
+SPECIALTIES = [
+    'Cardiovascular', 'Digestivo', 'Endocrino', 'Ginecología', 'Mama',
+    'Maxilofacial', 'Neurocirugía', 'Obstetricia', 'Oftamología', 'Ortopedia',
+]
+CASE_STATUSES = [
+    # (estado, operado, facturado, cobrado, peso)
+    ('scheduled', False, False, False, 20),
+    ('completed', True, False, False, 30),
+    ('billed', True, True, False, 25),
+    ('paid', True, True, True, 20),
+    ('cancelled', False, False, False, 5),
+]
+CENTS = Decimal('0.01')
+
+
+def scaled_volumes(scale=1.0, **overrides):
+    """VOLUMES multiplicados por `scale` (mínimo 1), con reemplazos explícitos"""
+    volumes = {}
+    for name, value in VOLUMES.items():
+        if '_per_' in name:
+            volumes[name] = value
+        else:
+            volumes[name] = max(int(value * scale), 1)
+    volumes.update({name: value for name, value in overrides.items() if value is not None})
+    return volumes
+
+
+def benchmark_data_exists():
+    return User.objects.filter(username__startswith=BENCH_PREFIX).exists()
+
+
+def _chunks(total, size):
+    start = 0
+    while start < total:
+        yield start, min(start + size, total)
+        start += size
+
+
+def seed_users(count, batch_size, log):
+    password = make_password(BENCH_PASSWORD)
+    plans = ['bronze', 'silver', 'gold']
+    ids = []
+    for start, end in _chunks(count, batch_size):
+        users = [
+            User(
+                username=f'{BENCH_PREFIX}{n}',
+                email=f'{BENCH_PREFIX}{n}@example.com',
+                first_name='Médico',
+                last_name=str(n),
+                password=password,
+                is_verified=True,
+                plan=plans[n % 3],
+            )
+            for n in range(start, end)
+        ]
+        with transaction.atomic():
+            ids.extend(user.pk for user in User.objects.bulk_create(users))
+        log('users', end, count)
+
+    staff, _ = User.objects.get_or_create(
+        username=f'{BENCH_PREFIX}admin',
+        defaults={
+            'email': f'{BENCH_PREFIX}admin@example.com',
+            'password': password,
+            'is_staff': True,
+            'is_superuser': True,
+            'is_verified': True,
+        },
+    )
+    return ids, staff
+
+
+def seed_hospitals(count, rng, batch_size, log):
+    ids = []
+    for start, end in _chunks(count, batch_size):
+        hospitals = [
+            Hospital(
+                name=f'{BENCH_PREFIX}Hospital {n}',
+                location=f'Zona {n % 25 + 1}',
+                rate_multiplier=Decimal(rng.randint(100, 300)) / 100,
+            )
+            for n in range(start, end)
+        ]
+        with transaction.atomic():
+            ids.extend(hospital.pk for hospital in Hospital.objects.bulk_create(hospitals))
+        log('hospitals', end, count)
+    return ids
+
+
+def seed_favorite_hospitals(user_ids, hospital_ids, per_user, rng, batch_size, log):
+    per_user = min(per_user, len(hospital_ids))
+    favorites = []
+    for user_id in user_ids:
+        favorites.extend(
+            FavoriteHospital(user_id=user_id, hospital_id=hospital_id)
+            for hospital_id in rng.sample(hospital_ids, per_user)
+        )
+    for start, end in _chunks(len(favorites), batch_size):
+        with transaction.atomic():
+            FavoriteHospital.objects.bulk_create(favorites[start:end], ignore_conflicts=True)
+        log('favorite_hospitals', end, len(favorites))
+
+
+def seed_cases(count, procedures_per_case, user_ids, hospital_ids, factors, rng, batch_size, log):
+    """Casos y sus procedimientos, un lote de casos (con sus procedimientos) por transacción"""
+    statuses = [row[:4] for row in CASE_STATUSES]
+    weights = [row[4] for row in CASE_STATUSES]
+    first_day = datetime.date.today() - datetime.timedelta(days=730)
+    procedures_total = 0
+
+    for start, end in _chunks(count, batch_size):
+        cases = []
+        for n in range(start, end):
+            status, operated, billed, paid = rng.choices(statuses, weights)[0]
+            with_assistant = rng.random() < 0.1
+            cases.append(SurgicalCase(
+                patient_name=f'Paciente {n}',
+                patient_id=f'{BENCH_PREFIX}{n:07d}',
+                patient_age=rng.randint(1, 95),
+                hospital_id=rng.choice(hospital_ids),
+                surgery_date=first_day + datetime.timedelta(days=rng.randint(0, 730)),
+                status=status,
+                is_operated=operated,
+                is_billed=billed,
+                is_paid=paid,
+                assistant_doctor_id=rng.choice(user_ids) if with_assistant else None,
+                assistant_accepted=True if with_assistant else None,
+                created_by_id=rng.choice(user_ids),
+            ))
+
+        with transaction.atomic():
+            cases = SurgicalCase.objects.bulk_create(cases)
+            procedures = []
+            for case in cases:
+                factor = factors[case.hospital_id]
+                for order in range(procedures_per_case):
+                    code = rng.randint(10000, 69999)
+                    rvu = Decimal(rng.randint(100, 5000)) / 100
+                    procedures.append(CaseProcedure(
+                        case_id=case.pk,
+                        surgery_code=str(code),
+                        surgery_name=f'Procedimiento {code}',
+                        specialty=SPECIALTIES[code % len(SPECIALTIES)],
+                        rvu=rvu,
+                        hospital_factor=factor,
+                        calculated_value=(rvu * factor).quantize(CENTS, rounding=ROUND_HALF_UP),
+                        order=order,
+                    ))
+            CaseProcedure.objects.bulk_create(procedures, batch_size=batch_size)
+        procedures_total += len(procedures)
+        log('cases', end, count)
+    return procedures_total
+
+
+def seed_ads(clients, ads_per_client, rng, log):
+    today = timezone.now().date()
+    plans = ['gold', 'silver', 'bronze']
+    placements = [choice for choice, _ in Advertisement.PLACEMENT_CHOICES]
+    with transaction.atomic():
+        created = Client.objects.bulk_create([
+            Client(
+                company_name=f'{BENCH_PREFIX}Cliente {n}',
+                email=f'{BENCH_PREFIX}cliente{n}@example.com',
+                plan=plans[n % 3],
+                amount_paid=Decimal('1000.00'),
+                start_date=today - datetime.timedelta(days=30),
+                end_date=today + datetime.timedelta(days=335),
+                status='active',
+            )
+            for n in range(clients)
+        ])
+        Advertisement.objects.bulk_create([
+            Advertisement(
+                client=client,
+                campaign_name=f'{BENCH_PREFIX}Campaña {client.pk}-{n}',
+                title=f'Anuncio {n}',
+                image='advertisements/bench.png',
+                redirect_url='https://example.com/',
+                placement=rng.choice(placements),
+                priority=rng.randint(0, 10),
+                start_date=today - datetime.timedelta(days=7),
+                end_date=today + datetime.timedelta(days=60),
+                status='active',
+            )
+            for client in created
+            for n in range(ads_per_client)
+        ])
+    log('ads', clients * ads_per_client, clients * ads_per_client)
+
+
+def seed(volumes, seed=42, batch_size=5000, log=None):
+    """
+    Cargar `volumes` (ver scaled_volumes). Retorna el conteo creado por tabla.
+    """
+    log = log or (lambda table, done, total: None)
+    rng = random.Random(seed)
+
+    user_ids, staff = seed_users(volumes['users'], batch_size, log)
+    hospital_ids = seed_hospitals(volumes['hospitals'], rng, batch_size, log)
+    factors = dict(Hospital.objects.filter(id__in=hospital_ids).values_list('id', 'rate_multiplier'))
+    seed_favorite_hospitals(
+        user_ids, hospital_ids, volumes['favorite_hospitals_per_user'], rng, batch_size, log
+    )
+    procedures = seed_cases(
+        volumes['cases'], volumes['procedures_per_case'], user_ids, hospital_ids, factors,
+        rng, batch_size, log,
+    )
+    seed_ads(volumes['ad_clients'], volumes['ads_per_client'], rng, log)
+
+    return {
+        'users': len(user_ids),
+        'staff_user': staff.username,
+        'hospitals': len(hospital_ids),
+        'cases': volumes['cases'],
+        'procedures': procedures,
+        'ads': volumes['ad_clients'] * volumes['ads_per_client'],
+    }
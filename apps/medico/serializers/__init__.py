@@ -8,11 +8,21 @@ from .surgical_case import (
     SurgicalCaseCreateUpdateSerializer,
     CaseProcedureSerializer,
     CaseStatsSerializer,
+    BulkStatusSerializer,
+    CalendarSyncSerializer,
+    BatchCaseSerializer,
+    CaseBatchSerializer,
 )
 
 # Import hospital serializer
 from .hospital import HospitalSerializer
 
+# Import pricing serializers
+from .pricing import PriceQuoteSerializer
+
+# Import calculation history serializers
+from .history import CalculationHistorySerializer, CalculationRecordSerializer
+
 
 class FavoriteSerializer(serializers.ModelSerializer):
     """Serializer para favoritos de cirugías"""
@@ -32,3 +42,32 @@ class FavoriteSerializer(serializers.ModelSerializer):
         """Crear favorito asociado al usuario actual"""
         # El user se añade en la vista desde request.user
         return super().create(validated_data)
+
+
+class FavoriteSyncItemSerializer(serializers.Serializer):
+    """Favorito deseado en una sincronización"""
+    surgery_code = serializers.CharField(max_length=50)
+    surgery_name = serializers.CharField(max_length=500, required=False, allow_blank=True, allow_null=True)
+    specialty = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    
+    def validate_surgery_code(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("El código de cirugía no puede estar vacío")
+        return value.strip()
+
+
+class FavoriteSyncSerializer(serializers.Serializer):
+    """
+    Conjunto completo de favoritos deseado por el cliente.
+    Body: { "favorites": [{"surgery_code": "12345", "surgery_name": "..."}],
+            "version": "<token anterior>" (opcional) }
+    """
+    
+    MAX_FAVORITES = 1000
+    
+    favorites = FavoriteSyncItemSerializer(many=True, max_length=MAX_FAVORITES)
+    version = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_favorites(self, value):
+        """Un elemento por código (el último gana)"""
+        return list({item['surgery_code']: item for item in value}.values())
@@ -0,0 +1,66 @@
+# apps/medico/serializers/history.py
+
+"""
+Serializers del historial de la calculadora
+"""
+from rest_framework import serializers
+
+from apps.medico.models import CalculationHistory
+from apps.medico.catalog import get_entry
+from apps.medico.pricing import get_pricing_engine
+
+
+class CalculationHistorySerializer(serializers.ModelSerializer):
+    """Lectura del historial de cálculos"""
+    hospital_name = serializers.CharField(source='hospital.name', read_only=True)
+
+    class Meta:
+        model = CalculationHistory
+        fields = [
+            'id', 'surgery_code', 'surgery_name', 'hospital', 'hospital_name',
+            'calculated_value', 'calculated_at', 'notes'
+        ]
+        read_only_fields = fields
+
+
+class CalculationRecordSerializer(serializers.Serializer):
+    """
+    Cálculo realizado en la calculadora.
+    Body: { "surgery_code": "50010", "surgery_name": "...", "hospital": 1,
+            "calculated_value": 123.45 (opcional), "notes": "" }
+
+    El hospital se valida contra el motor de precios en memoria para no
+    agregar consultas al registro; si no se envía el valor, se calcula.
+    """
+    surgery_code = serializers.CharField(max_length=50)
+    surgery_name = serializers.CharField(max_length=500, required=False, allow_blank=True, default='')
+    hospital = serializers.IntegerField(min_value=1)
+    calculated_value = serializers.DecimalField(
+        max_digits=12, decimal_places=2, min_value=0, required=False
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_surgery_code(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("El código de cirugía no puede estar vacío")
+        return value.strip()
+
+    def validate_hospital(self, value):
+        if value not in get_pricing_engine().hospital_index:
+            raise serializers.ValidationError("Hospital no encontrado")
+        return value
+
+    def validate(self, data):
+        if not data.get('surgery_name'):
+            entry = get_entry(data['surgery_code'])
+            data['surgery_name'] = entry['name'] if entry else ''
+        if data.get('calculated_value') is None:
+            try:
+                _, _, data['calculated_value'] = get_pricing_engine().price(
+                    data['hospital'], data['surgery_code']
+                )
+            except ValueError:
+                raise serializers.ValidationError({
+                    'calculated_value': "El código no tiene RVU conocido; envíe el valor calculado"
+                })
+        return data
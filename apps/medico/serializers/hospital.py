@@ -5,8 +5,16 @@ from rest_framework import serializers, viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.cache import cache_response
+from apps.medico.caching import HOSPITALS_NAMESPACE, favorite_hospitals_namespace
 from apps.medico.models import Hospital, FavoriteHospital
 
+HOSPITALS_CACHE_TIMEOUT = 60 * 60
+
+
+def hospital_list_namespaces(request):
+    return [HOSPITALS_NAMESPACE, favorite_hospitals_namespace(request.user.pk)]
+
 
 class HospitalSerializer(serializers.ModelSerializer):
     """Serializer para hospitales"""
@@ -19,6 +27,11 @@ class HospitalSerializer(serializers.ModelSerializer):
     
     def get_is_favorite(self, obj):
         """Verifica si el hospital es favorito del usuario actual"""
+        # La vista carga los favoritos una vez para toda la lista
+        favorite_ids = self.context.get('favorite_hospital_ids')
+        if favorite_ids is not None:
+            return obj.id in favorite_ids
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return FavoriteHospital.objects.filter(
@@ -52,6 +65,21 @@ class HospitalViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = None  # Desactivar paginación para mostrar todos los hospitales
     
+    def get_favorite_ids(self):
+        """IDs de los hospitales favoritos del usuario (una consulta por request)"""
+        if not hasattr(self, '_favorite_ids'):
+            self._favorite_ids = set()
+            if self.request.user.is_authenticated:
+                self._favorite_ids = set(FavoriteHospital.objects.filter(
+                    user=self.request.user
+                ).values_list('hospital_id', flat=True))
+        return self._favorite_ids
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['favorite_hospital_ids'] = self.get_favorite_ids()
+        return context
+    
     def get_queryset(self):
         """
         Ordena hospitales: favoritos primero, luego por nombre
@@ -62,9 +90,7 @@ class HospitalViewSet(viewsets.ReadOnlyModelViewSet):
         
         if self.request.user.is_authenticated:
             # Obtener IDs de hospitales favoritos
-            favorite_ids = list(FavoriteHospital.objects.filter(
-                user=self.request.user
-            ).values_list('hospital_id', flat=True))
+            favorite_ids = self.get_favorite_ids()
             
             if favorite_ids:
                 # Ordenar: favoritos primero (0), luego no favoritos (1)
@@ -82,6 +108,11 @@ class HospitalViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    @cache_response(hospital_list_namespaces, HOSPITALS_CACHE_TIMEOUT)
+    def list(self, request, *args, **kwargs):
+        """Lista cacheada por usuario (el orden y is_favorite dependen de sus favoritos)"""
+        return super().list(request, *args, **kwargs)
+    
     @action(detail=True, methods=['post'])
     def favorite(self, request, pk=None):
         """Agregar hospital a favoritos"""
@@ -127,5 +158,5 @@ class HospitalViewSet(viewsets.ReadOnlyModelViewSet):
             user=request.user
         ).select_related('hospital')
         
-        serializer = FavoriteHospitalSerializer(favorites, many=True, context={'request': request})
+        serializer = FavoriteHospitalSerializer(favorites, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
@@ -0,0 +1,36 @@
+# apps/medico/serializers/pricing.py
+
+"""
+Serializers del motor de precios
+"""
+from rest_framework import serializers
+
+
+class PriceQuoteSerializer(serializers.Serializer):
+    """
+    Cotización de N procedimientos en M hospitales.
+    Body: { "codes": ["50010", "50020"], "hospital_ids": [1, 2], "rvus": {"33250": 12.5} }
+    """
+    
+    MAX_CODES = 50
+    MAX_HOSPITALS = 200
+    
+    codes = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        min_length=1,
+        max_length=MAX_CODES
+    )
+    hospital_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=MAX_HOSPITALS
+    )
+    rvus = serializers.DictField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0),
+        required=False,
+        help_text="RVU manual para códigos sin valor fijo (BR/RNE)"
+    )
+    
+    def validate_codes(self, value):
+        """Quitar espacios y duplicados conservando el orden"""
+        return list(dict.fromkeys(code.strip() for code in value if code.strip()))
@@ -5,7 +5,10 @@ Serializers para casos quirúrgicos y procedimientos
 """
 from rest_framework import serializers
 from apps.medico.models import SurgicalCase, CaseProcedure
+from apps.medico.pricing import price_procedures
+from apps.medico.sync import decode_sync_token
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 import copy
 
 User = get_user_model()
@@ -31,6 +34,11 @@ class CaseProcedureSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        # El factor y el valor los calcula el servidor (apps.medico.pricing)
+        extra_kwargs = {
+            'hospital_factor': {'required': False},
+            'calculated_value': {'required': False},
+        }
     
     def validate_rvu(self, value):
         """Validar que RVU sea positivo"""
@@ -351,16 +359,25 @@ class SurgicalCaseCreateUpdateSerializer(serializers.ModelSerializer):
         for index, proc_data in enumerate(procedures_data):
             if 'order' not in proc_data:
                 proc_data['order'] = index
-            CaseProcedure.objects.create(
-                case=case,
-                **proc_data
-            )
+        self._create_procedures(case, procedures_data)
         
         return case
     
+    def _create_procedures(self, case, procedures_data):
+        """Valorizar en lote con el motor de precios e insertar con un solo INSERT"""
+        price_procedures(case.hospital_id, procedures_data)
+        CaseProcedure.objects.bulk_create([
+            CaseProcedure(case=case, **proc_data)
+            for proc_data in procedures_data
+        ])
+    
     def update(self, instance, validated_data):
         """Actualizar caso y sus procedimientos"""
         procedures_data = validated_data.pop('procedures', None)
+        hospital_changed = (
+            'hospital' in validated_data
+            and validated_data['hospital'].pk != instance.hospital_id
+        )
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -372,15 +389,38 @@ class SurgicalCaseCreateUpdateSerializer(serializers.ModelSerializer):
             
             for idx, proc_data in enumerate(procedures_data):
                 proc_data['order'] = idx
-                
-                CaseProcedure.objects.create(
-                    case=instance,
-                    **proc_data
-                )
+            self._create_procedures(instance, procedures_data)
+        elif hospital_changed:
+            # Revalorizar los procedimientos existentes con el nuevo hospital
+            procedures = list(instance.procedures.all())
+            price_procedures(instance.hospital_id, procedures)
+            now = timezone.now()
+            for procedure in procedures:
+                procedure.updated_at = now
+            CaseProcedure.objects.bulk_update(
+                procedures, ['rvu', 'hospital_factor', 'calculated_value', 'updated_at']
+            )
         
         return instance
 
 
+class BulkStatusSerializer(serializers.Serializer):
+    """Cambio de estado en lote: { "ids": [1, 2, 3], "status": "billed" }"""
+    
+    MAX_IDS = 500
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_IDS
+    )
+    status = serializers.ChoiceField(choices=['operated', 'billed', 'paid'])
+    
+    def validate_ids(self, value):
+        """Eliminar duplicados conservando el orden"""
+        return list(dict.fromkeys(value))
+
+
 class CaseStatsSerializer(serializers.Serializer):
     """Serializer para estadísticas de casos"""
     
@@ -389,4 +429,109 @@ class CaseStatsSerializer(serializers.Serializer):
     total_value = serializers.DecimalField(max_digits=15, decimal_places=2)
     cases_by_status = serializers.DictField()
     cases_by_specialty = serializers.DictField()
-    recent_cases = SurgicalCaseListSerializer(many=True)
\ No newline at end of file
+    recent_cases = SurgicalCaseListSerializer(many=True)
+
+
+class CalendarEventSerializer(serializers.Serializer):
+    """Evento de Google Calendar vinculado a un caso"""
+    event_id = serializers.CharField(max_length=255)
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    etag = serializers.CharField(max_length=255, required=False, allow_blank=True)
+
+
+class CalendarSyncSerializer(serializers.Serializer):
+    """
+    Conciliación con Google Calendar.
+    Body: { "events": [{"event_id": "...", "start": "...", "end": "...", "etag": "..."}],
+            "since": "<sync_token>" (opcional) }
+    """
+    
+    MAX_EVENTS = 500
+    
+    events = CalendarEventSerializer(many=True, max_length=MAX_EVENTS)
+    since = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate_since(self, value):
+        if value:
+            try:
+                decode_sync_token(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(str(exc))
+        return value
+
+
+class PreloadedRelatedField(serializers.Field):
+    """
+    Relación por pk resuelta contra un dict {pk: instancia} precargado en el
+    contexto del serializer (una consulta para todo el lote en lugar de una
+    por operación).
+    """
+    
+    default_error_messages = {
+        'does_not_exist': 'Clave primaria "{pk_value}" inválida - objeto no existe.',
+        'incorrect_type': 'Tipo incorrecto. Se esperaba valor de clave primaria y se recibió {data_type}.',
+    }
+    
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = self.context[self.context_key].get(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+    
+    def to_representation(self, value):
+        return value.pk
+
+
+class BatchCaseSerializer(SurgicalCaseCreateUpdateSerializer):
+    """
+    Validación de un caso dentro de /cases/batch/: mismas reglas que el
+    serializer de creación/edición, con hospital y ayudante resueltos contra
+    los precargados del lote.
+    """
+    hospital = PreloadedRelatedField('hospitals')
+    assistant_doctor = PreloadedRelatedField('users', required=False, allow_null=True)
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """
+    Operación de /cases/batch/:
+    { "op": "create" | "update" | "delete", "id": 12, "version": "<updated_at>",
+      "ref": "<id local del cliente>", "data": {...} }
+    """
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    id = serializers.IntegerField(min_value=1, required=False)
+    version = serializers.DateTimeField(required=False)
+    ref = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    data = serializers.DictField(required=False, default=dict)
+    
+    def validate(self, data):
+        if data['op'] in ('update', 'delete'):
+            errors = {}
+            if 'id' not in data:
+                errors['id'] = 'Requerido para update/delete'
+            if 'version' not in data:
+                errors['version'] = 'Requerido para update/delete (updated_at conocido por el cliente)'
+            if errors:
+                raise serializers.ValidationError(errors)
+        elif not data.get('data'):
+            raise serializers.ValidationError({'data': 'Requerido para create'})
+        return data
+
+
+class CaseBatchSerializer(serializers.Serializer):
+    """Body de /cases/batch/: { "operations": [...] }"""
+    
+    MAX_OPERATIONS = 200
+    
+    operations = BatchOperationSerializer(many=True, min_length=1, max_length=MAX_OPERATIONS)
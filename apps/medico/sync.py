@@ -0,0 +1,254 @@
+# apps/medico/sync.py
+
+"""
+Sincronización con clientes offline y Google Calendar.
+
+Los tokens son opacos para el cliente: los recibe en cada respuesta de
+sincronización y los devuelve en la siguiente. favorites_version() detecta
+cambios en los favoritos hechos desde otro dispositivo; los tokens de marca
+de agua (updated_at, id) permiten pedir solo lo modificado desde la última
+sincronización.
+"""
+import base64
+import binascii
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+DEFAULT_SYNC_OVERLAP_SECONDS = 60
+DEFAULT_CASE_DELETION_RETENTION_DAYS = 90
+
+
+class SyncTokenExpired(ValueError):
+    """El token es anterior a la retención de eliminaciones: resincronizar todo"""
+
+
+def sync_overlap():
+    return timedelta(seconds=getattr(settings, 'SYNC_OVERLAP_SECONDS', DEFAULT_SYNC_OVERLAP_SECONDS))
+
+
+def deletion_retention():
+    return timedelta(days=getattr(
+        settings, 'CASE_DELETION_RETENTION_DAYS', DEFAULT_CASE_DELETION_RETENTION_DAYS
+    ))
+
+
+def favorites_version(codes):
+    """Token del conjunto de favoritos (independiente del orden)"""
+    raw = '\n'.join(sorted(codes))
+    return hashlib.md5(raw.encode()).hexdigest()[:16]
+
+
+def encode_sync_token(updated_at, pk=0):
+    """
+    Token de marca de agua (updated_at, id) del último cambio entregado.
+    El id desempata filas con el mismo updated_at entre páginas.
+    """
+    micros = (updated_at - EPOCH) // timedelta(microseconds=1)
+    raw = f'{micros}:{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """(updated_at, id) de un token; ValueError si el token no es válido"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        micros, pk = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+        updated_at = EPOCH + timedelta(microseconds=int(micros))
+        return updated_at, int(pk)
+    except (ValueError, TypeError, OverflowError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Token de sincronización inválido')
+
+
+def settle_token(token):
+    """
+    Retroceder el token final hasta ahora - SYNC_OVERLAP si es más reciente:
+    lo escrito en esa ventana puede pertenecer a transacciones aún abiertas.
+    """
+    if not token:
+        return token
+    updated_at, _ = decode_sync_token(token)
+    settled_at = timezone.now() - sync_overlap()
+    if updated_at > settled_at:
+        return encode_sync_token(settled_at)
+    return token
+
+
+def changed_since(queryset, token, limit):
+    """
+    Filas de `queryset` modificadas después del token, en orden
+    (updated_at, id), más una de control para saber si hay más.
+    Retorna (filas, siguiente_token, has_more); en la última página el
+    token se retrocede con settle_token().
+    """
+    if token:
+        updated_at, pk = decode_sync_token(token)
+        queryset = queryset.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=pk)
+        )
+
+    rows = list(queryset.order_by('updated_at', 'pk')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if rows:
+        last = rows[-1]
+        updated_at = last['updated_at'] if isinstance(last, dict) else last.updated_at
+        pk = last['id'] if isinstance(last, dict) else last.pk
+        token = encode_sync_token(updated_at, pk)
+    if not has_more:
+        token = settle_token(token)
+    return rows, token, has_more
+
+
+# Mismas reglas que calendarSyncService.ts al crear el evento
+DEFAULT_EVENT_START = time(8, 0)
+DEFAULT_EVENT_DURATION = timedelta(hours=2)
+
+CALENDAR_CASE_FIELDS = [
+    'id', 'calendar_event_id', 'patient_name', 'hospital_id', 'surgery_date',
+    'surgery_time', 'surgery_end_time', 'status', 'updated_at',
+]
+
+
+def case_event_times(case):
+    """(inicio, fin) con zona horaria del evento que corresponde al caso"""
+    start = timezone.make_aware(
+        datetime.combine(case['surgery_date'], case['surgery_time'] or DEFAULT_EVENT_START)
+    )
+    if case['surgery_end_time']:
+        end = timezone.make_aware(datetime.combine(case['surgery_date'], case['surgery_end_time']))
+    else:
+        end = start + DEFAULT_EVENT_DURATION
+    return start, end
+
+
+def _same_minute(a, b):
+    return a.replace(second=0, microsecond=0) == b.replace(second=0, microsecond=0)
+
+
+def reconcile_calendar(user, events, since=None, limit=500):
+    """
+    Conciliar eventos de Google Calendar con los casos del usuario.
+
+    `events`: dicts {event_id, start, end, etag} (datetimes con zona).
+    Con una sola consulta IN por calendar_event_id retorna:
+    - diverged: eventos cuyo horario no coincide con el del caso
+    - missing: event_ids sin caso (eliminado o de otro usuario)
+    - changed: casos modificados desde `since`, con el token siguiente
+    """
+    from .models import SurgicalCase
+
+    own_cases = SurgicalCase.objects.filter(created_by=user)
+    by_event = {
+        case['calendar_event_id']: case
+        for case in own_cases.filter(
+            calendar_event_id__in=[event['event_id'] for event in events]
+        ).values(*CALENDAR_CASE_FIELDS)
+    }
+
+    diverged = []
+    missing = []
+    for event in events:
+        case = by_event.get(event['event_id'])
+        if case is None:
+            missing.append(event['event_id'])
+            continue
+        if case['status'] == 'cancelled':
+            diverged.append({
+                'event_id': event['event_id'],
+                'etag': event.get('etag'),
+                'case': case,
+                'reason': 'cancelled',
+            })
+            continue
+
+        start, end = case_event_times(case)
+        if not (_same_minute(start, event['start']) and _same_minute(end, event['end'])):
+            diverged.append({
+                'event_id': event['event_id'],
+                'etag': event.get('etag'),
+                'case': case,
+                'reason': 'time',
+                'case_start': start,
+                'case_end': end,
+            })
+
+    changed, token, has_more = changed_since(
+        own_cases.values(*CALENDAR_CASE_FIELDS), since, limit
+    )
+
+    return {
+        'diverged': diverged,
+        'missing': missing,
+        'changed': changed,
+        'has_more': has_more,
+        'sync_token': token,
+    }
+
+
+def case_changes(user, since=None, limit=200):
+    """
+    Cambios en los casos visibles para `user` (propios + asistidos) desde el
+    token `since`: casos creados/modificados (en orden de updated_at) e ids
+    de casos que dejó de ver (CaseDeletion).
+
+    Si hay más páginas, el token avanza hasta el último caso entregado y
+    solo se incluyen las eliminaciones hasta ese punto; en la última página
+    avanza también sobre las eliminaciones (sin pasar de ahora - SYNC_OVERLAP).
+
+    SyncTokenExpired si `since` es anterior a la retención de CaseDeletion.
+    """
+    from .models import CaseDeletion, SurgicalCase
+
+    if since and decode_sync_token(since)[0] < timezone.now() - deletion_retention():
+        raise SyncTokenExpired(
+            'El token de sincronización expiró; sincronice de nuevo sin since'
+        )
+
+    cases = SurgicalCase.objects.filter(
+        Q(created_by=user) | Q(assistant_doctor=user)
+    ).select_related(
+        'hospital', 'created_by', 'assistant_doctor'
+    ).prefetch_related('procedures')
+
+    upserted, token, has_more = changed_since(cases, since, limit)
+
+    deletions = CaseDeletion.objects.filter(user=user)
+    if since:
+        deletions = deletions.filter(deleted_at__gt=decode_sync_token(since)[0])
+    if has_more:
+        deletions = deletions.filter(deleted_at__lte=upserted[-1].updated_at)
+    deletions = list(deletions.order_by('deleted_at').values_list('case_id', 'deleted_at'))
+
+    if not has_more and deletions:
+        last_deleted_at = deletions[-1][1]
+        if not upserted or last_deleted_at > upserted[-1].updated_at:
+            token = settle_token(encode_sync_token(last_deleted_at))
+
+    # Un caso eliminado y vuelto a ver (p. ej. reasignado) viaja como upsert
+    upserted_ids = {case.pk for case in upserted}
+    deleted = list(dict.fromkeys(
+        case_id for case_id, _ in deletions if case_id not in upserted_ids
+    ))
+
+    return upserted, deleted, token, has_more
+
+
+def purge_case_deletions(batch_size=1000):
+    """Eliminar en lotes los CaseDeletion más antiguos que la retención"""
+    from .models import CaseDeletion
+
+    expired = CaseDeletion.objects.filter(deleted_at__lt=timezone.now() - deletion_retention())
+    total = 0
+    while True:
+        batch_ids = list(expired.values_list('id', flat=True)[:batch_size])
+        if not batch_ids:
+            return total
+        deleted, _ = CaseDeletion.objects.filter(id__in=batch_ids).delete()
+        total += deleted
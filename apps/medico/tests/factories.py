@@ -0,0 +1,68 @@
+# apps/medico/tests/factories.py
+
+"""
+Factories de hospitales, casos y procedimientos para la suite de pruebas
+"""
+import datetime
+from decimal import Decimal
+
+import factory
+
+from apps.medico.models import CaseProcedure, FavoriteHospital, Hospital, SurgicalCase
+from apps.medio_auth.tests.factories import UserFactory
+
+SPECIALTIES = ['Cardiovascular', 'Digestivo', 'Ginecología', 'Neurocirugía', 'Ortopedia']
+
+
+class HospitalFactory(factory.django.DjangoModelFactory):
+
+    class Meta:
+        model = Hospital
+        django_get_or_create = ('name',)
+
+    name = factory.Sequence(lambda n: f'Hospital {n}')
+    location = factory.Faker('city', locale='es_ES')
+    rate_multiplier = Decimal('1.50')
+
+
+class SurgicalCaseFactory(factory.django.DjangoModelFactory):
+
+    class Meta:
+        model = SurgicalCase
+        skip_postgeneration_save = True
+
+    patient_name = factory.Faker('name', locale='es_ES')
+    patient_id = factory.Sequence(lambda n: f'EXP-{n:06d}')
+    hospital = factory.SubFactory(HospitalFactory)
+    surgery_date = factory.Sequence(lambda n: datetime.date(2026, 1, 1) + datetime.timedelta(days=n % 300))
+    created_by = factory.SubFactory(UserFactory)
+
+    @factory.post_generation
+    def procedures(case, create, extracted, **kwargs):
+        """SurgicalCaseFactory(procedures=5) crea 5 procedimientos"""
+        if create and extracted:
+            CaseProcedureFactory.create_batch(extracted, case=case, **kwargs)
+
+
+class CaseProcedureFactory(factory.django.DjangoModelFactory):
+
+    class Meta:
+        model = CaseProcedure
+
+    case = factory.SubFactory(SurgicalCaseFactory)
+    surgery_code = factory.Sequence(lambda n: str(50010 + n % 500))
+    surgery_name = factory.LazyAttribute(lambda procedure: f'Procedimiento {procedure.surgery_code}')
+    specialty = factory.Sequence(lambda n: SPECIALTIES[n % len(SPECIALTIES)])
+    rvu = Decimal('10.00')
+    hospital_factor = factory.LazyAttribute(lambda procedure: procedure.case.hospital.rate_multiplier)
+    calculated_value = factory.LazyAttribute(lambda procedure: procedure.rvu * procedure.hospital_factor)
+    order = factory.Sequence(lambda n: n % 10)
+
+
+class FavoriteHospitalFactory(factory.django.DjangoModelFactory):
+
+    class Meta:
+        model = FavoriteHospital
+
+    user = factory.SubFactory(UserFactory)
+    hospital = factory.SubFactory(HospitalFactory)
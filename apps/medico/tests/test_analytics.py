@@ -0,0 +1,86 @@
+# apps/medico/tests/test_analytics.py
+
+"""
+Analítica de ingresos y RVU: series con totales conocidos y llave de cache
+por watermark de los casos del médico.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from ..analytics import analytics_cache_key, build_analytics, get_analytics
+from .factories import CaseProcedureFactory, HospitalFactory, SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def history(doctor):
+    """
+    Enero: 2 procedimientos de 10 RVU × 1.50 en el hospital A (sin facturar).
+    Marzo: 1 procedimiento de 20 RVU × 2.00 en el hospital B (facturado).
+    Febrero: un caso anulado que no cuenta.
+    """
+    first = HospitalFactory(name='Hospital A', rate_multiplier=Decimal('1.50'))
+    second = HospitalFactory(name='Hospital B', rate_multiplier=Decimal('2.00'))
+
+    january = SurgicalCaseFactory(created_by=doctor, hospital=first, surgery_date=datetime.date(2026, 1, 10))
+    CaseProcedureFactory.create_batch(2, case=january, rvu=Decimal('10.00'))
+    march = SurgicalCaseFactory(
+        created_by=doctor, hospital=second, surgery_date=datetime.date(2026, 3, 5),
+        is_operated=True, is_billed=True, status='billed',
+    )
+    CaseProcedureFactory(case=march, rvu=Decimal('20.00'))
+    cancelled = SurgicalCaseFactory(
+        created_by=doctor, hospital=first, surgery_date=datetime.date(2026, 2, 1), status='cancelled'
+    )
+    CaseProcedureFactory(case=cancelled, rvu=Decimal('50.00'))
+    return january, march
+
+
+def test_revenue_and_rvu_series(doctor, history):
+    analytics = build_analytics(doctor, window=3)
+
+    assert analytics['total_procedures'] == 3
+    assert analytics['total_revenue'] == 70.0
+    assert analytics['monthly'] == [
+        {'month': '2026-01', 'cases': 1, 'procedures': 2, 'rvu': 20.0, 'revenue': 30.0, 'rolling_revenue': 30.0},
+        {'month': '2026-02', 'cases': 0, 'procedures': 0, 'rvu': 0.0, 'revenue': 0.0, 'rolling_revenue': 15.0},
+        {'month': '2026-03', 'cases': 1, 'procedures': 1, 'rvu': 20.0, 'revenue': 40.0, 'rolling_revenue': 23.33},
+    ]
+    assert [(h['hospital_name'], h['rvu'], h['revenue'], h['effective_rate']) for h in analytics['hospitals']] == [
+        ('Hospital B', 20.0, 40.0, 2.0),
+        ('Hospital A', 20.0, 30.0, 1.5),
+    ]
+    assert analytics['rvu_percentiles'] == {'p25': 10.0, 'p50': 10.0, 'p75': 15.0, 'p90': 18.0}
+    assert analytics['totals_by_status'] == {'not_billed': 30.0, 'billed_unpaid': 40.0, 'paid': 0.0}
+    assert analytics['projection']['outstanding'] == 40.0
+
+
+def test_empty_history(doctor):
+    analytics = build_analytics(doctor)
+    assert analytics['total_procedures'] == 0
+    assert analytics['monthly'] == []
+
+
+def test_cache_key_follows_watermark(doctor, history, django_assert_num_queries):
+    january, march = history
+    key = analytics_cache_key(doctor, 3, 3)
+    assert get_analytics(doctor)['total_procedures'] == 3
+
+    # Sin cambios: solo la consulta del watermark
+    with django_assert_num_queries(1):
+        assert get_analytics(doctor)['total_procedures'] == 3
+    assert analytics_cache_key(doctor, 3, 3) == key
+
+    # Un procedimiento nuevo mueve el watermark
+    CaseProcedureFactory(case=january, rvu=Decimal('10.00'))
+    assert analytics_cache_key(doctor, 3, 3) != key
+    assert get_analytics(doctor)['total_procedures'] == 4
+
+    # Un caso eliminado también (cambia la cantidad de casos)
+    key = analytics_cache_key(doctor, 3, 3)
+    march.delete()
+    assert analytics_cache_key(doctor, 3, 3) != key
+    assert get_analytics(doctor)['total_revenue'] == 45.0
@@ -0,0 +1,66 @@
+# apps/medico/tests/test_benchmarks.py
+
+"""
+Pruebas del harness de benchmarks (seed_benchmark / run_benchmarks) con
+volúmenes mínimos: que la carga sea consistente y que todos los escenarios
+respondan sin errores y produzcan un JSON comparable.
+"""
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.medico.benchmark import SCENARIOS, compare_results
+from apps.medico.models import CaseProcedure, SurgicalCase
+from apps.medico.seeding import scaled_volumes, seed
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def seeded():
+    volumes = scaled_volumes(users=5, hospitals=3, cases=40, ad_clients=3)
+    return seed(volumes, batch_size=16)
+
+
+def test_seed_volumes(seeded):
+    assert seeded['cases'] == SurgicalCase.objects.count() == 40
+    assert seeded['procedures'] == CaseProcedure.objects.count() == 200
+    assert not SurgicalCase.objects.filter(is_paid=True, is_billed=False).exists()
+
+
+def test_seed_refuses_existing_data(seeded):
+    with pytest.raises(CommandError):
+        call_command('seed_benchmark', cases=1)
+
+
+def test_run_benchmarks_report(seeded, tmp_path):
+    output = tmp_path / 'bench.json'
+    call_command('run_benchmarks', requests=2, warmup=0, cold=True, output=str(output))
+
+    report = json.loads(output.read_text())
+    assert report['volumes']['cases'] == 40
+    names = [scenario['name'] for scenario in report['scenarios']]
+    assert names[0] == 'cases-list'
+    assert {scenario['name'] for scenario in SCENARIOS} <= set(names)
+    assert 'cases-stats:cold' in names
+    for scenario in report['scenarios']:
+        assert scenario['errors'] == 0, scenario
+        assert scenario['p50_ms'] is not None
+        assert scenario['mean_queries'] is not None
+
+    # Misma corrida como referencia: sin aumento de consultas
+    call_command(
+        'run_benchmarks', requests=2, warmup=0, scenario=['cases-list'],
+        compare=str(output), max_regression=100, output=str(tmp_path / 'again.json'),
+    )
+
+
+def test_compare_results_flags_regressions():
+    baseline = {'scenarios': [{'name': 'cases-list', 'p50_ms': 10.0, 'max_queries': 3}]}
+    current = {'scenarios': [{'name': 'cases-list', 'p50_ms': 15.0, 'max_queries': 4}]}
+
+    regressions = compare_results(baseline, current, max_regression=0.25)
+    assert {regression['metric'] for regression in regressions} == {'p50_ms', 'max_queries'}
+    assert compare_results(baseline, baseline) == []
@@ -0,0 +1,41 @@
+# apps/medico/tests/test_bulk_status.py
+
+"""
+bulk-status: el UPDATE repite las condiciones de la validación.
+"""
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from apps.medico.models import SurgicalCase
+
+from .factories import SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_bulk_status_skips_cases_changed_concurrently(doctor, doctor_client):
+    billed = SurgicalCaseFactory.create_batch(2, created_by=doctor, is_operated=True, is_billed=True, status='billed')
+    changed = billed[1]
+    state = {'done': False}
+
+    def cancel_before_update(execute, sql, params, many, context):
+        # Otro request anula el caso entre la validación y el UPDATE
+        if sql.startswith('UPDATE') and not state['done']:
+            state['done'] = True
+            SurgicalCase.objects.filter(pk=changed.pk).update(status='cancelled')
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(cancel_before_update):
+        response = doctor_client.post(
+            reverse('medico:surgical-case-bulk-status'),
+            {'ids': [case.pk for case in billed], 'status': 'paid'},
+            format='json',
+        )
+
+    assert response.status_code == 200
+    assert response.data['updated'] == 1
+    results = {result['id']: result['result'] for result in response.data['results']}
+    assert results == {billed[0].pk: 'updated', changed.pk: 'skipped'}
+    changed.refresh_from_db()
+    assert changed.status == 'cancelled' and not changed.is_paid
@@ -0,0 +1,59 @@
+# apps/medico/tests/test_case_batch.py
+
+"""
+/cases/batch/: un caso que no se puede eliminar no deshace el resto del lote.
+"""
+import datetime
+
+import pytest
+from django.db import models
+from django.urls import reverse
+
+from apps.invoice.models import InvoiceItem
+from apps.invoice.services import generate_invoices
+from apps.medico.models import CaseDeletion, SurgicalCase
+
+from .factories import SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def paid_cases(doctor, count):
+    cases = SurgicalCaseFactory.create_batch(count, created_by=doctor, is_operated=True, procedures=1)
+    generate_invoices(doctor, datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+    SurgicalCase.objects.filter(created_by=doctor).update(is_paid=True, status='paid')
+    return list(SurgicalCase.objects.filter(pk__in=[case.pk for case in cases]).order_by('pk'))
+
+
+def batch(client, operations):
+    return client.post(reverse('medico:surgical-case-batch'), {'operations': operations}, format='json')
+
+
+def delete_op(case):
+    return {'op': 'delete', 'id': case.pk, 'version': case.updated_at.isoformat()}
+
+
+def test_batch_deletes_invoiced_cases(doctor, doctor_client):
+    cases = paid_cases(doctor, 2)
+
+    response = batch(doctor_client, [delete_op(case) for case in cases])
+
+    assert response.status_code == 200
+    assert response.data['summary'] == {'deleted': 2}
+    assert not InvoiceItem.objects.filter(case__isnull=False).exists()
+
+
+def test_batch_reports_protected_case_per_operation(doctor, doctor_client, monkeypatch):
+    cases = paid_cases(doctor, 3)
+    # Solo el caso del medio queda protegido
+    InvoiceItem.objects.exclude(case=cases[1]).update(case=None)
+    monkeypatch.setattr(InvoiceItem._meta.get_field('case').remote_field, 'on_delete', models.PROTECT)
+
+    response = batch(doctor_client, [delete_op(case) for case in cases])
+
+    assert response.status_code == 200
+    results = response.data['results']
+    assert [result['result'] for result in results] == ['deleted', 'cannot_delete', 'deleted']
+    assert 'Líneas de Factura' in results[1]['error']
+    assert list(SurgicalCase.objects.values_list('pk', flat=True)) == [cases[1].pk]
+    assert not CaseDeletion.objects.filter(case_id=cases[1].pk).exists()
@@ -0,0 +1,76 @@
+# apps/medico/tests/test_case_form.py
+
+"""
+Paquete cacheado del formulario de casos (/cases/form-data/): 0 consultas
+con cache caliente y reconstrucción tras cambios en casos, favoritos o
+tarifas.
+"""
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from ..models import Favorite
+from .factories import CaseProcedureFactory, HospitalFactory, SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse('medico:surgical-case-form-data')
+
+
+@pytest.fixture
+def hospital():
+    return HospitalFactory(rate_multiplier=Decimal('1.50'))
+
+
+@pytest.fixture
+def warm_form(doctor, doctor_client, hospital):
+    SurgicalCaseFactory(created_by=doctor, hospital=hospital, procedures=2)
+    response = doctor_client.get(URL)
+    assert response.status_code == 200
+    return response.data
+
+
+def test_case_form_cached(doctor_client, warm_form, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        response = doctor_client.get(URL)
+    assert response.data == warm_form
+
+
+def test_case_form_rebuilt_after_case_change(doctor, doctor_client, hospital, warm_form,
+                                             django_capture_on_commit_callbacks):
+    assert len(warm_form['top_codes']) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        case = SurgicalCaseFactory(created_by=doctor, hospital=HospitalFactory())
+        CaseProcedureFactory(case=case, surgery_code='77777')
+
+    response = doctor_client.get(URL)
+    assert '77777' in [row['surgery_code'] for row in response.data['top_codes']]
+    assert len(response.data['recent_hospitals']) == 2
+
+
+def test_case_form_rebuilt_after_favorite_change(doctor, doctor_client, warm_form,
+                                                 django_capture_on_commit_callbacks):
+    code = warm_form['top_codes'][0]['surgery_code']
+    assert not warm_form['top_codes'][0]['is_favorite']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Favorite.objects.create(user=doctor, surgery_code=code, surgery_name='Favorito', specialty='Ortopedia')
+
+    response = doctor_client.get(URL)
+    assert [favorite['surgery_code'] for favorite in response.data['favorites']] == [code]
+    top = {row['surgery_code']: row for row in response.data['top_codes']}
+    assert top[code]['is_favorite']
+
+
+def test_case_form_rebuilt_after_pricing_change(doctor_client, hospital, warm_form,
+                                                django_capture_on_commit_callbacks):
+    assert warm_form['recent_hospitals'][0]['rate_multiplier'] == Decimal('1.50')
+
+    hospital.rate_multiplier = Decimal('2.25')
+    with django_capture_on_commit_callbacks(execute=True):
+        hospital.save()
+
+    response = doctor_client.get(URL)
+    assert response.data['recent_hospitals'][0]['rate_multiplier'] == Decimal('2.25')
@@ -0,0 +1,47 @@
+# apps/medico/tests/test_case_import.py
+
+"""
+Importación de casos: las filas malformadas se reportan como errores de
+fila y los archivos ilegibles como 400, nunca como 500.
+"""
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from .factories import HospitalFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def upload(client, content, name='casos.csv'):
+    return client.post(
+        reverse('medico:surgical-case-import-cases'),
+        {'file': SimpleUploadedFile(name, content, content_type='text/csv'), 'dry_run': 'true'},
+        format='multipart',
+    )
+
+
+def test_import_reports_malformed_values_per_row(doctor_client):
+    hospital = HospitalFactory()
+    content = (
+        'paciente,hospital,fecha,codigos,edad\n'
+        f'Ana,{hospital.pk},2026-02-30,50010,40\n'
+        f'Luis,{hospital.pk},2026-02-10,50010,inf\n'
+    ).encode('utf-8')
+
+    response = upload(doctor_client, content)
+
+    assert response.status_code == 200
+    errors = {error['row']: error['errors'] for error in response.data['errors']}
+    assert 'surgery_date' in errors[2]
+    assert 'patient_age' in errors[3]
+
+
+def test_import_latin1_csv(doctor_client):
+    hospital = HospitalFactory(name='Hospital Peña')
+    content = f'paciente,hospital,fecha,codigos\nJosé,{hospital.name},2026-02-10,50010\n'.encode('cp1252')
+
+    response = upload(doctor_client, content)
+
+    assert response.status_code == 200
+    assert all('hospital' not in error['errors'] for error in response.data['errors'])
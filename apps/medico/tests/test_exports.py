@@ -0,0 +1,47 @@
+# apps/medico/tests/test_exports.py
+
+"""
+Exportaciones de casos: mismos filtros que el listado y sin fórmulas.
+"""
+import io
+
+import pytest
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from apps.medio_auth.tests.factories import UserFactory
+
+from .factories import SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def csv_rows(response):
+    return b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+
+
+def test_export_escapes_formulas(doctor, doctor_client):
+    SurgicalCaseFactory(created_by=doctor, patient_name='=HYPERLINK("http://x","y")', procedures=1)
+
+    response = doctor_client.get(reverse('medico:surgical-case-export-cases', args=['csv']))
+    assert '"\'=HYPERLINK(""http://x"",""y"")"' in csv_rows(response)[1]
+
+    response = doctor_client.get(reverse('medico:surgical-case-export-cases', args=['xlsx']))
+    workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+    cell = workbook.active.cell(row=2, column=2)
+    assert cell.data_type == 's'
+    assert cell.value == '=HYPERLINK("http://x","y")'
+
+
+def test_export_honours_assisted_only(doctor, doctor_client):
+    SurgicalCaseFactory(created_by=doctor, procedures=1)
+    assisted = SurgicalCaseFactory(created_by=UserFactory(), assistant_doctor=doctor, procedures=2)
+
+    url = reverse('medico:surgical-case-export-cases', args=['csv'])
+    rows = csv_rows(doctor_client.get(url, {'assisted_only': 'true'}))
+    assert len(rows) == 2
+    assert rows[1].startswith(f'{assisted.pk},')
+
+    url = reverse('medico:surgical-case-export-procedures', args=['csv'])
+    rows = csv_rows(doctor_client.get(url, {'assisted_only': 'true'}))
+    assert len(rows) == 3
@@ -0,0 +1,111 @@
+# apps/medico/tests/test_favorites.py
+
+"""
+Sincronización del conjunto de favoritos (/favorites/sync/): token de
+versión, conflicto 409 con versión desactualizada y conteo de diferencias.
+"""
+import pytest
+from django.urls import reverse
+
+from ..models import Favorite
+from ..sync import favorites_version
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse('medico:favorite-sync')
+
+
+def codes(user):
+    return set(Favorite.objects.filter(user=user).values_list('surgery_code', flat=True))
+
+
+def put(client, favorites, version=None):
+    data = {'favorites': [{'surgery_code': code, 'surgery_name': f'Cirugía {code}'} for code in favorites]}
+    if version is not None:
+        data['version'] = version
+    return client.put(URL, data, format='json')
+
+
+@pytest.fixture
+def favorites(doctor):
+    for code in ('11111', '22222', '33333'):
+        Favorite.objects.create(user=doctor, surgery_code=code, surgery_name=f'Cirugía {code}')
+    return codes(doctor)
+
+
+def test_get_returns_codes_and_version(doctor_client, favorites):
+    response = doctor_client.get(URL)
+
+    assert response.status_code == 200
+    assert response.data['codes'] == ['11111', '22222', '33333']
+    assert response.data['version'] == favorites_version(favorites)
+    # El token no depende del orden
+    assert favorites_version(['33333', '11111', '22222']) == response.data['version']
+
+
+def test_put_applies_diff(doctor, doctor_client, favorites):
+    version = doctor_client.get(URL).data['version']
+
+    response = put(doctor_client, ['22222', '33333', '44444', '55555'], version)
+
+    assert response.status_code == 200
+    assert response.data['added'] == 2
+    assert response.data['removed'] == 1
+    assert response.data['codes'] == ['22222', '33333', '44444', '55555']
+    assert codes(doctor) == set(response.data['codes'])
+    assert response.data['version'] == favorites_version(codes(doctor))
+    assert response.data['version'] != version
+
+
+def test_put_without_changes(doctor_client, favorites):
+    version = favorites_version(favorites)
+
+    response = put(doctor_client, sorted(favorites), version)
+
+    assert (response.data['added'], response.data['removed']) == (0, 0)
+    assert response.data['version'] == version
+
+
+def test_stale_version_conflicts(doctor, doctor_client, favorites):
+    stale = favorites_version(favorites)
+    # Otro dispositivo agregó un favorito
+    Favorite.objects.create(user=doctor, surgery_code='99999', surgery_name='Otro dispositivo')
+
+    response = put(doctor_client, ['11111'], stale)
+
+    assert response.status_code == 409
+    assert response.data['codes'] == ['11111', '22222', '33333', '99999']
+    assert response.data['version'] == favorites_version(codes(doctor))
+    assert codes(doctor) == favorites | {'99999'}
+
+    # Con la versión vigente el reemplazo se aplica
+    response = put(doctor_client, ['11111'], response.data['version'])
+    assert response.status_code == 200
+    assert response.data['removed'] == 3
+    assert codes(doctor) == {'11111'}
+
+
+def test_put_without_version_overwrites(doctor, doctor_client, favorites):
+    response = put(doctor_client, ['77777'])
+
+    assert response.status_code == 200
+    assert codes(doctor) == {'77777'}
+
+
+def test_response_reports_stored_set(doctor, doctor_client, favorites, monkeypatch):
+    """La respuesta refleja lo guardado, no lo enviado por el cliente"""
+    manager = type(Favorite.objects)
+    bulk_create = manager.bulk_create
+
+    def racing_bulk_create(self, objs, **kwargs):
+        # Otro favorito guardado mientras se aplicaba la diferencia
+        Favorite.objects.create(user=doctor, surgery_code='88888', surgery_name='Concurrente')
+        return bulk_create(self, objs, **kwargs)
+
+    monkeypatch.setattr(manager, 'bulk_create', racing_bulk_create)
+
+    response = put(doctor_client, sorted(favorites | {'44444'}), favorites_version(favorites))
+
+    assert response.status_code == 200
+    assert response.data['codes'] == ['11111', '22222', '33333', '44444', '88888']
+    assert response.data['version'] == favorites_version(codes(doctor))
@@ -0,0 +1,76 @@
+# apps/medico/tests/test_history.py
+
+"""
+CalculationRecorder: un volcado fallido no pierde el lote completo.
+"""
+from decimal import Decimal
+
+import pytest
+from django.db import IntegrityError, OperationalError
+
+from apps.medico.history import CalculationRecorder
+from apps.medico.models import CalculationHistory
+
+from .factories import HospitalFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def entries(user, hospital, count):
+    return [
+        CalculationHistory(
+            user=user, hospital_id=hospital.pk, surgery_code=str(50010 + n),
+            surgery_name='Procedimiento', calculated_value=Decimal('10.00'),
+        )
+        for n in range(count)
+    ]
+
+
+@pytest.fixture
+def failing_bulk_create(monkeypatch):
+    """bulk_create que rechaza las filas de los hospitales en `state['bad']`"""
+    original = CalculationHistory.objects.bulk_create
+    state = {'bad': set(), 'unavailable': False}
+
+    def bulk_create(objs, **kwargs):
+        if state['unavailable']:
+            raise OperationalError('server closed the connection unexpectedly')
+        if any(obj.hospital_id in state['bad'] for obj in objs):
+            raise IntegrityError('violates foreign key constraint')
+        return original(objs, **kwargs)
+
+    monkeypatch.setattr(CalculationHistory.objects, 'bulk_create', bulk_create)
+    return state
+
+
+def test_flush_drops_only_rejected_rows(doctor, failing_bulk_create):
+    hospital, deleted = HospitalFactory.create_batch(2)
+    failing_bulk_create['bad'].add(deleted.pk)
+    recorder = CalculationRecorder(flush_size=1000)
+    for entry in entries(doctor, hospital, 3) + entries(doctor, deleted, 1) + entries(doctor, hospital, 2):
+        recorder.record(entry)
+
+    assert recorder.flush() == 5
+    assert CalculationHistory.objects.filter(hospital=hospital).count() == 5
+    assert recorder.pending() == 0
+
+
+def test_flush_keeps_buffer_while_database_unavailable(doctor, failing_bulk_create):
+    hospital = HospitalFactory()
+    recorder = CalculationRecorder(flush_size=1000, max_buffer=4)
+    for entry in entries(doctor, hospital, 3):
+        recorder.record(entry)
+
+    failing_bulk_create['unavailable'] = True
+    assert recorder.flush() == 0
+    assert recorder.pending() == 3
+
+    # El buffer se acota descartando los más antiguos
+    for entry in entries(doctor, hospital, 2):
+        recorder.record(entry)
+    assert recorder.flush() == 0
+    assert recorder.pending() == 4
+
+    failing_bulk_create['unavailable'] = False
+    assert recorder.flush() == 4
+    assert CalculationHistory.objects.count() == 4
@@ -0,0 +1,70 @@
+# apps/medico/tests/test_pricing.py
+
+"""
+Valorización en el servidor: el RVU del catálogo manda; el del cliente solo
+se usa para códigos sin RVU fijo (BR/RNE). Hospitales creados sin señales
+se valorizan igual.
+"""
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from apps.medico.models import Hospital
+from apps.medico.pricing import get_pricing_engine, price_procedures
+
+from .factories import HospitalFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_catalog_rvu_overrides_client_rvu():
+    hospital = HospitalFactory(rate_multiplier=Decimal('2.00'))
+    procedures = [
+        {'surgery_code': '33010', 'rvu': Decimal('999.00')},   # RVU fijo 1.1
+        {'surgery_code': '33250', 'rvu': Decimal('12.50')},    # sin RVU fijo
+    ]
+
+    price_procedures(hospital.pk, procedures)
+
+    assert procedures[0]['rvu'] == Decimal('1.10')
+    assert procedures[0]['calculated_value'] == Decimal('2.20')
+    assert procedures[1]['rvu'] == Decimal('12.50')
+    assert procedures[1]['calculated_value'] == Decimal('25.00')
+
+
+def test_code_without_rvu_requires_client_value():
+    hospital = HospitalFactory()
+    with pytest.raises(ValueError):
+        get_pricing_engine().price(hospital.pk, '33250')
+
+
+def test_hospital_created_without_signals(doctor_client):
+    HospitalFactory()
+    engine = get_pricing_engine()
+    # bulk_create no emite post_save: el motor en memoria no lo conoce
+    hospital = Hospital.objects.bulk_create([Hospital(name='Sin señales', rate_multiplier=Decimal('3.00'))])[0]
+    assert get_pricing_engine() is engine
+
+    response = doctor_client.post(
+        reverse('medico:price-quote'), {'codes': ['33010'], 'hospital_ids': [hospital.pk]}, format='json'
+    )
+
+    assert response.status_code == 200
+    assert response.data['hospitals'][0]['values'] == [Decimal('3.30')]
+    assert engine.price(hospital.pk, '33010') == (Decimal('1.10'), Decimal('3.00'), Decimal('3.30'))
+    # El motor se invalidó para que la próxima reconstrucción lo incluya
+    assert get_pricing_engine() is not engine
+    assert hospital.pk in get_pricing_engine().hospital_index
+
+
+def test_quote_with_hospital_missing_from_engine():
+    known = HospitalFactory(rate_multiplier=Decimal('2.00'))
+    engine = get_pricing_engine()
+    missing = Hospital.objects.bulk_create([Hospital(name='Sin señales', rate_multiplier=Decimal('3.00'))])[0]
+
+    values = engine.quote([known.pk, missing.pk], ['33010'])
+
+    assert values.tolist() == [[220], [330]]
+    with pytest.raises(KeyError):
+        engine.factor_cents(missing.pk + 1000, '33010')
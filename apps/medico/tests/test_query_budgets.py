@@ -0,0 +1,122 @@
+# apps/medico/tests/test_query_budgets.py
+
+"""
+Presupuestos de consultas por endpoint.
+
+Cada prueba fija el máximo de consultas SQL de un endpoint con datos de
+volumen realista; si un cambio introduce un N+1 (una consulta por fila en
+un serializer o en una vista) el número crece con los datos y la prueba
+falla. Los presupuestos no incluyen la autenticación (force_authenticate).
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.medio_auth.tests.factories import UserFactory
+
+from .factories import FavoriteHospitalFactory, HospitalFactory, SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.fixture
+def hospitals():
+    return HospitalFactory.create_batch(5)
+
+
+@pytest.fixture
+def doctor_cases(doctor, hospitals):
+    """50 casos propios con 5 procedimientos cada uno, y 5 como ayudante"""
+    assistant_of = UserFactory()
+    cases = [
+        SurgicalCaseFactory(created_by=doctor, hospital=hospitals[i % 5], procedures=5)
+        for i in range(50)
+    ]
+    cases += [
+        SurgicalCaseFactory(created_by=assistant_of, assistant_doctor=doctor, hospital=hospitals[0], procedures=5)
+        for _ in range(5)
+    ]
+    return cases
+
+
+def test_case_list_budget(doctor_client, doctor_cases, django_assert_max_num_queries):
+    # count + página de casos (hospital, creador y ayudante con JOIN) + procedimientos
+    with django_assert_max_num_queries(3):
+        response = doctor_client.get(reverse('medico:surgical-case-list'))
+    assert response.status_code == 200
+    assert response.data['count'] == 55
+    assert all(case['procedure_count'] == 5 for case in response.data['results'])
+
+
+def test_case_list_does_not_grow_with_cases(doctor, doctor_client, hospitals):
+    url = reverse('medico:surgical-case-list')
+    SurgicalCaseFactory.create_batch(2, created_by=doctor, hospital=hospitals[0], procedures=2)
+    few = count_queries(doctor_client, url)
+
+    SurgicalCaseFactory.create_batch(18, created_by=doctor, hospital=hospitals[1], procedures=5)
+    many = count_queries(doctor_client, url)
+    assert few == many
+
+
+def test_case_detail_budget(doctor_client, doctor_cases, django_assert_max_num_queries):
+    with django_assert_max_num_queries(2):
+        response = doctor_client.get(reverse('medico:surgical-case-detail', args=[doctor_cases[0].pk]))
+    assert response.status_code == 200
+    assert len(response.data['procedures']) == 5
+
+
+def test_case_stats_budget(doctor_client, doctor_cases, django_assert_max_num_queries):
+    # por estado (casos y procedimientos), especialidades y 5 casos recientes
+    with django_assert_max_num_queries(5):
+        response = doctor_client.get(reverse('medico:surgical-case-get-stats'))
+    assert response.status_code == 200
+    assert response.data['total_cases'] == 50
+    assert response.data['total_procedures'] == 250
+    assert sum(item['count'] for item in response.data['cases_by_status'].values()) == 50
+    assert len(response.data['recent_cases']) == 5
+
+
+def test_case_stats_cached(doctor_client, doctor_cases, django_assert_num_queries):
+    url = reverse('medico:surgical-case-get-stats')
+    doctor_client.get(url)
+    with django_assert_num_queries(0):
+        response = doctor_client.get(url)
+    assert response.data['total_cases'] == 50
+
+
+def test_case_form_data_budget(doctor_client, doctor_cases, django_assert_max_num_queries):
+    with django_assert_max_num_queries(3):
+        response = doctor_client.get(reverse('medico:surgical-case-form-data'))
+    assert response.status_code == 200
+
+
+def test_hospital_list_budget(doctor, doctor_client, django_assert_max_num_queries):
+    hospitals = HospitalFactory.create_batch(40)
+    for hospital in hospitals[:10]:
+        FavoriteHospitalFactory(user=doctor, hospital=hospital)
+
+    # favoritos del usuario + hospitales (is_favorite sin consulta por hospital)
+    with django_assert_max_num_queries(2):
+        response = doctor_client.get(reverse('medico:hospital-list'))
+    assert response.status_code == 200
+    assert len(response.data) == 40
+    assert sum(hospital['is_favorite'] for hospital in response.data) == 10
+    assert all(hospital['is_favorite'] for hospital in response.data[:10])
+
+
+def test_favorite_hospitals_budget(doctor, doctor_client, django_assert_max_num_queries):
+    for hospital in HospitalFactory.create_batch(15):
+        FavoriteHospitalFactory(user=doctor, hospital=hospital)
+
+    with django_assert_max_num_queries(2):
+        response = doctor_client.get(reverse('medico:hospital-favorites'))
+    assert len(response.data) == 15
+    assert all(item['hospital']['is_favorite'] for item in response.data)
@@ -0,0 +1,108 @@
+# apps/medico/tests/test_repricing.py
+
+"""
+Revalorización al cambiar Hospital.rate_multiplier: solo procedimientos no
+facturados, mismo redondeo que el motor de precios y --dry-run sin escribir.
+"""
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from ..models import CaseProcedure, Hospital, HospitalOperationRate, Operation, Specialty
+from ..pricing import from_cents, multiply_cents, to_cents
+from ..repricing import reprice_hospital
+from .factories import CaseProcedureFactory, HospitalFactory, SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+# RVU con medio centavo al multiplicar por 1.50 / 1.35
+RVUS = [Decimal('1.15'), Decimal('3.33'), Decimal('10.01')]
+
+
+@pytest.fixture
+def hospital():
+    return HospitalFactory(rate_multiplier=Decimal('1.50'))
+
+
+@pytest.fixture
+def procedures(doctor, hospital):
+    """Un caso por estado con los mismos tres procedimientos"""
+    cases = {
+        'scheduled': SurgicalCaseFactory(created_by=doctor, hospital=hospital),
+        'completed': SurgicalCaseFactory(created_by=doctor, hospital=hospital, is_operated=True, status='completed'),
+        'billed': SurgicalCaseFactory(
+            created_by=doctor, hospital=hospital, is_operated=True, is_billed=True, status='billed'
+        ),
+        'paid': SurgicalCaseFactory(
+            created_by=doctor, hospital=hospital, is_operated=True, is_billed=True, is_paid=True, status='paid'
+        ),
+        'cancelled': SurgicalCaseFactory(created_by=doctor, hospital=hospital, status='cancelled'),
+    }
+    for case in cases.values():
+        for rvu in RVUS:
+            CaseProcedureFactory(case=case, rvu=rvu, surgery_code='99001')
+    return cases
+
+
+def values(case):
+    return list(CaseProcedure.objects.filter(case=case).order_by('id').values_list('hospital_factor', 'calculated_value'))
+
+
+def engine_value(rvu, factor):
+    return from_cents(multiply_cents(to_cents(rvu), to_cents(factor)))
+
+
+def test_multiplier_change_reprices_unbilled(hospital, procedures, django_capture_on_commit_callbacks):
+    before = {status: values(case) for status, case in procedures.items()}
+
+    hospital.rate_multiplier = Decimal('1.35')
+    with django_capture_on_commit_callbacks(execute=True):
+        hospital.save()
+
+    expected = [(Decimal('1.35'), engine_value(rvu, Decimal('1.35'))) for rvu in RVUS]
+    assert values(procedures['scheduled']) == expected
+    assert values(procedures['completed']) == expected
+    for status in ('billed', 'paid', 'cancelled'):
+        assert values(procedures[status]) == before[status]
+
+
+def test_rounding_matches_pricing_engine(hospital, procedures):
+    hospital.rate_multiplier = Decimal('1.50')
+    CaseProcedure.objects.update(hospital_factor=Decimal('1.00'))
+
+    reprice_hospital(hospital)
+
+    assert [value for _, value in values(procedures['scheduled'])] == [
+        engine_value(rvu, Decimal('1.50')) for rvu in RVUS
+    ] == [Decimal('1.73'), Decimal('5.00'), Decimal('15.02')]
+
+
+def test_hospital_rate_codes_are_not_repriced(hospital, procedures):
+    operation = Operation.objects.create(
+        name='Con tarifa propia', code='99001', base_points=Decimal('1.00'),
+        specialty=Specialty.objects.create(name='Ortopedia'),
+    )
+    HospitalOperationRate.objects.create(
+        hospital=hospital, operation=operation, point_value=Decimal('1.00'), currency_per_point=Decimal('9.00')
+    )
+    hospital.rate_multiplier = Decimal('2.00')
+
+    assert reprice_hospital(hospital)['procedures'] == 0
+
+
+def test_dry_run_writes_nothing(hospital, procedures):
+    before = list(CaseProcedure.objects.order_by('id').values_list('hospital_factor', 'calculated_value', 'updated_at'))
+    # Cambio sin señales: solo el comando revaloriza
+    Hospital.objects.filter(pk=hospital.pk).update(rate_multiplier=Decimal('2.00'))
+
+    out = io.StringIO()
+    call_command('reprice_procedures', '--hospital', str(hospital.pk), '--dry-run', stdout=out)
+
+    assert '[DRY RUN] 6 procedimiento(s)' in out.getvalue()
+    after = list(CaseProcedure.objects.order_by('id').values_list('hospital_factor', 'calculated_value', 'updated_at'))
+    assert after == before
+
+    call_command('reprice_procedures', '--hospital', str(hospital.pk), stdout=io.StringIO())
+    assert values(procedures['scheduled']) == [(Decimal('2.00'), engine_value(rvu, Decimal('2.00'))) for rvu in RVUS]
@@ -0,0 +1,182 @@
+# apps/medico/tests/test_sync.py
+
+"""
+Sincronización incremental: ventana de solapamiento para transacciones que
+confirman tarde, retención de CaseDeletion y conciliación con Google
+Calendar.
+"""
+import datetime
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.medico.models import CaseDeletion, SurgicalCase
+from apps.medico.serializers.surgical_case import CalendarSyncSerializer
+from apps.medico.sync import encode_sync_token, reconcile_calendar
+
+from .factories import SurgicalCaseFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def sync(client, since=None):
+    params = {'since': since} if since else {}
+    return client.get(reverse('medico:surgical-case-changes'), params)
+
+
+def test_late_commit_is_delivered_in_next_sync(doctor, doctor_client):
+    SurgicalCaseFactory(created_by=doctor)
+    first = sync(doctor_client)
+    assert len(first.data['upserted']) == 1
+
+    # Transacción que empezó antes de la sincronización y confirmó después:
+    # su updated_at es anterior al último caso entregado
+    late = SurgicalCaseFactory(created_by=doctor)
+    SurgicalCase.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=5))
+
+    second = sync(doctor_client, first.data['sync_token'])
+    assert late.pk in [case['id'] for case in second.data['upserted']]
+
+
+def test_settled_changes_are_not_repeated(doctor, doctor_client):
+    case = SurgicalCaseFactory(created_by=doctor)
+    SurgicalCase.objects.filter(pk=case.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    first = sync(doctor_client)
+    second = sync(doctor_client, first.data['sync_token'])
+    assert second.data['upserted'] == []
+
+
+def test_expired_token_requires_full_resync(doctor, doctor_client, settings):
+    settings.CASE_DELETION_RETENTION_DAYS = 30
+    token = encode_sync_token(timezone.now() - timedelta(days=31))
+
+    response = sync(doctor_client, token)
+
+    assert response.status_code == 410
+    assert response.data['full_resync'] is True
+
+
+def test_purge_case_deletions(doctor, settings):
+    settings.CASE_DELETION_RETENTION_DAYS = 30
+    now = timezone.now()
+    CaseDeletion.objects.bulk_create([
+        CaseDeletion(case_id=1, user=doctor, deleted_at=now - timedelta(days=40)),
+        CaseDeletion(case_id=2, user=doctor, deleted_at=now - timedelta(days=5)),
+    ])
+
+    call_command('purge_case_deletions', stdout=io.StringIO())
+
+    assert list(CaseDeletion.objects.values_list('case_id', flat=True)) == [2]
+
+
+CALENDAR_URL = reverse('medico:surgical-case-calendar-sync')
+MARCH_10 = datetime.date(2026, 3, 10)
+
+
+def event(event_id, start, end):
+    return {
+        'event_id': event_id,
+        'start': f'2026-03-10T{start}-06:00',
+        'end': f'2026-03-10T{end}-06:00',
+        'etag': f'"{event_id}"',
+    }
+
+
+def calendar_sync(client, events, since=None):
+    data = {'events': events}
+    if since:
+        data['since'] = since
+    return client.post(CALENDAR_URL, data, format='json')
+
+
+@pytest.fixture
+def calendar_cases(doctor):
+    """Casos del 10 de marzo vinculados a eventos (hora local America/Guatemala)"""
+    return {
+        # Sin hora: 08:00 a 10:00
+        'default': SurgicalCaseFactory(created_by=doctor, surgery_date=MARCH_10, calendar_event_id='evt-default'),
+        'timed': SurgicalCaseFactory(
+            created_by=doctor, surgery_date=MARCH_10, calendar_event_id='evt-timed',
+            surgery_time=datetime.time(9, 0), surgery_end_time=datetime.time(11, 30),
+        ),
+        'cancelled': SurgicalCaseFactory(
+            created_by=doctor, surgery_date=MARCH_10, calendar_event_id='evt-cancelled', status='cancelled'
+        ),
+        'foreign': SurgicalCaseFactory(surgery_date=MARCH_10, calendar_event_id='evt-foreign'),
+    }
+
+
+def test_calendar_events_matched_to_cases(doctor_client, calendar_cases):
+    response = calendar_sync(doctor_client, [
+        # Los segundos no cuentan
+        event('evt-default', '08:00:30', '10:00:00'),
+        event('evt-timed', '10:00:00', '11:30:00'),
+        event('evt-cancelled', '08:00:00', '10:00:00'),
+        event('evt-foreign', '08:00:00', '10:00:00'),
+        event('evt-unknown', '08:00:00', '10:00:00'),
+    ])
+
+    assert response.status_code == 200
+    diverged = {item['event_id']: item for item in response.data['diverged']}
+    assert set(diverged) == {'evt-timed', 'evt-cancelled'}
+    assert diverged['evt-timed']['reason'] == 'time'
+    assert diverged['evt-timed']['case']['id'] == calendar_cases['timed'].pk
+    assert diverged['evt-timed']['case_start'].hour == 9
+    assert diverged['evt-timed']['etag'] == '"evt-timed"'
+    assert diverged['evt-cancelled']['reason'] == 'cancelled'
+    # El evento de otro usuario no revela su caso
+    assert response.data['missing'] == ['evt-foreign', 'evt-unknown']
+
+
+def test_calendar_since_token(doctor_client, calendar_cases, settings):
+    settings.SYNC_OVERLAP_SECONDS = 0
+
+    first = calendar_sync(doctor_client, [])
+    own = {calendar_cases[name].pk for name in ('default', 'timed', 'cancelled')}
+    assert {case['id'] for case in first.data['changed']} == own
+    assert first.data['has_more'] is False
+
+    assert calendar_sync(doctor_client, [], first.data['sync_token']).data['changed'] == []
+
+    calendar_cases['timed'].surgery_time = datetime.time(10, 0)
+    calendar_cases['timed'].save()
+    calendar_cases['foreign'].save()
+
+    second = calendar_sync(doctor_client, [], first.data['sync_token'])
+    assert [case['id'] for case in second.data['changed']] == [calendar_cases['timed'].pk]
+
+    assert calendar_sync(doctor_client, [], 'no-es-un-token').status_code == 400
+
+
+def test_calendar_changed_pages(doctor, calendar_cases):
+    first = reconcile_calendar(doctor, [], limit=2)
+    assert len(first['changed']) == 2
+    assert first['has_more'] is True
+
+    second = reconcile_calendar(doctor, [], since=first['sync_token'], limit=2)
+    assert len(second['changed']) == 1
+    assert second['has_more'] is False
+
+
+def test_calendar_max_events(doctor, doctor_client, calendar_cases, django_assert_num_queries):
+    limit = CalendarSyncSerializer.MAX_EVENTS
+    events = [event(f'evt-{n}', '08:00:00', '10:00:00') for n in range(limit)]
+
+    response = calendar_sync(doctor_client, events + [event('evt-extra', '08:00:00', '10:00:00')])
+    assert response.status_code == 400
+    assert 'events' in response.data
+
+    response = calendar_sync(doctor_client, events)
+    assert response.status_code == 200
+    assert len(response.data['missing']) == limit
+
+    # Una consulta IN para los eventos y otra para los cambios, sin importar cuántos
+    serializer = CalendarSyncSerializer(data={'events': events})
+    serializer.is_valid(raise_exception=True)
+    with django_assert_num_queries(2):
+        reconcile_calendar(doctor, serializer.validated_data['events'])
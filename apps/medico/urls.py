@@ -9,6 +9,8 @@ from apps.medico.views import (
     AdminUserViewSet
 )
 from apps.medico.serializers.hospital import HospitalViewSet
+from apps.medico.views.pricing import price_quote
+from apps.medico.views.history import CalculationHistoryViewSet
 
 app_name = 'medico'
 
@@ -18,8 +20,10 @@ router.register(r'favorites', FavoriteViewSet, basename='favorite')
 router.register(r'cases', SurgicalCaseViewSet, basename='surgical-case')
 router.register(r'procedures', CaseProcedureViewSet, basename='case-procedure')
 router.register(r'hospitals', HospitalViewSet, basename='hospital')
+router.register(r'calculations', CalculationHistoryViewSet, basename='calculation')
 router.register(r'admin/users', AdminUserViewSet, basename='admin-users')
 
 urlpatterns = [
+    path('price-quote/', price_quote, name='price-quote'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -6,10 +6,13 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import transaction
 from django.db.models import Count
 
 from apps.medico.models import Favorite, SurgicalCase
-from apps.medico.serializers import FavoriteSerializer
+from apps.medico.serializers import FavoriteSerializer, FavoriteSyncSerializer
+from apps.medico.caching import invalidate_favorites
+from apps.medico.sync import favorites_version
 
 # Import surgical case views
 from .surgical_case import SurgicalCaseViewSet, CaseProcedureViewSet
@@ -26,6 +29,7 @@ class FavoriteViewSet(viewsets.ModelViewSet):
     - POST /api/favorites/ - Agregar favorito
     - DELETE /api/favorites/{id}/ - Eliminar favorito
     - DELETE /api/favorites/clear/ - Eliminar todos los favoritos
+    - GET/PUT /api/favorites/sync/ - Consultar/reemplazar el conjunto completo
     """
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
@@ -122,6 +126,71 @@ class FavoriteViewSet(viewsets.ModelViewSet):
                 },
                 status=status.HTTP_201_CREATED
             )
+    
+    @action(detail=False, methods=['get', 'put'], url_path='sync')
+    def sync(self, request):
+        """
+        Reemplazar el conjunto de favoritos por el enviado aplicando solo la
+        diferencia: un bulk_create (ignore_conflicts sobre la restricción
+        única user + surgery_code) y un DELETE ... WHERE surgery_code IN.
+        
+        Si se envía `version` y no coincide con la actual (otro dispositivo
+        cambió los favoritos), responde 409 con el conjunto vigente. La
+        lectura, la comparación y la escritura ocurren dentro de la misma
+        transacción con la fila del usuario bloqueada (select_for_update),
+        de modo que dos PUT concurrentes se serializan.
+        """
+        if request.method == 'GET':
+            current = set(self.get_queryset().values_list('surgery_code', flat=True))
+            return Response({
+                'codes': sorted(current),
+                'version': favorites_version(current),
+            }, status=status.HTTP_200_OK)
+        
+        serializer = FavoriteSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        expected = serializer.validated_data.get('version')
+        desired = {item['surgery_code']: item for item in serializer.validated_data['favorites']}
+        
+        with transaction.atomic():
+            User.objects.select_for_update().only('pk').get(pk=request.user.pk)
+            current = set(self.get_queryset().values_list('surgery_code', flat=True))
+            
+            if expected and expected != favorites_version(current):
+                return Response(
+                    {
+                        'error': 'Los favoritos cambiaron desde la última sincronización',
+                        'codes': sorted(current),
+                        'version': favorites_version(current),
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            removed = current - desired.keys()
+            added = [item for code, item in desired.items() if code not in current]
+            
+            if removed:
+                self.get_queryset().filter(surgery_code__in=removed).delete()
+            if added:
+                Favorite.objects.bulk_create(
+                    [Favorite(user=request.user, **item) for item in added],
+                    ignore_conflicts=True
+                )
+            stored = set(self.get_queryset().values_list('surgery_code', flat=True))
+        
+        # bulk_create no emite señales
+        if added:
+            invalidate_favorites(request.user.pk)
+        
+        return Response(
+            {
+                'codes': sorted(stored),
+                'version': favorites_version(stored),
+                'added': len(added),
+                'removed': len(removed),
+            },
+            status=status.HTTP_200_OK
+        )
 
 
 class AdminUserViewSet(viewsets.ModelViewSet):
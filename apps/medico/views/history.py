@@ -0,0 +1,76 @@
+# apps/medico/views/history.py
+
+"""
+Historial de la calculadora (registro diferido)
+"""
+from rest_framework import mixins, status, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.medico.history import flush_calculations, record_calculation
+from apps.medico.models import CalculationHistory
+from apps.medico.serializers import (
+    CalculationHistorySerializer,
+    CalculationRecordSerializer,
+)
+
+
+class CalculationCursorPagination(CursorPagination):
+    """
+    Paginación por cursor sobre el índice (user, calculated_at): cada página
+    es un rango del índice, sin OFFSET ni COUNT(*).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-calculated_at', '-id')
+
+
+class CalculationHistoryViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Historial de cálculos del usuario.
+
+    Endpoints:
+    - GET /calculations/ - Listar (paginado por cursor)
+    - POST /calculations/ - Registrar un cálculo (202, se guarda en diferido)
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = CalculationCursorPagination
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return CalculationRecordSerializer
+        return CalculationHistorySerializer
+
+    def get_queryset(self):
+        return CalculationHistory.objects.filter(
+            user=self.request.user
+        ).select_related('hospital')
+
+    def list(self, request, *args, **kwargs):
+        # Que el usuario vea sus cálculos recientes aún en el buffer de
+        # este proceso (los de otros procesos aparecen en su próximo volcado)
+        flush_calculations()
+        return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        entry = record_calculation(
+            user_id=request.user.pk,
+            hospital_id=data['hospital'],
+            surgery_code=data['surgery_code'],
+            surgery_name=data.get('surgery_name', ''),
+            calculated_value=data['calculated_value'],
+            notes=data.get('notes'),
+        )
+
+        return Response({
+            'surgery_code': entry.surgery_code,
+            'hospital': entry.hospital_id,
+            'calculated_value': str(entry.calculated_value),
+            'calculated_at': entry.calculated_at,
+        }, status=status.HTTP_202_ACCEPTED)
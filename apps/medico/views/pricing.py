@@ -0,0 +1,70 @@
+# apps/medico/views/pricing.py
+
+"""
+Cotización de procedimientos con el motor de precios
+"""
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.medico.models import Hospital
+from apps.medico.pricing import from_cents, get_pricing_engine
+from apps.medico.catalog import get_catalog
+from apps.medico.serializers import PriceQuoteSerializer
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def price_quote(request):
+    """
+    Valorizar N procedimientos en M hospitales en una sola llamada
+    (pantalla de comparación de hospitales).
+    
+    Body: { "codes": [...], "hospital_ids": [...] (opcional, por defecto
+    todos), "rvus": {"codigo": rvu} (opcional, para códigos sin RVU fijo) }
+    """
+    serializer = PriceQuoteSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    codes = serializer.validated_data['codes']
+    manual_rvus = serializer.validated_data.get('rvus', {})
+    
+    hospitals = Hospital.objects.order_by('name').values_list('id', 'name')
+    if serializer.validated_data.get('hospital_ids'):
+        hospitals = hospitals.filter(id__in=serializer.validated_data['hospital_ids'])
+    hospitals = list(hospitals)
+    
+    if not hospitals:
+        return Response(
+            {'error': 'No se encontraron hospitales'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    engine = get_pricing_engine()
+    catalog = get_catalog()
+    rvus = [engine.resolve_rvu(code, manual_rvus.get(code)) for code in codes]
+    values = engine.quote([hospital_id for hospital_id, _ in hospitals], codes, rvus)
+    
+    missing_rvu = [code for code, rvu in zip(codes, rvus) if rvu is None]
+    
+    return Response({
+        'procedures': [
+            {
+                'code': code,
+                'name': catalog[code]['name'] if code in catalog else None,
+                'rvu': rvu,
+                'has_hospital_rates': engine.has_override(code),
+            }
+            for code, rvu in zip(codes, rvus)
+        ],
+        'hospitals': [
+            {
+                'id': hospital_id,
+                'name': name,
+                'values': [from_cents(value) for value in row],
+                'total': from_cents(row.sum()),
+            }
+            for (hospital_id, name), row in zip(hospitals, values)
+        ],
+        'missing_rvu': missing_rvu,
+    }, status=status.HTTP_200_OK)
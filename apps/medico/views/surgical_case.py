@@ -3,22 +3,46 @@
 """
 ViewSets para casos quirúrgicos
 """
+from django.db import transaction
 from django.db.models import Sum, Count, Q
+from django.utils import timezone
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
 from decimal import Decimal
 
+from core.cache import cache_response
+from core.exports import EXPORT_CHUNK_SIZE, export_response
+from core.imports import ImportFormatError, iter_rows
+from apps.communication.events import publish_bulk_status_events
 from apps.medico.models import SurgicalCase, CaseProcedure
+from apps.medico.analytics import get_analytics
+from apps.medico.case_batch import apply_batch
+from apps.medico.case_form import get_case_form
+from apps.medico.caching import HOSPITALS_NAMESPACE, invalidate_user_cases, user_cases_namespace
+from apps.medico.case_import import CaseImportFormatError, import_cases
+from apps.medico.pricing import price_procedures
+from apps.medico.sync import SyncTokenExpired, case_changes, reconcile_calendar
 from apps.medico.serializers import (
     SurgicalCaseListSerializer,
     SurgicalCaseDetailSerializer,
     SurgicalCaseCreateUpdateSerializer,
     CaseProcedureSerializer,
+    BulkStatusSerializer,
+    CalendarSyncSerializer,
+    CaseBatchSerializer,
 )
 
+STATS_CACHE_TIMEOUT = 60 * 15
+
+
+def stats_namespaces(request):
+    """Las estadísticas cambian con los casos del usuario o con los hospitales"""
+    return [user_cases_namespace(request.user.pk), HOSPITALS_NAMESPACE]
+
 
 class SurgicalCaseViewSet(viewsets.ModelViewSet):
     """
@@ -31,14 +55,33 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
     - PUT/PATCH /api/cases/{id}/ - Actualizar caso
     - DELETE /api/cases/{id}/ - Eliminar caso
     - GET /api/cases/stats/ - Obtener estadísticas
+    - GET /api/cases/analytics/ - Ingresos mensuales, tarifas por hospital y proyección de cobros
+    - GET /api/cases/form-data/ - Favoritos, códigos frecuentes y hospitales recientes
     - GET /api/cases/assisted/ - Ver casos donde soy ayudante
     - POST /api/cases/{id}/accept-invitation/ - Aceptar invitación como ayudante
     - POST /api/cases/{id}/reject-invitation/ - Rechazar invitación como ayudante
+    - POST /api/cases/bulk-status/ - Marcar varios casos como operados/facturados/cobrados
+    - POST /api/cases/import/ - Importar casos desde CSV/XLSX
+    - POST /api/cases/calendar-sync/ - Conciliar eventos de Google Calendar
+    - GET /api/cases/changes/?since=<token> - Cambios desde la última sincronización
+    - POST /api/cases/batch/ - Crear/editar/eliminar varios casos (clientes offline)
+    - GET /api/cases/export/{csv|xlsx}/ - Exportar casos (streaming)
+    - GET /api/cases/export-procedures/{csv|xlsx}/ - Exportar procedimientos (streaming)
     """
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         """Retornar casos del usuario autenticado (propios + donde es ayudante)"""
+        queryset = self.user_cases().select_related(
+            'hospital', 
+            'created_by',
+            'assistant_doctor'
+        ).prefetch_related('procedures').distinct()
+        
+        return self.filter_cases(queryset)
+    
+    def user_cases(self):
+        """Casos propios o donde soy ayudante (solo estos últimos con ?assisted_only=true)"""
         user = self.request.user
         
         # Verificar si se pide solo casos asistidos
@@ -46,21 +89,17 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         
         if assisted_only:
             # Solo casos donde soy ayudante
-            queryset = SurgicalCase.objects.filter(
+            return SurgicalCase.objects.filter(
                 assistant_doctor=user
             )
-        else:
-            # Casos propios O donde soy ayudante
-            queryset = SurgicalCase.objects.filter(
-                Q(created_by=user) | Q(assistant_doctor=user)
-            )
-        
-        queryset = queryset.select_related(
-            'hospital', 
-            'created_by',
-            'assistant_doctor'
-        ).prefetch_related('procedures').distinct()
         
+        # Casos propios O donde soy ayudante
+        return SurgicalCase.objects.filter(
+            Q(created_by=user) | Q(assistant_doctor=user)
+        )
+    
+    def filter_cases(self, queryset):
+        """Aplicar los filtros opcionales de la query string"""
         # Filtros opcionales
         status_filter = self.request.query_params.get('status', None)
         if status_filter:
@@ -142,6 +181,10 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         case = serializer.save()
         
+        # Los procedimientos cambiaron: descartar los del prefetch (como UpdateModelMixin)
+        if getattr(case, '_prefetched_objects_cache', None):
+            case._prefetched_objects_cache = {}
+        
         # Retornar con serializer detallado
         detail_serializer = SurgicalCaseDetailSerializer(case, context={'request': request})
         return Response(detail_serializer.data)
@@ -257,52 +300,45 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['get'], url_path='stats')
+    @cache_response(stats_namespaces, STATS_CACHE_TIMEOUT)
     def get_stats(self, request):
         """
         Obtener estadísticas de casos del usuario (solo casos propios, no asistidos)
         """
-        queryset = SurgicalCase.objects.filter(
-            created_by=request.user
-        ).select_related('hospital').prefetch_related('procedures')
-        
-        # Total de casos
-        total_cases = queryset.count()
+        cases = SurgicalCase.objects.filter(created_by=request.user)
+        procedures = CaseProcedure.objects.filter(case__created_by=request.user)
         
-        # Total de procedimientos
-        total_procedures = CaseProcedure.objects.filter(
-            case__in=queryset
-        ).count()
+        # Casos, procedimientos y valor por estado (dos consultas agrupadas)
+        case_counts = {
+            row['status']: row['count']
+            for row in cases.order_by().values('status').annotate(count=Count('id'))
+        }
+        procedure_totals = {
+            row['case__status']: row
+            for row in procedures.order_by().values('case__status').annotate(
+                count=Count('id'),
+                total=Sum('calculated_value'),
+            )
+        }
         
-        # Valor total calculado
-        total_value = CaseProcedure.objects.filter(
-            case__in=queryset
-        ).aggregate(
-            total=Sum('calculated_value')
-        )['total'] or Decimal('0.00')
+        total_cases = sum(case_counts.values())
+        total_procedures = sum(row['count'] for row in procedure_totals.values())
+        total_value = sum(
+            (row['total'] or Decimal('0.00') for row in procedure_totals.values()),
+            Decimal('0.00')
+        )
         
         # Casos por estado con valor total
         cases_by_status = {}
-        for status_choice in SurgicalCase.STATUS_CHOICES:
-            status_code = status_choice[0]
-            status_cases = queryset.filter(status=status_code)
-            count = status_cases.count()
-            
-            # Calcular valor total para este estado
-            status_value = CaseProcedure.objects.filter(
-                case__in=status_cases
-            ).aggregate(
-                total=Sum('calculated_value')
-            )['total'] or Decimal('0.00')
-            
+        for status_code, _ in SurgicalCase.STATUS_CHOICES:
+            status_value = procedure_totals.get(status_code, {}).get('total') or Decimal('0.00')
             cases_by_status[status_code] = {
-                'count': count,
+                'count': case_counts.get(status_code, 0),
                 'total_value': float(status_value)
             }
         
         # Casos por especialidad (top 5) con valor total
-        specialty_stats = CaseProcedure.objects.filter(
-            case__in=queryset
-        ).values('specialty').annotate(
+        specialty_stats = procedures.values('specialty').annotate(
             count=Count('id'),
             total_value=Sum('calculated_value')
         ).order_by('-count')[:5]
@@ -316,7 +352,9 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         }
         
         # Casos recientes (últimos 5)
-        recent_cases = queryset.order_by('-surgery_date', '-created_at')[:5]
+        recent_cases = cases.select_related(
+            'hospital', 'created_by', 'assistant_doctor'
+        ).prefetch_related('procedures').order_by('-surgery_date', '-created_at')[:5]
         recent_serializer = SurgicalCaseListSerializer(
             recent_cases, 
             many=True,
@@ -334,6 +372,199 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         
         return Response(stats_data, status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        """
+        Analítica de ingresos y RVU de los casos propios.
+        Query params: window (meses del promedio móvil, default 3),
+        months (meses de proyección de cobros, default 3)
+        """
+        try:
+            window = min(max(int(request.query_params.get('window', 3)), 1), 12)
+            months = min(max(int(request.query_params.get('months', 3)), 1), 12)
+        except ValueError:
+            return Response(
+                {'error': 'window y months deben ser números enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(get_analytics(request.user, window=window, months=months))
+    
+    @action(detail=False, methods=['get'], url_path='form-data')
+    def form_data(self, request):
+        """
+        Datos del formulario de casos en una sola llamada: favoritos,
+        códigos más usados y hospitales recientes del usuario (cacheado)
+        """
+        return Response(get_case_form(request.user))
+    
+    @action(detail=False, methods=['post'], url_path='calendar-sync')
+    def calendar_sync(self, request):
+        """
+        Conciliar eventos de Google Calendar en una sola llamada: retorna los
+        eventos cuyo horario ya no coincide con su caso, los eventos sin
+        caso y los casos modificados desde el token `since`.
+        """
+        serializer = CalendarSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = reconcile_calendar(
+            request.user,
+            serializer.validated_data['events'],
+            since=serializer.validated_data.get('since') or None,
+        )
+        return Response(result, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """
+        Sincronización incremental: casos creados/modificados y eliminados
+        desde el token `since` (sin token, todos los casos visibles).
+        Query params: since, limit (1-500, default 200)
+        
+        Los casos cambiados en el último minuto pueden repetirse en la
+        siguiente sincronización (el cliente deduplica por id). Un token más
+        antiguo que la retención de eliminaciones responde 410 con
+        full_resync: el cliente debe sincronizar de nuevo sin since.
+        """
+        since = request.query_params.get('since') or None
+        try:
+            limit = min(max(int(request.query_params.get('limit', 200)), 1), 500)
+            upserted, deleted, token, has_more = case_changes(request.user, since=since, limit=limit)
+        except SyncTokenExpired as exc:
+            return Response(
+                {'error': str(exc), 'full_resync': True},
+                status=status.HTTP_410_GONE
+            )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = SurgicalCaseDetailSerializer(upserted, many=True, context={'request': request})
+        return Response({
+            'upserted': serializer.data,
+            'deleted': deleted,
+            'sync_token': token,
+            'has_more': has_more,
+        }, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='batch')
+    def batch(self, request):
+        """
+        Aplicar en una transacción las operaciones pendientes de un cliente
+        offline, con detección de conflictos por versión (updated_at).
+        Body: { "operations": [{"op": "create", "ref": "tmp-1", "data": {...}},
+                               {"op": "update", "id": 12, "version": "...", "data": {...}},
+                               {"op": "delete", "id": 13, "version": "..."}] }
+        """
+        serializer = CaseBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = apply_batch(
+            request.user,
+            serializer.validated_data['operations'],
+            context=self.get_serializer_context(),
+        )
+        
+        summary = {}
+        for result in results:
+            summary[result['result']] = summary.get(result['result'], 0) + 1
+        
+        return Response({'results': results, 'summary': summary}, status=status.HTTP_200_OK)
+    
+    def _export_cases_queryset(self):
+        """Los casos del listado (mismos filtros, incluido assisted_only), sin prefetch"""
+        return self.filter_cases(self.user_cases())
+    
+    @action(detail=False, methods=['get'], url_path='export/(?P<file_type>csv|xlsx)')
+    def export_cases(self, request, file_type=None):
+        """
+        Exportar el historial de casos en CSV o XLSX (acepta los mismos filtros que el listado).
+        Las filas se leen por bloques con .iterator() y se escriben en streaming.
+        """
+        status_labels = dict(SurgicalCase.STATUS_CHOICES)
+        
+        rows = self._export_cases_queryset().annotate(
+            export_procedure_count=Count('procedures'),
+            export_total_rvu=Sum('procedures__rvu'),
+            export_total_value=Sum('procedures__calculated_value'),
+        ).order_by('-surgery_date', '-created_at').values_list(
+            'id',
+            'patient_name',
+            'patient_id',
+            'surgery_date',
+            'surgery_time',
+            'hospital__name',
+            'status',
+            'is_operated',
+            'is_billed',
+            'is_paid',
+            'assistant_doctor_name',
+            'assistant_doctor__first_name',
+            'assistant_doctor__last_name',
+            'export_procedure_count',
+            'export_total_rvu',
+            'export_total_value',
+            'diagnosis',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        
+        def format_rows():
+            for (case_id, patient_name, patient_id, surgery_date, surgery_time, hospital_name,
+                 case_status, is_operated, is_billed, is_paid, assistant_name,
+                 assistant_first_name, assistant_last_name, procedure_count,
+                 total_rvu, total_value, diagnosis) in rows:
+                if assistant_first_name or assistant_last_name:
+                    assistant_name = f"{assistant_first_name} {assistant_last_name}".strip()
+                yield [
+                    case_id,
+                    patient_name,
+                    patient_id or '',
+                    surgery_date,
+                    surgery_time or '',
+                    hospital_name,
+                    status_labels.get(case_status, case_status),
+                    'Sí' if is_operated else 'No',
+                    'Sí' if is_billed else 'No',
+                    'Sí' if is_paid else 'No',
+                    assistant_name or '',
+                    procedure_count,
+                    total_rvu or Decimal('0.00'),
+                    total_value or Decimal('0.00'),
+                    diagnosis or '',
+                ]
+        
+        header = [
+            'ID', 'Paciente', 'ID Paciente', 'Fecha', 'Hora', 'Hospital', 'Estado',
+            'Operado', 'Facturado', 'Cobrado', 'Ayudante', 'Procedimientos',
+            'RVU Total', 'Valor Total', 'Diagnóstico',
+        ]
+        return export_response(file_type, 'casos', header, format_rows(), sheet_title='Casos')
+    
+    @action(detail=False, methods=['get'], url_path='export-procedures/(?P<file_type>csv|xlsx)')
+    def export_procedures(self, request, file_type=None):
+        """Exportar los procedimientos de los casos del usuario en CSV o XLSX (en streaming)"""
+        rows = CaseProcedure.objects.filter(
+            case__in=self._export_cases_queryset().values('id')
+        ).order_by('-case__surgery_date', 'case_id', 'order').values_list(
+            'case_id',
+            'case__patient_name',
+            'case__surgery_date',
+            'case__hospital__name',
+            'surgery_code',
+            'surgery_name',
+            'specialty',
+            'grupo',
+            'rvu',
+            'hospital_factor',
+            'calculated_value',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        
+        header = [
+            'ID Caso', 'Paciente', 'Fecha', 'Hospital', 'Código', 'Cirugía',
+            'Especialidad', 'Grupo', 'RVU', 'Factor', 'Valor',
+        ]
+        formatted = ([value if value is not None else '' for value in row] for row in rows)
+        return export_response(file_type, 'procedimientos', header, formatted, sheet_title='Procedimientos')
+    
     @action(detail=True, methods=['post'], url_path='add-procedure')
     def add_procedure(self, request, pk=None):
         """
@@ -356,9 +587,17 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
             max_order=Count('order')
         )['max_order'] or 0
         
+        pricing = {
+            'surgery_code': serializer.validated_data['surgery_code'],
+            'rvu': serializer.validated_data['rvu'],
+        }
+        price_procedures(case.hospital_id, [pricing])
+        
         procedure = serializer.save(
             case=case,
-            order=last_order
+            order=last_order,
+            hospital_factor=pricing['hospital_factor'],
+            calculated_value=pricing['calculated_value'],
         )
         
         return Response(
@@ -427,6 +666,149 @@ class SurgicalCaseViewSet(viewsets.ModelViewSet):
         
         serializer = SurgicalCaseDetailSerializer(case, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    # Transiciones del lote: destino -> (bandera, bandera requerida, status)
+    BULK_STATUS_TRANSITIONS = {
+        'operated': ('is_operated', None, 'completed'),
+        'billed': ('is_billed', 'is_operated', 'billed'),
+        'paid': ('is_paid', 'is_billed', 'paid'),
+    }
+    
+    BULK_STATUS_ERRORS = {
+        'is_operated': 'No se puede marcar como facturado sin estar operado',
+        'is_billed': 'No se puede marcar como cobrado sin estar facturado',
+    }
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        Marcar varios casos como operados, facturados o cobrados.
+        Body: { "ids": [1, 2, 3], "status": "operated" | "billed" | "paid" }
+        
+        Los casos se validan con una sola consulta y los válidos se
+        actualizan con un único UPDATE condicionado a la misma validación.
+        La respuesta trae el resultado por id: updated, unchanged, not_found,
+        forbidden, cancelled, invalid_transition o skipped (el caso cambió
+        entre la validación y el UPDATE).
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        target = serializer.validated_data['status']
+        flag, required_flag, new_status = self.BULK_STATUS_TRANSITIONS[target]
+        
+        user = request.user
+        cases = {
+            case.id: case
+            for case in SurgicalCase.objects.filter(
+                id__in=ids
+            ).filter(
+                Q(created_by=user) | Q(assistant_doctor=user)
+            ).only(
+                'id', 'created_by_id', 'patient_name', 'surgery_date', 'status',
+                'is_operated', 'is_billed', 'is_paid',
+                'assistant_doctor_id', 'assistant_accepted',
+            )
+        }
+        
+        results = []
+        to_update = []
+        for case_id in ids:
+            case = cases.get(case_id)
+            if case is None:
+                results.append({'id': case_id, 'result': 'not_found'})
+            elif case.created_by_id != user.id:
+                results.append({'id': case_id, 'result': 'forbidden'})
+            elif case.status == 'cancelled':
+                results.append({'id': case_id, 'result': 'cancelled'})
+            elif getattr(case, flag):
+                results.append({'id': case_id, 'result': 'unchanged'})
+            elif required_flag and not getattr(case, required_flag):
+                results.append({
+                    'id': case_id,
+                    'result': 'invalid_transition',
+                    'error': self.BULK_STATUS_ERRORS[required_flag],
+                })
+            else:
+                results.append({'id': case_id, 'result': 'updated'})
+                to_update.append(case)
+        
+        if to_update:
+            now = timezone.now()
+            # Las mismas condiciones de la validación van en el WHERE del
+            # UPDATE: un caso que cambió entre la lectura y la escritura
+            # (anulado, desmarcado) no se actualiza y se reporta como skipped
+            conditions = Q(created_by=user, **{flag: False}) & ~Q(status='cancelled')
+            if required_flag:
+                conditions &= Q(**{required_flag: True})
+            with transaction.atomic():
+                updated = SurgicalCase.objects.filter(
+                    conditions, id__in=[case.id for case in to_update]
+                ).update(**{flag: True, 'status': new_status, 'updated_at': now})
+                
+                if updated < len(to_update):
+                    applied = set(SurgicalCase.objects.filter(
+                        id__in=[case.id for case in to_update], updated_at=now, **{flag: True}
+                    ).values_list('id', flat=True))
+                    for result in results:
+                        if result['result'] == 'updated' and result['id'] not in applied:
+                            result.update(
+                                result='skipped',
+                                error='El caso cambió durante la operación, vuelva a intentarlo',
+                            )
+                    to_update = [case for case in to_update if case.id in applied]
+                
+                for case in to_update:
+                    setattr(case, flag, True)
+                    case.status = new_status
+                    case.updated_at = now
+                
+                transaction.on_commit(lambda: publish_bulk_status_events(to_update))
+                transaction.on_commit(lambda: invalidate_user_cases(user.pk))
+        
+        return Response({
+            'status': target,
+            'updated': len(to_update),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+    
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_cases(self, request):
+        """
+        Importar casos desde un archivo CSV o XLSX.
+        Form-data: file (.csv/.xlsx), dry_run (opcional)
+        
+        Columnas: paciente, hospital (id o nombre), fecha, códigos (separados
+        por ";") y opcionalmente expediente, edad, género, hora, estado,
+        diagnóstico y notas. Las filas con error se devuelven con su motivo
+        y no se importan; el resto se crea.
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response(
+                {'error': 'El archivo es requerido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        dry_run = str(request.data.get('dry_run', 'false')).lower() == 'true'
+        
+        try:
+            result = import_cases(
+                request.user,
+                iter_rows(upload.file, upload.name),
+                dry_run=dry_run,
+            )
+        except (ImportFormatError, CaseImportFormatError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result['dry_run'] = dry_run
+        response_status = status.HTTP_201_CREATED if result['created'] and not dry_run else status.HTTP_200_OK
+        return Response(result, status=response_status)
 
 
 class CaseProcedureViewSet(viewsets.ModelViewSet):
@@ -441,4 +823,17 @@ class CaseProcedureViewSet(viewsets.ModelViewSet):
         return CaseProcedure.objects.filter(
             Q(case__created_by=self.request.user) | 
             Q(case__assistant_doctor=self.request.user)
-        ).select_related('case', 'case__hospital').distinct()
\ No newline at end of file
+        ).select_related('case', 'case__hospital').distinct()
+    
+    def perform_update(self, serializer):
+        """Revalorizar el procedimiento en el servidor al editarlo"""
+        instance = serializer.instance
+        pricing = {
+            'surgery_code': serializer.validated_data.get('surgery_code', instance.surgery_code),
+            'rvu': serializer.validated_data.get('rvu', instance.rvu),
+        }
+        price_procedures(instance.case.hospital_id, [pricing])
+        serializer.save(
+            hospital_factor=pricing['hospital_factor'],
+            calculated_value=pricing['calculated_value'],
+        )
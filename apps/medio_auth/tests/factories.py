@@ -0,0 +1,28 @@
+# apps/medio_auth/tests/factories.py
+
+"""
+Factories de usuarios para la suite de pruebas
+"""
+import factory
+from django.contrib.auth import get_user_model
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    """Médico verificado con contraseña 'password'"""
+
+    class Meta:
+        model = get_user_model()
+        django_get_or_create = ('username',)
+        skip_postgeneration_save = True
+
+    username = factory.Sequence(lambda n: f'medico{n}')
+    email = factory.LazyAttribute(lambda user: f'{user.username}@example.com')
+    first_name = factory.Faker('first_name', locale='es_ES')
+    last_name = factory.Faker('last_name', locale='es_ES')
+    is_verified = True
+    password = factory.django.Password('password')
+
+
+class AdminUserFactory(UserFactory):
+    is_staff = True
+    is_superuser = True
@@ -24,6 +24,7 @@ from ..serializers import (
     FriendRequestSerializer,
 )
 from ..models import Friendship, FriendRequest
+from apps.communication.events import notify_users
 
 User = get_user_model()
 
@@ -543,6 +544,14 @@ class SendFriendRequestView(APIView):
             status='pending'
         )
         
+        notify_users(
+            [to_user.id],
+            'friend_request',
+            'Nueva solicitud de colega',
+            message=f'{request.user.get_full_name()} quiere agregarte como colega',
+            data={'friend_request_id': friend_request.id, 'from_user_id': request.user.id},
+        )
+        
         serializer = FriendRequestSerializer(friend_request)
         
         return Response({
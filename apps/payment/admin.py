@@ -1,10 +1,19 @@
 from django.contrib import admin
 
-# Registra tus modelos aquí
-# from .models import Payment, PaymentMethod
-#
-# @admin.register(Payment)
-# class PaymentAdmin(admin.ModelAdmin):
-#     list_display = ['invoice', 'payment_date', 'amount', 'payment_method', 'status']
-#     list_filter = ['payment_method', 'status', 'payment_date']
-#     search_fields = ['invoice__invoice_number', 'transaction_id']
+from .models import Payment, PaymentAllocation
+
+
+class PaymentAllocationInline(admin.TabularInline):
+    model = PaymentAllocation
+    extra = 0
+    raw_id_fields = ['case', 'invoice']
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    list_display = ['paid_on', 'doctor', 'hospital', 'amount', 'method', 'source', 'reference']
+    list_filter = ['method', 'source', 'paid_on', 'hospital']
+    search_fields = ['reference', 'doctor__username', 'hospital__name', 'source_file']
+    raw_id_fields = ['doctor']
+    inlines = [PaymentAllocationInline]
+    list_per_page = 50
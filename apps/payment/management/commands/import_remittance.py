@@ -0,0 +1,122 @@
+"""
+Management command para conciliar una remesa de pago.
+
+Lee un archivo CSV o XLSX (banco u hospital) con al menos las columnas
+paciente, fecha y monto, empareja cada línea con un caso del médico y
+marca como pagados los casos conciliados.
+
+Uso:
+    python manage.py import_remittance remesa_sept.xlsx --user dr.perez --hospital 3
+    python manage.py import_remittance remesa.csv --user 12 --dry-run
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from apps.medico.models import Hospital
+from apps.payment.models import Payment
+from apps.payment.services import (
+    DEFAULT_TOLERANCE,
+    RemittanceFormatError,
+    UNMATCHED_REASONS,
+    reconcile_remittance,
+)
+from core.imports import ImportFormatError, iter_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Concilia una remesa de pago (CSV/XLSX) y marca como pagados los casos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Ruta del archivo de remesa (.csv o .xlsx)')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username o id del médico',
+        )
+        parser.add_argument(
+            '--hospital',
+            type=int,
+            help='Hospital que emite la remesa (id). Limita los casos candidatos.',
+        )
+        parser.add_argument('--paid-on', help='Fecha del pago (YYYY-MM-DD, por defecto hoy)')
+        parser.add_argument(
+            '--method',
+            default='bank_transfer',
+            choices=[choice for choice, _ in Payment.METHOD_CHOICES],
+            help='Método de pago (por defecto: bank_transfer)',
+        )
+        parser.add_argument('--reference', default='', help='Referencia del pago')
+        parser.add_argument(
+            '--tolerance',
+            default=str(DEFAULT_TOLERANCE),
+            help=f'Diferencia máxima aceptada entre monto y total del caso (por defecto: {DEFAULT_TOLERANCE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Muestra el resultado sin registrar el pago',
+        )
+
+    def handle(self, *args, **options):
+        lookup = {'pk': options['user']} if options['user'].isdigit() else {'username': options['user']}
+        try:
+            doctor = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f"Usuario no encontrado: {options['user']}")
+
+        hospital = None
+        if options['hospital']:
+            try:
+                hospital = Hospital.objects.get(pk=options['hospital'])
+            except Hospital.DoesNotExist:
+                raise CommandError(f"Hospital no encontrado: {options['hospital']}")
+
+        paid_on = None
+        if options['paid_on']:
+            paid_on = parse_date(options['paid_on'])
+            if paid_on is None:
+                raise CommandError('--paid-on debe tener formato YYYY-MM-DD')
+
+        try:
+            tolerance = Decimal(options['tolerance'])
+        except InvalidOperation:
+            raise CommandError('--tolerance debe ser un número')
+
+        path = options['path']
+        try:
+            with open(path, 'rb') as remittance_file:
+                result = reconcile_remittance(
+                    doctor,
+                    iter_rows(remittance_file, path),
+                    hospital=hospital,
+                    paid_on=paid_on,
+                    method=options['method'],
+                    reference=options['reference'],
+                    source_file=path,
+                    tolerance=tolerance,
+                    dry_run=options['dry_run'],
+                )
+        except OSError as exc:
+            raise CommandError(f'No se pudo abrir el archivo: {exc}')
+        except (ImportFormatError, RemittanceFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for entry in result['unmatched']:
+            self.stdout.write(
+                f"  - Línea {entry['line']}: {entry['patient_id']} {entry['surgery_date']} "
+                f"{entry['amount']} -> {UNMATCHED_REASONS[entry['reason']]}"
+            )
+
+        prefix = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ {prefix}{result['matched']} de {result['lines']} línea(s) conciliadas "
+                f"({result['allocated_amount']} de {result['total_amount']}), "
+                f"{result['invoices_paid']} factura(s) pagadas"
+            )
+        )
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.14 on 2026-10-19 13:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('invoice', '0001_initial'),
+        ('medico', '0012_surgicalcase_patient_lookup_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Monto')),
+                ('paid_on', models.DateField(default=django.utils.timezone.localdate, verbose_name='Fecha de Pago')),
+                ('method', models.CharField(choices=[('bank_transfer', 'Transferencia Bancaria'), ('deposit', 'Depósito'), ('check', 'Cheque'), ('cash', 'Efectivo'), ('other', 'Otro')], default='bank_transfer', max_length=20, verbose_name='Método de Pago')),
+                ('reference', models.CharField(blank=True, default='', help_text='Número de transferencia, cheque o remesa', max_length=100, verbose_name='Referencia')),
+                ('source', models.CharField(choices=[('manual', 'Manual'), ('remittance', 'Remesa Importada')], default='manual', max_length=20, verbose_name='Origen')),
+                ('source_file', models.CharField(blank=True, default='', max_length=255, verbose_name='Archivo de Origen')),
+                ('notes', models.TextField(blank=True, default='', verbose_name='Notas')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Registro')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to=settings.AUTH_USER_MODEL, verbose_name='Médico')),
+                ('hospital', models.ForeignKey(blank=True, help_text='Hospital o aseguradora que emite el pago', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='payments', to='medico.hospital', verbose_name='Hospital')),
+            ],
+            options={
+                'verbose_name': 'Pago',
+                'verbose_name_plural': 'Pagos',
+                'ordering': ['-paid_on', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentAllocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Monto Aplicado')),
+                ('line_number', models.PositiveIntegerField(blank=True, help_text='Línea del archivo de remesa que originó la asignación', null=True, verbose_name='Línea de Remesa')),
+                ('case', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='payment_allocations', to='medico.surgicalcase', verbose_name='Caso')),
+                ('invoice', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_allocations', to='invoice.invoice', verbose_name='Factura')),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='payment.payment', verbose_name='Pago')),
+            ],
+            options={
+                'verbose_name': 'Asignación de Pago',
+                'verbose_name_plural': 'Asignaciones de Pago',
+                'ordering': ['payment', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['doctor', 'paid_on'], name='payment_pay_doctor__ab5652_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['hospital', 'paid_on'], name='payment_pay_hospita_9beb48_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentallocation',
+            index=models.Index(fields=['case'], name='payment_pay_case_id_cda9ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentallocation',
+            index=models.Index(fields=['invoice'], name='payment_pay_invoice_b13485_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-19 14:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medico', '0015_casedeletion_and_assistant_sync_index'),
+        ('payment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentallocation',
+            name='case',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_allocations', to='medico.surgicalcase', verbose_name='Caso'),
+        ),
+    ]
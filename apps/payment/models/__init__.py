@@ -1,28 +1,152 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Ejemplo de modelos para pagos
-# class Payment(models.Model):
-#     invoice = models.ForeignKey('invoice.Invoice', on_delete=models.CASCADE, related_name='payments')
-#     payment_date = models.DateTimeField(auto_now_add=True)
-#     amount = models.DecimalField(max_digits=10, decimal_places=2)
-#     payment_method = models.CharField(max_length=50, choices=[
-#         ('cash', 'Cash'),
-#         ('credit_card', 'Credit Card'),
-#         ('debit_card', 'Debit Card'),
-#         ('bank_transfer', 'Bank Transfer'),
-#         ('check', 'Check')
-#     ])
-#     transaction_id = models.CharField(max_length=100, blank=True)
-#     notes = models.TextField(blank=True)
-#     status = models.CharField(max_length=20, choices=[
-#         ('pending', 'Pending'),
-#         ('completed', 'Completed'),
-#         ('failed', 'Failed'),
-#         ('refunded', 'Refunded')
-#     ])
-#
-# class PaymentMethod(models.Model):
-#     user = models.ForeignKey('medio_auth.CustomUser', on_delete=models.CASCADE)
-#     method_type = models.CharField(max_length=50)
-#     card_last_four = models.CharField(max_length=4, blank=True)
-#     is_default = models.BooleanField(default=False)
+
+class Payment(models.Model):
+    """
+    Pago recibido por un médico (libro de pagos).
+
+    Un pago puede cubrir varios casos/facturas: el detalle de qué cubre cada
+    pago se registra en PaymentAllocation. Las remesas importadas generan un
+    único Payment por archivo con una asignación por línea conciliada.
+    """
+
+    METHOD_CHOICES = [
+        ('bank_transfer', 'Transferencia Bancaria'),
+        ('deposit', 'Depósito'),
+        ('check', 'Cheque'),
+        ('cash', 'Efectivo'),
+        ('other', 'Otro'),
+    ]
+
+    SOURCE_CHOICES = [
+        ('manual', 'Manual'),
+        ('remittance', 'Remesa Importada'),
+    ]
+
+    doctor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='payments',
+        verbose_name="Médico"
+    )
+    hospital = models.ForeignKey(
+        'medico.Hospital',
+        on_delete=models.PROTECT,
+        related_name='payments',
+        blank=True,
+        null=True,
+        verbose_name="Hospital",
+        help_text="Hospital o aseguradora que emite el pago"
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Monto"
+    )
+    paid_on = models.DateField(
+        default=timezone.localdate,
+        verbose_name="Fecha de Pago"
+    )
+    method = models.CharField(
+        max_length=20,
+        choices=METHOD_CHOICES,
+        default='bank_transfer',
+        verbose_name="Método de Pago"
+    )
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name="Referencia",
+        help_text="Número de transferencia, cheque o remesa"
+    )
+    source = models.CharField(
+        max_length=20,
+        choices=SOURCE_CHOICES,
+        default='manual',
+        verbose_name="Origen"
+    )
+    source_file = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name="Archivo de Origen"
+    )
+    notes = models.TextField(
+        blank=True,
+        default='',
+        verbose_name="Notas"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Fecha de Registro"
+    )
+
+    class Meta:
+        verbose_name = 'Pago'
+        verbose_name_plural = 'Pagos'
+        ordering = ['-paid_on', '-id']
+        indexes = [
+            models.Index(fields=['doctor', 'paid_on']),
+            models.Index(fields=['hospital', 'paid_on']),
+        ]
+
+    def __str__(self):
+        return f"{self.paid_on} - {self.amount} ({self.get_method_display()})"
+
+
+class PaymentAllocation(models.Model):
+    """
+    Parte de un pago aplicada a un caso quirúrgico (y a su factura, si la tiene).
+
+    Si el médico elimina después el caso (ya cobrado) la asignación se
+    conserva sin caso: el monto y la línea de remesa siguen en el pago.
+    """
+
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.CASCADE,
+        related_name='allocations',
+        verbose_name="Pago"
+    )
+    case = models.ForeignKey(
+        'medico.SurgicalCase',
+        on_delete=models.SET_NULL,
+        related_name='payment_allocations',
+        blank=True,
+        null=True,
+        verbose_name="Caso"
+    )
+    invoice = models.ForeignKey(
+        'invoice.Invoice',
+        on_delete=models.SET_NULL,
+        related_name='payment_allocations',
+        blank=True,
+        null=True,
+        verbose_name="Factura"
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        verbose_name="Monto Aplicado"
+    )
+    line_number = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Línea de Remesa",
+        help_text="Línea del archivo de remesa que originó la asignación"
+    )
+
+    class Meta:
+        verbose_name = 'Asignación de Pago'
+        verbose_name_plural = 'Asignaciones de Pago'
+        ordering = ['payment', 'id']
+        indexes = [
+            models.Index(fields=['case']),
+            models.Index(fields=['invoice']),
+        ]
+
+    def __str__(self):
+        return f"{self.payment_id} -> caso {self.case_id}: {self.amount}"
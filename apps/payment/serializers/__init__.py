@@ -1,14 +1,54 @@
 from rest_framework import serializers
 
-# Ejemplo de serializers para pagos
-# class PaymentSerializer(serializers.ModelSerializer):
-#     class Meta:
-#         model = Payment
-#         fields = ['id', 'invoice', 'payment_date', 'amount', 'payment_method',
-#                   'transaction_id', 'notes', 'status']
-#         read_only_fields = ['payment_date']
-#
-# class PaymentMethodSerializer(serializers.ModelSerializer):
-#     class Meta:
-#         model = PaymentMethod
-#         fields = ['id', 'user', 'method_type', 'card_last_four', 'is_default']
+from ..models import Payment, PaymentAllocation
+from ..services import DEFAULT_TOLERANCE
+
+
+class PaymentAllocationSerializer(serializers.ModelSerializer):
+    patient_name = serializers.CharField(source='case.patient_name', read_only=True, default=None)
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True, default=None)
+
+    class Meta:
+        model = PaymentAllocation
+        fields = ['id', 'case', 'patient_name', 'invoice', 'invoice_number',
+                  'amount', 'line_number']
+        read_only_fields = fields
+
+
+class PaymentListSerializer(serializers.ModelSerializer):
+    """Serializer resumido para listados de pagos"""
+    hospital_name = serializers.CharField(source='hospital.name', read_only=True, default=None)
+    method_display = serializers.CharField(source='get_method_display', read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = ['id', 'hospital', 'hospital_name', 'amount', 'paid_on',
+                  'method', 'method_display', 'reference', 'source', 'created_at']
+        read_only_fields = fields
+
+
+class PaymentSerializer(PaymentListSerializer):
+    """Serializer detallado con las asignaciones del pago"""
+    allocations = PaymentAllocationSerializer(many=True, read_only=True)
+
+    class Meta(PaymentListSerializer.Meta):
+        fields = PaymentListSerializer.Meta.fields + ['source_file', 'notes', 'allocations']
+        read_only_fields = fields
+
+
+class RemittanceImportSerializer(serializers.Serializer):
+    """Parámetros de la importación de una remesa"""
+    file = serializers.FileField()
+    hospital = serializers.IntegerField(required=False, allow_null=True)
+    paid_on = serializers.DateField(required=False, allow_null=True)
+    method = serializers.ChoiceField(choices=Payment.METHOD_CHOICES, default='bank_transfer')
+    reference = serializers.CharField(required=False, allow_blank=True, default='', max_length=100)
+    tolerance = serializers.DecimalField(
+        max_digits=8, decimal_places=2, min_value=0, default=DEFAULT_TOLERANCE
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(('.csv', '.xlsx')):
+            raise serializers.ValidationError('Formato no soportado: use un archivo .csv o .xlsx')
+        return value
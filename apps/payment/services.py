@@ -0,0 +1,350 @@
+# apps/payment/services.py
+
+"""
+Conciliación de remesas de pago (banco / hospital).
+
+reconcile_remittance() recibe las filas de una remesa y las concilia contra
+los casos del médico sin consultas por línea:
+
+- Los casos candidatos se leen con consultas IN por lotes de patient_id
+  (índice created_by + patient_id + surgery_date) ya anotados con su total.
+- Cada línea se empareja por (patient_id, fecha, monto ≈ total del caso).
+- Dentro de la transacción los casos emparejados se bloquean y se vuelve
+  a comprobar que sigan pendientes (una remesa conciliada dos veces a la
+  vez no paga dos veces); se marcan pagados con un solo UPDATE y se
+  registra un Payment con una PaymentAllocation por línea (bulk_create).
+- Las facturas cuyos casos quedaron todos pagados pasan a 'paid' con otro
+  UPDATE (subconsulta NOT EXISTS).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, Exists, OuterRef, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.invoice.models import Invoice, InvoiceItem
+from apps.medico.caching import invalidate_user_cases
+from apps.medico.models import SurgicalCase
+from core.imports import clean_text, parse_date_value, parse_decimal, resolve_columns
+
+from .models import Payment, PaymentAllocation
+
+LOOKUP_BATCH_SIZE = 500
+DEFAULT_TOLERANCE = Decimal('0.01')
+# Mayor monto que cabe en PaymentAllocation.amount (12 dígitos, 2 decimales)
+MAX_LINE_AMOUNT = Decimal('9999999999.99')
+
+# Nombres aceptados para cada columna de la remesa (encabezados normalizados)
+REMITTANCE_COLUMNS = {
+    'patient_id': ['patient_id', 'id_paciente', 'paciente_id', 'expediente', 'no_expediente', 'dpi', 'afiliacion'],
+    'surgery_date': ['surgery_date', 'fecha_cirugia', 'fecha_de_cirugia', 'fecha_servicio', 'fecha'],
+    'amount': ['amount', 'monto', 'monto_pagado', 'importe', 'valor', 'pagado', 'total'],
+}
+
+UNMATCHED_REASONS = {
+    'invalid': 'Línea inválida',
+    'not_found': 'No se encontró un caso del paciente en esa fecha',
+    'amount_mismatch': 'El monto no coincide con el total del caso',
+    'duplicate': 'El caso ya fue conciliado en otra línea del archivo',
+    'already_paid': 'El caso ya estaba pagado',
+    'not_operated': 'El caso no está marcado como operado',
+}
+
+
+class RemittanceFormatError(ValueError):
+    """La remesa no tiene las columnas mínimas"""
+
+
+def parse_remittance(rows):
+    """
+    Normalizar las filas de la remesa.
+
+    Retorna (lines, invalid): lines son dicts con line/patient_id/
+    surgery_date/amount; invalid son las líneas descartadas con su motivo.
+    """
+    lines = []
+    invalid = []
+    columns = None
+
+    # La fila 1 es el encabezado
+    for line_number, row in enumerate(rows, start=2):
+        if columns is None:
+            columns = resolve_columns(row.keys(), REMITTANCE_COLUMNS)
+            missing = [name for name in REMITTANCE_COLUMNS if name not in columns]
+            if missing:
+                raise RemittanceFormatError(
+                    f"Faltan columnas en la remesa: {', '.join(missing)}"
+                )
+
+        patient_id = clean_text(row.get(columns['patient_id']))
+        surgery_date = parse_date_value(row.get(columns['surgery_date']))
+        amount = parse_decimal(row.get(columns['amount']))
+
+        if (not patient_id or surgery_date is None or amount is None
+                or not 0 < amount <= MAX_LINE_AMOUNT):
+            invalid.append({
+                'line': line_number,
+                'patient_id': patient_id,
+                'surgery_date': str(surgery_date) if surgery_date else clean_text(row.get(columns['surgery_date'])),
+                'amount': str(amount) if amount is not None else clean_text(row.get(columns['amount'])),
+                'reason': 'invalid',
+            })
+            continue
+
+        lines.append({
+            'line': line_number,
+            'patient_id': patient_id,
+            'surgery_date': surgery_date,
+            'amount': amount,
+        })
+
+    return lines, invalid
+
+
+def load_candidates(doctor, lines, hospital=None):
+    """
+    Casos candidatos indexados por (patient_id, surgery_date).
+    Una consulta por cada LOOKUP_BATCH_SIZE pacientes distintos.
+    """
+    if not lines:
+        return {}
+
+    patient_ids = sorted({line['patient_id'] for line in lines})
+    dates = [line['surgery_date'] for line in lines]
+
+    base = SurgicalCase.objects.filter(
+        created_by=doctor,
+        surgery_date__gte=min(dates),
+        surgery_date__lte=max(dates),
+    ).exclude(status='cancelled')
+    if hospital is not None:
+        base = base.filter(hospital=hospital)
+
+    candidates = {}
+    for start in range(0, len(patient_ids), LOOKUP_BATCH_SIZE):
+        batch = patient_ids[start:start + LOOKUP_BATCH_SIZE]
+        cases = base.filter(patient_id__in=batch).annotate(
+            total=Coalesce(
+                Sum('procedures__calculated_value'),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        ).order_by('id').values(
+            'id', 'patient_id', 'surgery_date', 'total', 'is_operated', 'is_paid'
+        )
+        for case in cases:
+            candidates.setdefault((case['patient_id'], case['surgery_date']), []).append(case)
+
+    return candidates
+
+
+def match_lines(lines, candidates, tolerance=DEFAULT_TOLERANCE):
+    """Emparejar cada línea con un caso; retorna (matched, unmatched)"""
+    matched = []
+    unmatched = []
+    taken = set()
+
+    for line in lines:
+        cases = candidates.get((line['patient_id'], line['surgery_date']), [])
+        same_amount = [
+            case for case in cases
+            if abs(case['total'] - line['amount']) <= tolerance
+        ]
+
+        reason = None
+        if not cases:
+            reason = 'not_found'
+        elif not same_amount:
+            reason = 'amount_mismatch'
+        else:
+            available = [case for case in same_amount if case['id'] not in taken]
+            payable = [case for case in available if not case['is_paid'] and case['is_operated']]
+            if payable:
+                case = payable[0]
+                taken.add(case['id'])
+                matched.append({**line, 'case_id': case['id']})
+                continue
+            if not available:
+                reason = 'duplicate'
+            elif any(case['is_paid'] for case in available):
+                reason = 'already_paid'
+            else:
+                reason = 'not_operated'
+
+        entry = {
+            **line,
+            'surgery_date': str(line['surgery_date']),
+            'amount': str(line['amount']),
+            'reason': reason,
+        }
+        if reason == 'amount_mismatch':
+            entry['expected'] = [str(case['total']) for case in cases]
+        unmatched.append(entry)
+
+    return matched, unmatched
+
+
+def reconcile_remittance(doctor, rows, hospital=None, paid_on=None,
+                         method='bank_transfer', reference='', source_file='',
+                         tolerance=DEFAULT_TOLERANCE, dry_run=False):
+    """
+    Conciliar una remesa de pago para `doctor`.
+
+    `rows` es un iterable de dicts (ver core.imports.iter_rows). Con
+    dry_run=True solo se calcula el resultado, sin escribir nada.
+    """
+    lines, invalid = parse_remittance(rows)
+    candidates = load_candidates(doctor, lines, hospital=hospital)
+    matched, unmatched = match_lines(lines, candidates, tolerance=tolerance)
+
+    total_amount = sum((line['amount'] for line in lines), Decimal('0.00'))
+    allocated_amount = sum((line['amount'] for line in matched), Decimal('0.00'))
+
+    result = {
+        'payment': None,
+        'lines': len(lines) + len(invalid),
+        'matched': len(matched),
+        'unmatched': sorted(invalid + unmatched, key=lambda entry: entry['line']),
+        'total_amount': total_amount,
+        'allocated_amount': allocated_amount,
+        'cases_paid': len(matched),
+        'invoices_paid': 0,
+    }
+
+    if dry_run or not matched:
+        return result
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        # load_candidates() leyó fuera de la transacción: otra conciliación
+        # (o un pago manual) pudo pagar los casos desde entonces. Se bloquean
+        # y solo se asignan los que siguen pendientes.
+        payable = set(
+            SurgicalCase.objects.filter(
+                id__in=[line['case_id'] for line in matched],
+                is_paid=False,
+                is_operated=True,
+            ).exclude(
+                status='cancelled'
+            ).select_for_update().values_list('id', flat=True)
+        )
+        matched = _release_lines(result, matched, payable)
+        if not matched:
+            return result
+
+        case_ids = [line['case_id'] for line in matched]
+        updated = SurgicalCase.objects.filter(
+            id__in=case_ids,
+            is_paid=False,
+            is_operated=True,
+        ).update(
+            is_billed=True,
+            is_paid=True,
+            status='paid',
+            updated_at=now,
+        )
+        if updated != len(case_ids):
+            # Sin FOR UPDATE (p. ej. SQLite) otro proceso pudo adelantarse
+            paid_now = set(
+                SurgicalCase.objects.filter(
+                    id__in=case_ids, is_paid=True, updated_at=now
+                ).values_list('id', flat=True)
+            )
+            matched = _release_lines(result, matched, paid_now)
+            if not matched:
+                return result
+            case_ids = [line['case_id'] for line in matched]
+        # update() no emite señales
+        transaction.on_commit(lambda: invalidate_user_cases(doctor.pk))
+
+        invoice_by_case = dict(
+            InvoiceItem.objects.filter(
+                case_id__in=case_ids
+            ).exclude(
+                invoice__status='cancelled'
+            ).values_list('case_id', 'invoice_id').distinct()
+        )
+
+        payment = Payment.objects.create(
+            doctor=doctor,
+            hospital=hospital,
+            amount=total_amount,
+            paid_on=paid_on or timezone.localdate(),
+            method=method,
+            reference=reference,
+            source='remittance',
+            source_file=source_file[:255],
+        )
+
+        PaymentAllocation.objects.bulk_create([
+            PaymentAllocation(
+                payment=payment,
+                case_id=line['case_id'],
+                invoice_id=invoice_by_case.get(line['case_id']),
+                amount=line['amount'],
+                line_number=line['line'],
+            )
+            for line in matched
+        ], batch_size=1000)
+
+        # Facturas sin casos pendientes de pago -> pagadas
+        unpaid_items = InvoiceItem.objects.filter(
+            invoice=OuterRef('pk'),
+            case__is_paid=False,
+        )
+        invoices_paid = Invoice.objects.filter(
+            id__in=set(invoice_by_case.values())
+        ).exclude(
+            status__in=['paid', 'cancelled']
+        ).exclude(
+            Exists(unpaid_items)
+        ).update(status='paid', updated_at=now)
+
+        transaction.on_commit(lambda: _notify_reconciled(payment, len(matched)))
+
+    result['payment'] = payment
+    result['invoices_paid'] = invoices_paid
+    return result
+
+
+def _release_lines(result, matched, payable_ids):
+    """
+    Pasar a `unmatched` (already_paid) las líneas cuyo caso ya no está en
+    `payable_ids` y actualizar los totales de `result`. Retorna las demás.
+    """
+    kept = []
+    for line in matched:
+        if line['case_id'] in payable_ids:
+            kept.append(line)
+            continue
+        result['unmatched'].append({
+            'line': line['line'],
+            'patient_id': line['patient_id'],
+            'surgery_date': str(line['surgery_date']),
+            'amount': str(line['amount']),
+            'reason': 'already_paid',
+        })
+
+    if len(kept) != len(matched):
+        result['unmatched'].sort(key=lambda entry: entry['line'])
+        result['matched'] = result['cases_paid'] = len(kept)
+        result['allocated_amount'] = sum((line['amount'] for line in kept), Decimal('0.00'))
+    return kept
+
+
+def _notify_reconciled(payment, cases_paid):
+    """
+    Los UPDATE masivos no pasan por SurgicalCase.save(), así que se envía
+    una sola notificación resumen en lugar de un evento por caso.
+    """
+    from apps.communication.events import notify_users
+
+    notify_users(
+        [payment.doctor_id],
+        'system',
+        'Remesa conciliada',
+        message=f"{cases_paid} caso(s) marcados como pagados ({payment.amount})",
+        data={'payment_id': payment.pk, 'cases_paid': cases_paid},
+    )
@@ -0,0 +1,29 @@
+# apps/payment/tests/test_case_deletion.py
+
+"""
+Eliminar un caso conciliado conserva la asignación del pago.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from apps.medico.tests.factories import SurgicalCaseFactory
+
+from ..models import Payment, PaymentAllocation
+
+pytestmark = pytest.mark.django_db
+
+
+def test_delete_reconciled_case(doctor, doctor_client):
+    case = SurgicalCaseFactory(created_by=doctor, is_operated=True, is_billed=True, is_paid=True, status='paid')
+    payment = Payment.objects.create(doctor=doctor, amount=Decimal('15.00'), paid_on=datetime.date(2026, 3, 1))
+    allocation = PaymentAllocation.objects.create(payment=payment, case=case, amount=Decimal('15.00'), line_number=2)
+
+    response = doctor_client.delete(reverse('medico:surgical-case-detail', args=[case.pk]))
+
+    assert response.status_code == 204
+    allocation.refresh_from_db()
+    assert allocation.case_id is None
+    assert allocation.amount == Decimal('15.00')
@@ -0,0 +1,94 @@
+# apps/payment/tests/test_services.py
+
+"""
+Conciliación de remesas: cada caso se paga una sola vez (también con dos
+conciliaciones simultáneas), montos con formato europeo y cache de casos.
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from apps.medico.tests.factories import SurgicalCaseFactory
+
+from .. import services
+from ..models import Payment, PaymentAllocation
+from ..services import reconcile_remittance
+
+pytestmark = pytest.mark.django_db
+
+
+def test_reconcile_remittance_refreshes_cached_stats(doctor, doctor_client, django_capture_on_commit_callbacks):
+    case = SurgicalCaseFactory(
+        created_by=doctor, surgery_date=datetime.date(2026, 3, 5),
+        is_operated=True, is_billed=True, status='billed', procedures=1,
+    )
+    url = reverse('medico:surgical-case-get-stats')
+    assert doctor_client.get(url).data['cases_by_status']['paid']['count'] == 0
+
+    rows = [{'patient_id': case.patient_id, 'surgery_date': '2026-03-05', 'amount': '15.00'}]
+    with django_capture_on_commit_callbacks(execute=True):
+        result = reconcile_remittance(doctor, rows)
+
+    assert result['matched'] == 1
+    stats = doctor_client.get(url).data['cases_by_status']
+    assert stats['paid']['count'] == 1
+    assert stats['billed']['count'] == 0
+
+
+def test_reconcile_same_file_twice(doctor):
+    cases = [
+        SurgicalCaseFactory(created_by=doctor, surgery_date=datetime.date(2026, 3, day), is_operated=True, procedures=1)
+        for day in (5, 6)
+    ]
+    rows = [
+        {'patient_id': case.patient_id, 'surgery_date': str(case.surgery_date), 'amount': '15,00'}
+        for case in cases
+    ]
+
+    first = reconcile_remittance(doctor, rows)
+    second = reconcile_remittance(doctor, rows)
+
+    assert first['matched'] == 2
+    assert second['matched'] == 0
+    assert second['payment'] is None
+    assert [entry['reason'] for entry in second['unmatched']] == ['already_paid', 'already_paid']
+    assert Payment.objects.count() == 1
+    assert PaymentAllocation.objects.count() == 2
+
+
+def test_reconcile_concurrent_run_pays_once(doctor, monkeypatch):
+    case = SurgicalCaseFactory(created_by=doctor, surgery_date=datetime.date(2026, 3, 5), is_operated=True, procedures=1)
+    other = SurgicalCaseFactory(created_by=doctor, surgery_date=datetime.date(2026, 3, 6), is_operated=True, procedures=1)
+    rows = [{'patient_id': case.patient_id, 'surgery_date': '2026-03-05', 'amount': '15.00'}]
+    both = rows + [{'patient_id': other.patient_id, 'surgery_date': '2026-03-06', 'amount': '15.00'}]
+    match_lines = services.match_lines
+
+    def concurrent_match(*args, **kwargs):
+        # La otra conciliación termina entre el emparejamiento y la escritura
+        monkeypatch.setattr(services, 'match_lines', match_lines)
+        reconcile_remittance(doctor, rows)
+        return match_lines(*args, **kwargs)
+
+    monkeypatch.setattr(services, 'match_lines', concurrent_match)
+    result = reconcile_remittance(doctor, both)
+
+    assert result['matched'] == result['cases_paid'] == 1
+    assert result['allocated_amount'] == Decimal('15.00')
+    assert result['unmatched'] == [{
+        'line': 2, 'patient_id': case.patient_id, 'surgery_date': '2026-03-05',
+        'amount': '15.00', 'reason': 'already_paid',
+    }]
+    assert PaymentAllocation.objects.filter(case=case).count() == 1
+    assert list(result['payment'].allocations.values_list('case_id', flat=True)) == [other.pk]
+
+
+def test_reconcile_rejects_ambiguous_amount(doctor):
+    case = SurgicalCaseFactory(created_by=doctor, surgery_date=datetime.date(2026, 3, 5), is_operated=True, procedures=1)
+    rows = [{'patient_id': case.patient_id, 'surgery_date': '2026-03-05', 'amount': '1.500'}]
+
+    result = reconcile_remittance(doctor, rows, dry_run=True)
+
+    assert result['unmatched'][0]['reason'] == 'invalid'
+    assert result['unmatched'][0]['amount'] == '1.500'
@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .views import PaymentViewSet
+
 router = DefaultRouter()
-# router.register(r'payments', views.PaymentViewSet, basename='payment')
-# router.register(r'methods', views.PaymentMethodViewSet, basename='payment-method')
+router.register(r'payments', PaymentViewSet, basename='payment')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,23 +1,109 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-# Ejemplo de vistas para pagos
-# class PaymentViewSet(viewsets.ModelViewSet):
-#     queryset = Payment.objects.all()
-#     serializer_class = PaymentSerializer
-#     permission_classes = [IsAuthenticated]
-#
-#     @action(detail=True, methods=['post'])
-#     def process(self, request, pk=None):
-#         """Procesa un pago pendiente"""
-#         payment = self.get_object()
-#         # Lógica de procesamiento de pago
-#         return Response({'status': 'payment processed'})
-#
-#     @action(detail=True, methods=['post'])
-#     def refund(self, request, pk=None):
-#         """Reembolsa un pago"""
-#         payment = self.get_object()
-#         # Lógica de reembolso
-#         return Response({'status': 'payment refunded'})
+from apps.medico.models import Hospital
+from core.imports import ImportFormatError, iter_rows
+
+from ..models import Payment
+from ..serializers import (
+    PaymentListSerializer,
+    PaymentSerializer,
+    RemittanceImportSerializer,
+)
+from ..services import RemittanceFormatError, UNMATCHED_REASONS, reconcile_remittance
+
+
+class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Libro de pagos del médico autenticado.
+
+    Endpoints:
+    - GET /payments/ - Listar pagos (filtros: hospital, source)
+    - GET /payments/{id}/ - Detalle con asignaciones a casos/facturas
+    - POST /payments/import-remittance/ - Conciliar una remesa CSV/XLSX
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Payment.objects.filter(
+            doctor=self.request.user
+        ).select_related('hospital')
+
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                'allocations__case', 'allocations__invoice'
+            )
+
+        hospital_filter = self.request.query_params.get('hospital', None)
+        if hospital_filter:
+            queryset = queryset.filter(hospital_id=hospital_filter)
+
+        source_filter = self.request.query_params.get('source', None)
+        if source_filter:
+            queryset = queryset.filter(source=source_filter)
+
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PaymentListSerializer
+        return PaymentSerializer
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import-remittance',
+        parser_classes=[MultiPartParser, FormParser],
+    )
+    def import_remittance(self, request):
+        """
+        Conciliar una remesa de pago.
+        Form-data: file (.csv/.xlsx), hospital, paid_on, method, reference, tolerance, dry_run
+        """
+        serializer = RemittanceImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        hospital = None
+        if data.get('hospital'):
+            try:
+                hospital = Hospital.objects.get(pk=data['hospital'])
+            except Hospital.DoesNotExist:
+                return Response(
+                    {'hospital': 'Hospital no encontrado'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        upload = data['file']
+        try:
+            result = reconcile_remittance(
+                request.user,
+                iter_rows(upload.file, upload.name),
+                hospital=hospital,
+                paid_on=data.get('paid_on'),
+                method=data['method'],
+                reference=data['reference'],
+                source_file=upload.name,
+                tolerance=data['tolerance'],
+                dry_run=data['dry_run'],
+            )
+        except (ImportFormatError, RemittanceFormatError) as exc:
+            return Response({'file': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        for entry in result['unmatched']:
+            entry['reason_display'] = UNMATCHED_REASONS[entry['reason']]
+
+        payment = result['payment']
+        return Response({
+            'payment': PaymentListSerializer(payment).data if payment else None,
+            'lines': result['lines'],
+            'matched': result['matched'],
+            'unmatched': result['unmatched'],
+            'total_amount': str(result['total_amount']),
+            'allocated_amount': str(result['allocated_amount']),
+            'invoices_paid': result['invoices_paid'],
+            'dry_run': data['dry_run'],
+        }, status=status.HTTP_201_CREATED if payment else status.HTTP_200_OK)
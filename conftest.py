@@ -0,0 +1,50 @@
+# conftest.py
+
+"""
+Fixtures comunes de la suite (pytest-django).
+
+Los presupuestos de consultas usan django_assert_max_num_queries de
+pytest-django; la cache se vacía antes de cada prueba para medir siempre
+el camino sin cache.
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.medio_auth.tests.factories import AdminUserFactory, UserFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def doctor(db):
+    return UserFactory()
+
+
+@pytest.fixture
+def doctor_client(doctor):
+    client = APIClient()
+    client.force_authenticate(doctor)
+    return client
+
+
+@pytest.fixture
+def staff_user(db):
+    return AdminUserFactory()
+
+
+@pytest.fixture
+def staff_client(staff_user):
+    client = APIClient()
+    client.force_authenticate(staff_user)
+    return client
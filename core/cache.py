@@ -0,0 +1,163 @@
+# core/cache.py
+
+"""
+Helpers de cache sobre django.core.cache (backend según CACHES/CACHE_BACKEND).
+
+- Versiones por namespace: get_version()/bump_version(). Las llaves se arman
+  con versioned_key(), que incluye la versión vigente de cada namespace del
+  que depende el valor; invalidar es incrementar la versión (una operación,
+  sin buscar ni borrar llaves), y las entradas viejas expiran solas.
+- get_or_set() con protección contra dogpile: cada valor guarda su
+  vencimiento "suave"; al vencer, un solo proceso (lock con cache.add) lo
+  regenera mientras los demás siguen sirviendo el valor anterior. Si no hay
+  valor, los demás esperan al que lo está calculando en vez de repetir la
+  consulta.
+- cache_response(): decorador para vistas de DRF (funciones con api_view o
+  métodos de ViewSet) que cachea response.data de las respuestas 200.
+"""
+import functools
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpRequest
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX = 'version:'
+LOCK_TIMEOUT = 30          # segundos que puede durar una regeneración
+WAIT_TIMEOUT = 5           # segundos que se espera a otro proceso sin valor
+WAIT_INTERVAL = 0.05
+MAX_RAW_KEY_LENGTH = 150
+
+
+def _new_version():
+    # Basada en el reloj: si la versión se pierde (expulsión, reinicio de la
+    # cache) la nueva no coincide con la de entradas anteriores
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """Versión vigente de `namespace`"""
+    key = VERSION_KEY_PREFIX + namespace
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+        if version is None:
+            version = _new_version()
+    return version
+
+
+def bump_version(namespace):
+    """Invalidar todas las llaves que dependen de `namespace`"""
+    key = VERSION_KEY_PREFIX + namespace
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _new_version()
+        cache.set(key, version, None)
+        return version
+
+
+def versioned_key(namespaces, *parts):
+    """
+    Llave para un valor que depende de `namespaces` (str o lista).
+    Las partes largas o con espacios se reemplazan por su hash.
+    """
+    if isinstance(namespaces, str):
+        namespaces = [namespaces]
+    versions = '.'.join(str(get_version(namespace)) for namespace in namespaces)
+    raw = ':'.join(str(part) for part in parts)
+    if len(raw) > MAX_RAW_KEY_LENGTH or any(char.isspace() for char in raw):
+        raw = hashlib.md5(raw.encode()).hexdigest()
+    return f'{namespaces[0]}:{versions}:{raw}'
+
+
+def _store(key, value, timeout, stale_timeout):
+    if timeout is None:
+        cache.set(key, (None, value), None)
+    else:
+        cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+
+
+def get_or_set(key, builder, timeout, stale_timeout=None):
+    """
+    Valor cacheado en `key` o builder() si no existe o venció.
+    Tras `timeout` segundos el valor sigue sirviéndose hasta
+    `stale_timeout` segundos más (por defecto otro `timeout`) mientras un
+    solo proceso lo regenera.
+    """
+    if stale_timeout is None:
+        stale_timeout = timeout or 0
+    lock_key = key + ':lock'
+
+    entry = cache.get(key)
+    if entry is not None:
+        expires_at, value = entry
+        if expires_at is None or expires_at > time.time():
+            return value
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return value
+    elif not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # Otro proceso lo está calculando: esperarlo antes de repetir el trabajo
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[1]
+        return builder()
+
+    try:
+        value = builder()
+        _store(key, value, timeout, stale_timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+class _Uncacheable(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def cache_response(namespaces, timeout, per_user=True, key_parts=None):
+    """
+    Cachear la respuesta de una vista de DRF.
+
+    namespaces: str, lista o función (request) -> lista; la respuesta se
+        invalida con bump_version() de cualquiera de ellos.
+    per_user: incluir el usuario en la llave.
+    key_parts: función (request) -> lista con partes adicionales de la llave
+        (la URL completa, con host y query string, siempre forma parte).
+
+    Solo se cachean GET/HEAD con status 200.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[0] if isinstance(args[0], (HttpRequest, Request)) else args[1]
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            parts = [request.build_absolute_uri()]
+            if per_user:
+                parts.append(request.user.pk if request.user.is_authenticated else 'anon')
+            if key_parts is not None:
+                parts.extend(key_parts(request))
+            names = namespaces(request) if callable(namespaces) else namespaces
+
+            def build():
+                response = view(*args, **kwargs)
+                if response.status_code != 200:
+                    raise _Uncacheable(response)
+                return response.data
+
+            try:
+                data = get_or_set(versioned_key(names, *parts), build, timeout)
+            except _Uncacheable as uncacheable:
+                return uncacheable.response
+            return Response(data)
+        return wrapper
+    return decorator
@@ -0,0 +1,115 @@
+# core/dev_proxy.py
+
+"""
+Proxy de desarrollo hacia el servidor de Vite.
+
+En DEBUG el navegador pide a Django cientos de módulos (/@vite/client,
+/@react-refresh, /node_modules/.vite/deps/...) al cargar una página. Todas
+las peticiones comparten una requests.Session con un pool de conexiones
+keep-alive hacia Vite, y el cuerpo se reenvía en streaming tal como llega
+(sin descomprimir ni acumularlo en memoria), con sus cabeceras.
+"""
+import threading
+
+import requests
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from requests.adapters import HTTPAdapter
+
+CHUNK_SIZE = 64 * 1024
+POOL_SIZE = 32
+TIMEOUT = (2, 30)  # (conexión, lectura) en segundos
+
+# Cabeceras del navegador que Vite usa (caché condicional, compresión, HMR)
+FORWARDED_REQUEST_HEADERS = (
+    'Accept',
+    'Accept-Encoding',
+    'Accept-Language',
+    'Cache-Control',
+    'If-Modified-Since',
+    'If-None-Match',
+    'Origin',
+    'Referer',
+    'User-Agent',
+)
+
+# Cabeceras de conexión que no se reenvían (RFC 9110 §7.6.1)
+HOP_BY_HOP_HEADERS = {
+    'connection',
+    'keep-alive',
+    'proxy-authenticate',
+    'proxy-authorization',
+    'te',
+    'trailer',
+    'transfer-encoding',
+    'upgrade',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def vite_url(path=''):
+    return getattr(settings, 'VITE_DEV_SERVER_URL', 'http://localhost:5173').rstrip('/') + path
+
+
+def get_session():
+    """Sesión única con pool de conexiones persistentes hacia Vite"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _stream_body(upstream):
+    """Reenviar el cuerpo sin decodificar y devolver la conexión al pool"""
+    completed = False
+    try:
+        for chunk in upstream.raw.stream(CHUNK_SIZE, decode_content=False):
+            yield chunk
+        completed = True
+    finally:
+        if completed:
+            upstream.raw.release_conn()
+        else:
+            # Cliente desconectado a mitad: la conexión no es reutilizable
+            upstream.close()
+
+
+def proxy_to_vite(request):
+    """
+    Reenviar `request` a Vite y devolver la respuesta en streaming.
+    Lanza requests.RequestException si Vite no responde.
+    """
+    headers = {
+        name: request.headers[name]
+        for name in FORWARDED_REQUEST_HEADERS
+        if name in request.headers
+    }
+    upstream = get_session().request(
+        request.method,
+        vite_url(request.get_full_path()),
+        headers=headers,
+        stream=True,
+        allow_redirects=False,
+        timeout=TIMEOUT,
+    )
+
+    response = StreamingHttpResponse(_stream_body(upstream), status=upstream.status_code)
+    for name, value in upstream.headers.items():
+        if name.lower() not in HOP_BY_HOP_HEADERS:
+            response[name] = value
+    return response
+
+
+def fetch_text(path):
+    """GET de un recurso pequeño de Vite (p. ej. index.html) reutilizando el pool"""
+    response = get_session().get(vite_url(path), timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.text
@@ -0,0 +1,104 @@
+# core/exports.py
+
+"""
+Utilidades de exportación en streaming (CSV / XLSX).
+
+Las filas se consumen de un iterador (normalmente un queryset con
+.iterator(chunk_size=...)) y se escriben de forma incremental, así que la
+memoria se mantiene constante sin importar cuántas filas se exporten.
+
+Los textos que empiezan como una fórmula (=, +, -, @) se escriben como
+texto: nombres de pacientes o procedimientos vienen del usuario y Excel
+los ejecutaría al abrir el archivo.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Caracteres con los que Excel interpreta una celda CSV como fórmula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_formula(value):
+    """Anteponer ' a los textos que Excel interpretaría como fórmula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Echo:
+    """Pseudo-buffer: write() devuelve la línea en vez de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv_response(filename, header, rows):
+    """
+    StreamingHttpResponse CSV: cada fila se formatea y se envía al cliente
+    en cuanto sale del iterador.
+    """
+    writer = csv.writer(Echo())
+
+    def generate():
+        # BOM para que Excel abra correctamente los acentos
+        yield '\ufeff'
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([escape_formula(value) for value in row])
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def stream_xlsx_response(filename, header, rows, sheet_title='Datos'):
+    """
+    Respuesta XLSX de memoria acotada.
+
+    Un XLSX es un ZIP que solo se puede cerrar al final, así que el libro se
+    escribe en modo write_only (las filas van directo a disco, no se guardan
+    en memoria) sobre un archivo temporal que luego se envía por bloques.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_title)
+
+    def text_cells(row):
+        # openpyxl guarda como fórmula cualquier texto que empiece con =
+        for value in row:
+            if isinstance(value, str) and value.startswith('='):
+                cell = WriteOnlyCell(worksheet, value)
+                cell.data_type = 's'
+                yield cell
+            else:
+                yield value
+
+    worksheet.append(header)
+    for row in rows:
+        worksheet.append(list(text_cells(row)))
+
+    tmp = tempfile.TemporaryFile()
+    workbook.save(tmp)
+    tmp.seek(0)
+
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+def export_response(file_type, filename, header, rows, sheet_title='Datos'):
+    """Despachar a CSV o XLSX según `file_type`"""
+    if file_type == 'xlsx':
+        return stream_xlsx_response(filename, header, rows, sheet_title=sheet_title)
+    return stream_csv_response(filename, header, rows)
@@ -0,0 +1,184 @@
+# core/imports.py
+
+"""
+Lectura en streaming de archivos tabulares (CSV / XLSX) para importaciones.
+
+iter_rows() devuelve un dict por fila con encabezados normalizados
+(minúsculas, sin acentos, espacios -> "_"), leyendo el archivo fila a fila
+en lugar de cargarlo completo en memoria.
+"""
+import csv
+import io
+import re
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.utils.dateparse import parse_date
+
+
+# Bytes iniciales usados para detectar la codificación de un CSV
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Montos aceptados: 1234.50, 1,234.50 (miles con coma) o 1.234,50 / 1234,50
+# (formato europeo, decimales con coma). Un único separador seguido de tres
+# dígitos (1,234 / 1.234) es ambiguo y se rechaza, igual que otros agrupamientos.
+AMBIGUOUS_DECIMAL_FORMAT = re.compile(r'^-?\d{1,3}[.,]\d{3}$')
+DECIMAL_POINT_FORMAT = re.compile(r'^-?(\d+|\d{1,3}(,\d{3})+)(\.\d+)?$')
+DECIMAL_COMMA_FORMAT = re.compile(r'^-?(\d+|\d{1,3}(\.\d{3})+)(,\d+)?$')
+
+
+class ImportFormatError(ValueError):
+    """El archivo no tiene un formato tabular legible"""
+
+
+def normalize_header(value):
+    """'Fecha de Cirugía ' -> 'fecha_de_cirugia'"""
+    value = unicodedata.normalize('NFKD', str(value or '').strip().lower())
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return '_'.join(value.replace('-', ' ').split())
+
+
+def resolve_columns(headers, aliases):
+    """
+    Mapear nombres canónicos a las columnas presentes en el archivo.
+    `aliases` = {'patient_id': ['patient_id', 'id_paciente', ...], ...}
+    """
+    present = set(headers)
+    columns = {}
+    for canonical, candidates in aliases.items():
+        for candidate in candidates:
+            if candidate in present:
+                columns[canonical] = candidate
+                break
+    return columns
+
+
+def _detect_encoding(file_obj):
+    """
+    UTF-8 (con o sin BOM) o, si el inicio del archivo no lo es, cp1252: la
+    codificación con la que Excel en Windows guarda los CSV con acentos.
+    """
+    sample = file_obj.read(ENCODING_SAMPLE_SIZE)
+    file_obj.seek(0)
+    try:
+        sample.decode('utf-8-sig')
+    except UnicodeDecodeError as exc:
+        # Un carácter multibyte cortado al final de la muestra no cuenta
+        if exc.start < len(sample) - 3:
+            return 'cp1252'
+    return 'utf-8-sig'
+
+
+def _iter_csv(file_obj):
+    encoding = _detect_encoding(file_obj)
+    text = io.TextIOWrapper(file_obj, encoding=encoding, newline='')
+    try:
+        try:
+            sample = text.read(4096)
+            text.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+
+            reader = csv.reader(text, dialect)
+            headers = [normalize_header(h) for h in next(reader, [])]
+            for values in reader:
+                if not any(value.strip() for value in values):
+                    continue
+                yield dict(zip(headers, values))
+        except UnicodeDecodeError:
+            raise ImportFormatError(
+                'No se pudo leer el archivo CSV: guárdelo con codificación UTF-8'
+            )
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(file_obj):
+    from openpyxl import load_workbook
+
+    try:
+        workbook = load_workbook(file_obj, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ImportFormatError(f'No se pudo leer el archivo XLSX: {exc}')
+
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(h) for h in next(rows, ())]
+        for values in rows:
+            if all(value in (None, '') for value in values):
+                continue
+            yield dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def iter_rows(file_obj, filename):
+    """Iterar las filas de un CSV o XLSX según la extensión de `filename`"""
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        return _iter_xlsx(file_obj)
+    if name.endswith('.csv') or name.endswith('.txt'):
+        return _iter_csv(file_obj)
+    raise ImportFormatError('Formato no soportado: use un archivo .csv o .xlsx')
+
+
+def clean_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def parse_decimal(value):
+    """
+    Convertir '1,234.50' / '1.234,50' / 1234.5 / 'Q 1234.50' a Decimal
+    (None si no es válido o el separador decimal es ambiguo).
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        number = Decimal(str(value))
+        # 'inf' o 'nan' son Decimal válidos pero no montos
+        return number if number.is_finite() else None
+    cleaned = str(value).replace('Q', '').replace('$', '').strip()
+    if AMBIGUOUS_DECIMAL_FORMAT.match(cleaned):
+        return None
+    if DECIMAL_POINT_FORMAT.match(cleaned):
+        cleaned = cleaned.replace(',', '')
+    elif DECIMAL_COMMA_FORMAT.match(cleaned):
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    else:
+        return None
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        return None
+
+
+def parse_date_value(value):
+    """Aceptar date/datetime de XLSX, ISO (2026-09-30) o dd/mm/yyyy"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = clean_text(value)
+    if not text:
+        return None
+    if '-' in text:
+        try:
+            parsed = parse_date(text)
+        except ValueError:
+            # Formato ISO con fecha imposible (2026-02-30)
+            return None
+        if parsed:
+            return parsed
+    for fmt in ('%d/%m/%Y', '%d/%m/%y'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
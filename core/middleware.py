@@ -1,15 +1,20 @@
 # core/middleware.py
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.core.exceptions import MiddlewareNotUsed
+import requests
 import os
-import mimetypes
 import subprocess
 import sys
 import socket
 import threading
 import atexit
 
+from core.dev_proxy import proxy_to_vite
+from core.static import CATALOG_EXTENSIONS, CATALOG_PREFIX, serve_file
+
+DEV_FILE_EXTENSIONS = ('.js', '.css', '.png', '.jpg', '.svg', '.ico', '.json', '.tsx', '.ts')
+
 
 _vite_started = False
 _vite_lock = threading.Lock()
@@ -86,61 +91,43 @@ def start_vite_server():
 
 
 class ViteDevMiddleware:
+    """
+    Solo desarrollo: proxy a Vite y archivos fuente. En producción se retira
+    de la cadena (MiddlewareNotUsed) y los estáticos los sirve WhiteNoise.
+    """
     def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
         self.get_response = get_response
-        if settings.DEBUG:
-            threading.Thread(target=start_vite_server, daemon=True).start()
+        threading.Thread(target=start_vite_server, daemon=True).start()
 
     def __call__(self, request):
-        if not settings.DEBUG:
-            return self.get_response(request)
-
         if request.path.startswith('/@') or request.path.startswith('/node_modules/'):
             try:
-                import requests
-                vite_url = f'http://localhost:5173{request.path}'
-                if request.GET:
-                    query_string = request.GET.urlencode()
-                    vite_url = f'{vite_url}?{query_string}'
-                
-                vite_response = requests.get(vite_url, timeout=2)
-                return HttpResponse(
-                    vite_response.content,
-                    content_type=vite_response.headers.get('content-type', 'application/javascript'),
-                    status=vite_response.status_code
-                )
-            except Exception:
+                return proxy_to_vite(request)
+            except requests.RequestException:
                 pass
         
-        if request.path.startswith('/surgeries/'):
-            public_file_path = os.path.join(settings.BASE_DIR, 'public', request.path.lstrip('/'))
-            if os.path.exists(public_file_path):
-                mime_type, _ = mimetypes.guess_type(public_file_path)
-                with open(public_file_path, 'rb') as f:
-                    content = f.read()
-                return HttpResponse(content, content_type=mime_type or 'text/csv')
+        relative_path = request.path.lstrip('/')
+
+        # Normalmente StaticFilesMiddleware ya respondió /surgeries/
+        if request.path.startswith('/surgeries/') and request.path.lower().endswith(CATALOG_EXTENSIONS):
+            response = serve_file(
+                request, settings.SURGERY_CATALOG_DIR, relative_path[len(CATALOG_PREFIX):], 'text/csv'
+            )
+            if response is not None:
+                return response
 
         if request.path.startswith('/src/'):
-            file_path = os.path.join(settings.BASE_DIR, request.path.lstrip('/'))
-            if os.path.exists(file_path):
-                mime_type, _ = mimetypes.guess_type(file_path)
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                return HttpResponse(content, content_type=mime_type or 'application/octet-stream')
-
-        if any(request.path.endswith(ext) for ext in ['.js', '.css', '.png', '.jpg', '.svg', '.ico', '.json', '.tsx', '.ts']):
-            search_paths = [
-                os.path.join(settings.BASE_DIR, request.path.lstrip('/')),
-                os.path.join(settings.BASE_DIR, 'src', request.path.lstrip('/')),
-                os.path.join(settings.BASE_DIR, 'public', request.path.lstrip('/')),
-            ]
-            
-            for file_path in search_paths:
-                if os.path.exists(file_path):
-                    mime_type, _ = mimetypes.guess_type(file_path)
-                    with open(file_path, 'rb') as f:
-                        content = f.read()
-                    return HttpResponse(content, content_type=mime_type or 'application/octet-stream')
+            response = serve_file(request, settings.BASE_DIR, relative_path)
+            if response is not None:
+                return response
+
+        if request.path.endswith(DEV_FILE_EXTENSIONS):
+            for root in ('', 'src', 'public'):
+                response = serve_file(request, os.path.join(settings.BASE_DIR, root), relative_path)
+                if response is not None:
+                    return response
 
         response = self.get_response(request)
         return response
@@ -0,0 +1,275 @@
+# core/perf.py
+
+"""
+Métricas de rendimiento por request.
+
+PerfMiddleware mide en cada request:
+- consultas SQL y su tiempo total (connection.execute_wrapper),
+- la repetición máxima de una misma consulta (la firma de un N+1: el mismo
+  SELECT ... WHERE id = %s ejecutado una vez por fila),
+- el tiempo dentro de serializer.data de DRF (incluye las consultas que el
+  serializer dispare, que también cuentan en db),
+- el tamaño de la respuesta y la duración total.
+
+Con PERF_HEADERS (por defecto en DEBUG) agrega X-Query-Count y
+Server-Timing, que el panel de red del navegador muestra por request. Los
+valores se acumulan por vista en histogramas (PerfStats) que expone
+/api/admin/perf/; cada proceso de gunicorn tiene su propio acumulado.
+
+Los requests lentos o con consultas repetidas se registran como WARNING en
+el logger core.perf.
+"""
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de los buckets de los histogramas
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_metrics = contextvars.ContextVar('perf_metrics', default=None)
+_instrumented = False
+_instrument_lock = threading.Lock()
+
+
+def new_metrics():
+    return {
+        'queries': 0,
+        'db_time': 0.0,
+        'serializer_time': 0.0,
+        'serializer_depth': 0,
+        'statements': {},
+    }
+
+
+class QueryTimer:
+    """execute_wrapper que acumula consultas y tiempo en `metrics`"""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics = self.metrics
+            metrics['db_time'] += time.perf_counter() - start
+            metrics['queries'] += 1
+            metrics['statements'][sql] = metrics['statements'].get(sql, 0) + 1
+
+
+def _timed_data(fget):
+    """serializer.data midiendo solo el serializer más externo"""
+    @functools.wraps(fget)
+    def data(self):
+        metrics = _metrics.get()
+        if metrics is None or metrics['serializer_depth']:
+            return fget(self)
+        metrics['serializer_depth'] += 1
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            metrics['serializer_time'] += time.perf_counter() - start
+            metrics['serializer_depth'] -= 1
+    return property(data)
+
+
+def instrument_serializers():
+    """Envolver la propiedad data de los serializers de DRF (una sola vez)"""
+    global _instrumented
+    from rest_framework.serializers import BaseSerializer, ListSerializer, Serializer
+
+    with _instrument_lock:
+        if _instrumented:
+            return
+        for cls in (BaseSerializer, Serializer, ListSerializer):
+            cls.data = _timed_data(cls.__dict__['data'].fget)
+        _instrumented = True
+
+
+def _bucket(value, bounds):
+    for bound in bounds:
+        if value <= bound:
+            return str(bound)
+    return '+Inf'
+
+
+def _histogram_percentile(histogram, bounds, count, fraction):
+    """Límite superior del bucket que contiene el percentil"""
+    target = fraction * count
+    seen = 0
+    for label in [str(bound) for bound in bounds] + ['+Inf']:
+        seen += histogram.get(label, 0)
+        if seen >= target:
+            return label
+    return '+Inf'
+
+
+class PerfStats:
+    """Acumulado por vista de las métricas de los requests (en memoria)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.views = {}
+
+    def record(self, view, status_code, duration_ms, metrics, size):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'db_ms': 0.0,
+                    'serializer_ms': 0.0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'max_repeated_query': 0,
+                    'bytes': 0,
+                    'max_bytes': 0,
+                    'latency_histogram': {},
+                    'query_histogram': {},
+                }
+            repeated = max(metrics['statements'].values(), default=0)
+            stats['requests'] += 1
+            stats['errors'] += status_code >= 500
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['db_ms'] += metrics['db_time'] * 1000
+            stats['serializer_ms'] += metrics['serializer_time'] * 1000
+            stats['queries'] += metrics['queries']
+            stats['max_queries'] = max(stats['max_queries'], metrics['queries'])
+            stats['max_repeated_query'] = max(stats['max_repeated_query'], repeated)
+            if size is not None:
+                stats['bytes'] += size
+                stats['max_bytes'] = max(stats['max_bytes'], size)
+            latency = _bucket(duration_ms, LATENCY_BUCKETS_MS)
+            stats['latency_histogram'][latency] = stats['latency_histogram'].get(latency, 0) + 1
+            queries = _bucket(metrics['queries'], QUERY_BUCKETS)
+            stats['query_histogram'][queries] = stats['query_histogram'].get(queries, 0) + 1
+
+    def snapshot(self):
+        """Resumen por vista, ordenado por tiempo total consumido"""
+        with self.lock:
+            views = {view: dict(stats) for view, stats in self.views.items()}
+
+        results = []
+        for view, stats in views.items():
+            count = stats['requests']
+            results.append({
+                'view': view,
+                'requests': count,
+                'errors': stats['errors'],
+                'total_ms': round(stats['total_ms'], 1),
+                'mean_ms': round(stats['total_ms'] / count, 2),
+                'max_ms': round(stats['max_ms'], 2),
+                'p50_ms': _histogram_percentile(stats['latency_histogram'], LATENCY_BUCKETS_MS, count, 0.5),
+                'p95_ms': _histogram_percentile(stats['latency_histogram'], LATENCY_BUCKETS_MS, count, 0.95),
+                'mean_db_ms': round(stats['db_ms'] / count, 2),
+                'mean_serializer_ms': round(stats['serializer_ms'] / count, 2),
+                'mean_queries': round(stats['queries'] / count, 1),
+                'max_queries': stats['max_queries'],
+                'max_repeated_query': stats['max_repeated_query'],
+                'mean_bytes': round(stats['bytes'] / count),
+                'max_bytes': stats['max_bytes'],
+                'latency_histogram_ms': {
+                    label: stats['latency_histogram'].get(label, 0)
+                    for label in [str(bound) for bound in LATENCY_BUCKETS_MS] + ['+Inf']
+                },
+                'query_histogram': {
+                    label: stats['query_histogram'].get(label, 0)
+                    for label in [str(bound) for bound in QUERY_BUCKETS] + ['+Inf']
+                },
+            })
+        results.sort(key=lambda item: item['total_ms'], reverse=True)
+        return {
+            'pid': os.getpid(),
+            'since': self.started_at,
+            'views': results,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.started_at = time.time()
+
+
+perf_stats = PerfStats()
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return f'{request.method} {match.view_name or match.route}'
+
+
+def response_size(response):
+    if getattr(response, 'streaming', False):
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+class PerfMiddleware:
+    """Métricas por request (ver docstring del módulo)"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_MONITORING', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.add_headers = getattr(settings, 'PERF_HEADERS', settings.DEBUG)
+        self.slow_request_ms = getattr(settings, 'PERF_SLOW_REQUEST_MS', 1000)
+        self.repeated_query_warning = getattr(settings, 'PERF_REPEATED_QUERY_WARNING', 10)
+        instrument_serializers()
+
+    def __call__(self, request):
+        metrics = new_metrics()
+        token = _metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(QueryTimer(metrics)))
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        view = view_label(request)
+        if view is None:
+            return response
+
+        size = response_size(response)
+        perf_stats.record(view, response.status_code, duration_ms, metrics, size)
+
+        repeated = max(metrics['statements'].values(), default=0)
+        if duration_ms >= self.slow_request_ms or repeated >= self.repeated_query_warning:
+            logger.warning(
+                "%s %s: %.0f ms, %s consultas (%.0f ms), consulta repetida %s veces",
+                view, request.get_full_path(), duration_ms, metrics['queries'],
+                metrics['db_time'] * 1000, repeated,
+            )
+
+        if self.add_headers:
+            response['X-Query-Count'] = str(metrics['queries'])
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics["db_time"] * 1000:.1f};desc="{metrics["queries"]} queries"',
+                f'serializer;dur={metrics["serializer_time"] * 1000:.1f}',
+                f'total;dur={duration_ms:.1f}',
+            ])
+        return response
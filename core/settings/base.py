@@ -1,5 +1,6 @@
 # core/settings/base.py
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import timedelta
@@ -56,10 +57,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
 
+    # Estáticos, build del frontend y catálogo (WhiteNoise)
+    'core.static.StaticFilesMiddleware',
+
+    # Consultas, tiempo y tamaño por request (core/perf.py)
+    'core.perf.PerfMiddleware',
+
     # CORS
     'corsheaders.middleware.CorsMiddleware',
 
-    # Custom
+    # Custom (solo DEBUG: se retira de la cadena con MiddlewareNotUsed)
     'core.middleware.ViteDevMiddleware',
 
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,10 +108,41 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', ''),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Conexiones persistentes: cada proceso de gunicorn reutiliza su
+        # conexión entre requests en vez de abrir TCP/TLS en cada una
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
 
+# Cache (helpers en core/cache.py). CACHE_BACKEND: locmem (un proceso),
+# file o db (un servidor, compartida entre workers; db requiere
+# `manage.py createcachetable`) o redis (REDIS_URL, requiere el paquete redis)
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'medico',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'medico-cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'medico_cache',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+    },
+}
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'locmem')
+CACHES = {
+    'default': dict(CACHE_BACKENDS[CACHE_BACKEND], KEY_PREFIX='medico'),
+}
+
+
 AUTH_USER_MODEL = 'medio_auth.CustomUser'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -121,13 +159,44 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Métricas por request (core/perf.py, /api/admin/perf/). Los headers
+# X-Query-Count y Server-Timing se agregan por defecto solo en DEBUG.
+PERF_MONITORING = os.environ.get('PERF_MONITORING', 'True') == 'True'
+PERF_SLOW_REQUEST_MS = int(os.environ.get('PERF_SLOW_REQUEST_MS', '1000'))
+PERF_REPEATED_QUERY_WARNING = int(os.environ.get('PERF_REPEATED_QUERY_WARNING', '10'))
+
+
+# Catálogo de procedimientos (CSVs servidos al frontend en /surgeries/)
+SURGERY_CATALOG_DIR = BASE_DIR / 'public' / 'surgeries'
+CATALOG_CACHE_CONTROL = 'public, max-age=3600, stale-while-revalidate=86400'
+
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_DIRS = [BASE_DIR / 'static']
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+    # collectstatic genera copias con hash y variantes .gz/.br del catálogo
+    ('surgeries', SURGERY_CATALOG_DIR),
+]
+
+# Build de Vite (npm run build) servido en la raíz por WhiteNoise;
+# precomprimir con: python -m whitenoise.compress dist
+FRONTEND_DIST_DIR = BASE_DIR / 'dist'
+WHITENOISE_ROOT = FRONTEND_DIST_DIR if FRONTEND_DIST_DIR.is_dir() else None
+WHITENOISE_MIMETYPES = {'.csv': 'text/csv'}
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Historial de la calculadora: registro diferido (apps/medico/history.py)
+CALCULATION_HISTORY_BUFFERED = True
+CALCULATION_HISTORY_FLUSH_SIZE = 100
+CALCULATION_HISTORY_FLUSH_INTERVAL = 5  # segundos
+CALCULATION_HISTORY_MAX_BUFFER = 10000  # registros retenidos si la base no responde
+
+# Sincronización incremental de casos (apps/medico/sync.py)
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '60'))
+CASE_DELETION_RETENTION_DAYS = int(os.environ.get('CASE_DELETION_RETENTION_DAYS', '90'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
@@ -192,6 +261,18 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
 # FIN CONFIGURACIÓN DE EMAIL
 # ============================================
 
+# Tasa de impuesto aplicada a las facturas generadas por lote (0.12 = 12%)
+INVOICE_TAX_RATE = os.environ.get('INVOICE_TAX_RATE', '0')
+
+# Backend de eventos en tiempo real (stream SSE de notificaciones).
+# Requiere GUNICORN_ASGI=True (ver gunicorn.conf.py); bajo WSGI el stream
+# responde 501. El backend en proceso sirve para un único worker ASGI; puede reemplazarse
+# por cualquier clase que implemente apps.communication.events.BaseEventBackend
+COMMUNICATION_EVENT_BACKEND = os.environ.get(
+    'COMMUNICATION_EVENT_BACKEND',
+    'apps.communication.events.InProcessEventBackend'
+)
+
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
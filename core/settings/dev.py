@@ -6,6 +6,13 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', '[::1]']
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# runserver atiende cada request en un hilo nuevo: las conexiones
+# persistentes no se reutilizan y solo se acumulan
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '0'))
+
+# Servidor de Vite al que ViteDevMiddleware/IndexView reenvían (core/dev_proxy.py)
+VITE_DEV_SERVER_URL = 'http://localhost:5173'
+
 STATICFILES_DIRS = [
     BASE_DIR / 'src',
     BASE_DIR / 'public',
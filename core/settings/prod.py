@@ -25,7 +25,20 @@ SECURE_HSTS_SECONDS = 31536000
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
 SECURE_HSTS_PRELOAD = True
 
-STATICFILES_STORAGE = "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+# Varios workers de gunicorn: la cache debe ser compartida (no locmem)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'file')
+CACHES = {
+    "default": dict(CACHE_BACKENDS[CACHE_BACKEND], KEY_PREFIX="medico"),
+}
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 LOGGING = {
     "version": 1,
@@ -42,9 +55,22 @@ LOGGING = {
             "class": "logging.StreamHandler",
             "formatter": "verbose",
         },
+        "perf": {
+            "level": "WARNING",
+            "class": "logging.StreamHandler",
+            "formatter": "verbose",
+        },
     },
     "root": {
         "handlers": ["console"],
         "level": "ERROR",
     },
+    "loggers": {
+        # Requests lentos y consultas repetidas (core/perf.py)
+        "core.perf": {
+            "handlers": ["perf"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
 }
@@ -0,0 +1,38 @@
+# core/settings/test.py
+
+"""
+Settings para la suite de pytest (pytest.ini).
+
+Por defecto SQLite en memoria para correr sin servicios externos;
+TEST_DATABASE=postgres usa la base configurada en base.py (DB_*), que es
+donde corresponde validar los presupuestos de consultas antes de un deploy.
+"""
+from .base import *
+
+DEBUG = False
+
+if os.environ.get('TEST_DATABASE', 'sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+CACHES = {
+    'default': dict(CACHE_BACKENDS['locmem'], KEY_PREFIX='medico-test'),
+}
+
+# Hash rápido: los factories crean muchos usuarios
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Escritura inmediata del historial (sin hilo de volcado)
+CALCULATION_HISTORY_BUFFERED = False
+
+# Los presupuestos se miden con django_assert_max_num_queries
+PERF_MONITORING = False
+
+# Sin collectstatic en la suite
+STATIC_ROOT = None
@@ -0,0 +1,186 @@
+# core/static.py
+
+"""
+Servido de archivos estáticos con WhiteNoise.
+
+StaticFilesMiddleware extiende WhiteNoiseMiddleware para servir, además de
+STATIC_ROOT (y WHITENOISE_ROOT con el build de Vite):
+
+- /surgeries/: el catálogo de procedimientos. Tras collectstatic se sirve la
+  copia de STATIC_ROOT/surgeries, que incluye variantes .gz/.br; sin
+  collectstatic, directamente SURGERY_CATALOG_DIR.
+
+Los assets con hash (manifest de Django o nombre-<hash>.js de Vite) se
+marcan inmutables (cache de un año); el catálogo, que mantiene su nombre,
+usa CATALOG_CACHE_CONTROL y se revalida con ETag/Last-Modified.
+
+serve_file() es el equivalente para los archivos que ViteDevMiddleware
+sirve en desarrollo: FileResponse sobre el handle del archivo (sendfile vía
+wsgi.file_wrapper), validadores ETag/Last-Modified con 304, Range y
+variantes precomprimidas .br/.gz si existen junto al archivo.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+CATALOG_PREFIX = 'surgeries/'
+CATALOG_EXTENSIONS = ('.csv',)
+
+# Vite: assets/index-3f9a1b2c.js, assets/logo-BvX81k_q.svg
+VITE_HASHED_FILE = re.compile(r'^/assets/.+-[0-9A-Za-z_-]{8,}\.[0-9A-Za-z]+$')
+
+
+def catalog_root():
+    """Directorio desde el que se sirve /surgeries/"""
+    if settings.STATIC_ROOT:
+        collected = os.path.join(settings.STATIC_ROOT, CATALOG_PREFIX)
+        if os.path.isdir(collected):
+            return collected
+    return str(settings.SURGERY_CATALOG_DIR)
+
+
+def add_catalog_headers(headers, path, url):
+    """Cache-Control del catálogo (WHITENOISE_ADD_HEADERS_FUNCTION por defecto)"""
+    if url.startswith('/' + CATALOG_PREFIX):
+        headers['Cache-Control'] = settings.CATALOG_CACHE_CONTROL
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise + catálogo de procedimientos en /surgeries/"""
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if self.add_headers_function is None:
+            self.add_headers_function = add_catalog_headers
+        self.add_files(catalog_root(), prefix=CATALOG_PREFIX)
+
+        # El directorio del catálogo también contiene scripts: solo CSVs
+        for url in [url for url in self.files if not self.is_servable(url)]:
+            del self.files[url]
+
+    @staticmethod
+    def is_servable(url):
+        if url.startswith('/' + CATALOG_PREFIX):
+            return url.lower().endswith(CATALOG_EXTENSIONS)
+        return True
+
+    def find_file(self, url):
+        if not self.is_servable(url):
+            return None
+        return super().find_file(url)
+
+    def immutable_file_test(self, path, url):
+        if VITE_HASHED_FILE.match(url):
+            return True
+        return super().immutable_file_test(path, url)
+
+
+# Variantes precomprimidas en orden de preferencia
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _RangeFile:
+    """Vista de solo lectura de [start, start + length) de un archivo abierto"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _precompressed_variant(request, path):
+    accepted = request.headers.get('Accept-Encoding', '')
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted and os.path.isfile(path + suffix):
+            return encoding, path + suffix
+    return None, path
+
+
+def _parse_range(header, size):
+    """(inicio, fin inclusive) de un Range de un solo tramo, o None si no aplica"""
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def serve_file(request, root, relative_path, content_type=None):
+    """
+    Servir `relative_path` dentro de `root` sin cargarlo en memoria.
+    Retorna None si el archivo no existe (o la ruta sale de `root`).
+    """
+    try:
+        path = safe_join(root, relative_path)
+    except SuspiciousFileOperation:
+        return None
+    if not os.path.isfile(path):
+        return None
+
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    encoding, served_path = _precompressed_variant(request, path)
+    stat = os.stat(served_path)
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}{"-" + encoding if encoding else ""}"'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        patch_vary_headers(not_modified, ['Accept-Encoding'])
+        return not_modified
+
+    file = open(served_path, 'rb')
+    byte_range = None
+    if not encoding and request.headers.get('Range'):
+        byte_range = _parse_range(request.headers['Range'], stat.st_size)
+        if byte_range is False:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(_RangeFile(file, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'none' if encoding else 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
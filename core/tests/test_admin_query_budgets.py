@@ -0,0 +1,50 @@
+# core/tests/test_admin_query_budgets.py
+
+"""
+Presupuestos de consultas de los endpoints del dashboard de administración
+"""
+import pytest
+from django.urls import reverse
+
+from apps.medico.tests.factories import HospitalFactory, SurgicalCaseFactory
+from apps.medio_auth.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def users_with_cases():
+    hospital = HospitalFactory()
+    users = UserFactory.create_batch(30)
+    for user in users[:10]:
+        SurgicalCaseFactory.create_batch(3, created_by=user, hospital=hospital, procedures=1)
+    return users
+
+
+def test_admin_users_budget(staff_client, users_with_cases, django_assert_max_num_queries):
+    # Usuarios con su total de casos en una consulta agrupada
+    with django_assert_max_num_queries(1):
+        response = staff_client.get(reverse('admin_users'))
+    assert response.status_code == 200
+    assert len(response.data) == 31
+    totals = {user['id']: user['total_cases'] for user in response.data}
+    assert totals[users_with_cases[0].pk] == 3
+    assert totals[users_with_cases[-1].pk] == 0
+    assert all('plan' in user for user in response.data)
+
+
+def test_admin_dashboard_budgets(staff_client, users_with_cases, django_assert_max_num_queries):
+    for name, budget in (
+        ('admin_stats', 3),
+        ('admin_activity', 3),
+        ('admin_hospitals', 1),
+        ('admin_procedures', 1),
+    ):
+        with django_assert_max_num_queries(budget):
+            response = staff_client.get(reverse(name))
+        assert response.status_code == 200, name
+
+
+def test_admin_endpoints_require_staff(doctor_client):
+    assert doctor_client.get(reverse('admin_users')).status_code == 403
+    assert doctor_client.get(reverse('admin_perf')).status_code == 403
@@ -0,0 +1,47 @@
+# core/tests/test_imports.py
+
+"""
+Lectura de archivos de importación: datos malformados no deben romper el
+request (se reportan por fila o como error de formato).
+"""
+import io
+
+import pytest
+
+from core.imports import ImportFormatError, iter_rows, parse_date_value, parse_decimal
+
+
+def test_parse_date_value_invalid_iso():
+    assert parse_date_value('2026-02-30') is None
+    assert parse_date_value('30/09/2026').isoformat() == '2026-09-30'
+
+
+def test_parse_decimal_rejects_non_finite():
+    assert parse_decimal('inf') is None
+    assert parse_decimal('NaN') is None
+    assert parse_decimal(float('inf')) is None
+    assert str(parse_decimal('Q 1,234.50')) == '1234.50'
+
+
+def test_parse_decimal_european_format():
+    assert str(parse_decimal('1.234,50')) == '1234.50'
+    assert str(parse_decimal('1234,5')) == '1234.5'
+    assert str(parse_decimal('12.345.678,90')) == '12345678.90'
+    # Un separador seguido de tres dígitos puede ser miles o decimales
+    assert parse_decimal('1.234') is None
+    assert parse_decimal('1,234') is None
+    assert parse_decimal('1,2,3') is None
+
+
+def test_csv_cp1252_fallback():
+    content = 'paciente;fecha\nJosé Peña;2026-01-05\n'.encode('cp1252')
+    rows = list(iter_rows(io.BytesIO(content), 'casos.csv'))
+    assert rows == [{'paciente': 'José Peña', 'fecha': '2026-01-05'}]
+
+
+def test_csv_invalid_utf8_after_sample(monkeypatch):
+    monkeypatch.setattr('core.imports.ENCODING_SAMPLE_SIZE', 16)
+    content = 'paciente,fecha\n' + 'Ana,2026-01-05\n' * 5
+    content = content.encode('utf-8') + 'Peña,2026-01-05\n'.encode('cp1252')
+    with pytest.raises(ImportFormatError):
+        list(iter_rows(io.BytesIO(content), 'casos.csv'))
@@ -10,8 +10,14 @@ from core.views import (
     admin_users,
     admin_hospitals,
     admin_procedures,
+    admin_perf,
     delete_user  # ← AGREGADO
 )
+from apps.communication.views import (
+    notification_counts,
+    notification_stream,
+    notification_stream_ticket,
+)
 
 urlpatterns = [
     # Django Admin Panel
@@ -31,6 +37,16 @@ urlpatterns = [
     path('api/admin/users/<int:user_id>/delete/', delete_user, name='delete_user'),  # ← AGREGADO
     path('api/admin/hospitals/', admin_hospitals, name='admin_hospitals'),
     path('api/admin/procedures/', admin_procedures, name='admin_procedures'),
+    path('api/admin/perf/', admin_perf, name='admin_perf'),
+    
+    # Notificaciones (polling ligero del badge)
+    path('api/notifications/counts/', notification_counts, name='notification_counts'),
+    path('api/notifications/stream/', notification_stream, name='notification_stream'),
+    path(
+        'api/notifications/stream/ticket/',
+        notification_stream_ticket,
+        name='notification_stream_ticket',
+    ),
     
     # Django REST Framework
     path('api-auth/', include('rest_framework.urls')),
@@ -1,4 +1,5 @@
 from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render
 from django.views.generic import View
 from django.conf import settings
 from django.http import HttpResponse
@@ -13,6 +14,9 @@ from decimal import Decimal
 import os
 import requests
 
+from core.dev_proxy import fetch_text, vite_url
+from core.perf import perf_stats
+
 # Importar modelos de medico
 from apps.medico.models import SurgicalCase, CaseProcedure, Hospital, Operation, Specialty
 
@@ -25,12 +29,11 @@ class IndexView(View):
     def get(self, request, *args, **kwargs):
         if settings.DEBUG:
             try:
-                vite_response = requests.get('http://localhost:5173/', timeout=2)
-                html_content = vite_response.text
-                html_content = html_content.replace('src="/', 'src="http://localhost:5173/')
-                html_content = html_content.replace('href="/', 'href="http://localhost:5173/')
+                html_content = fetch_text('/')
+                html_content = html_content.replace('src="/', f'src="{vite_url()}/')
+                html_content = html_content.replace('href="/', f'href="{vite_url()}/')
                 return HttpResponse(html_content, content_type='text/html')
-            except:
+            except requests.RequestException:
                 return HttpResponse("""
                     <!DOCTYPE html>
                     <html>
@@ -197,8 +200,11 @@ def admin_users(request):
     Requiere autenticación JWT y que el usuario sea staff.
     """
     
-    # Obtener todos los usuarios con sus campos principales
-    users = User.objects.all().values(
+    # Obtener todos los usuarios con sus campos principales y el total de
+    # casos creados (una sola consulta agrupada)
+    users = User.objects.annotate(
+        total_cases=Count('created_cases')
+    ).values(
         'id', 
         'username', 
         'email', 
@@ -209,7 +215,9 @@ def admin_users(request):
         'is_superuser',
         'is_verified',  # ← AGREGADO
         'date_joined', 
-        'last_login'
+        'last_login',
+        'plan',
+        'total_cases'
     )
     
     # Convertir QuerySet a lista
@@ -226,15 +234,6 @@ def admin_users(request):
         # Crear nombre completo
         full_name = f"{user['first_name']} {user['last_name']}".strip()
         user['full_name'] = full_name if full_name else user['username']
-        
-        # Contar casos quirúrgicos creados por este usuario
-        user['total_cases'] = SurgicalCase.objects.filter(
-            created_by_id=user['id']
-        ).count()
-        
-        # Obtener el plan real del usuario desde la base de datos
-        user_obj = User.objects.get(id=user['id'])
-        user['plan'] = getattr(user_obj, 'plan')  
         user['total_favorites'] = 0  
     
     return Response(users_list)
@@ -341,3 +340,17 @@ def delete_user(request, user_id):
             'success': False,
             'message': f'Error al eliminar usuario: {str(e)}'
         }, status=500)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def admin_perf(request):
+    """
+    Métricas acumuladas por vista (consultas, tiempo de DB y de serializers,
+    latencia y tamaño de respuesta con histogramas) del proceso que atiende.
+    DELETE reinicia el acumulado.
+    """
+    if request.method == 'DELETE':
+        perf_stats.reset()
+        return Response(status=204)
+    return Response(perf_stats.snapshot())
@@ -0,0 +1,31 @@
+# gunicorn.conf.py
+
+"""
+Configuración de gunicorn (se carga automáticamente desde el directorio
+del proyecto). Los workers y threads salen del entorno; cada thread usa su
+propia conexión persistente a PostgreSQL (DB_CONN_MAX_AGE), así que las
+conexiones abiertas son aproximadamente WEB_CONCURRENCY × GUNICORN_THREADS.
+
+Por defecto se sirve vía WSGI (core.wsgi). Con GUNICORN_ASGI=True se usa
+core.asgi con workers de uvicorn, necesario para el stream SSE de
+notificaciones (/api/notifications/stream/); bajo WSGI ese endpoint
+responde 501 y el frontend sigue con el polling de /api/notifications/counts/.
+"""
+import multiprocessing
+import os
+
+asgi = os.environ.get('GUNICORN_ASGI', 'False').lower() in ('true', '1', 'yes')
+
+if asgi:
+    wsgi_app = 'core.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'core.wsgi:application'
+bind = '0.0.0.0:' + os.environ.get('PORT', '8000')
+
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+
+# Mantener la conexión HTTP del proxy (Render/nginx) entre requests
+keepalive = 5